@@ -43,6 +43,8 @@ const CommonChat: React.FC<CommonChatProps> = ({
     websocket.onmessage = (event) => {
       // Parse the incoming JSON message
       const receivedData = JSON.parse(event.data);
+      // Sentiment tags for moderation are not chat messages
+      if (receivedData.type === "sentiment") return;
       const newMessage: Message = {
         id: Date.now().toString(),
         sender: receivedData.sender,
@@ -15,6 +15,7 @@ import {
   User,
   Users,
 } from "lucide-react";
+import { fetchProfessionalsPage } from "../services/professionalsService";
 
 // -------------------------
 // TypeScript Interfaces
@@ -194,6 +195,8 @@ interface ProfessionalsContentProps {
   professionals: ProfessionalData[];
   onProfessionalSelect: (professional: ProfessionalData) => void;
   onAddProfessional: () => void;
+  hasMore: boolean;
+  onLoadMore: () => void;
 }
 
 interface AnalyticsContentProps {
@@ -914,6 +917,8 @@ const ProfessionalsContent: React.FC<ProfessionalsContentProps> = ({
   professionals,
   onProfessionalSelect,
   onAddProfessional,
+  hasMore,
+  onLoadMore,
 }) => {
   return (
     <div className="space-y-6">
@@ -1015,6 +1020,17 @@ const ProfessionalsContent: React.FC<ProfessionalsContentProps> = ({
           </tbody>
         </table>
       </div>
+
+      {hasMore && (
+        <div className="flex justify-center">
+          <button
+            onClick={onLoadMore}
+            className="px-4 py-2 border border-indigo-600 text-indigo-600 rounded-md hover:bg-indigo-50 transition-colors"
+          >
+            Load more professionals
+          </button>
+        </div>
+      )}
     </div>
   );
 };
@@ -1482,6 +1498,9 @@ const AdminDashboard: React.FC = () => {
   const [users, setUsers] = useState<UserData[]>([]);
   const [alerts, setAlerts] = useState<AlertData[]>([]);
   const [professionals, setProfessionals] = useState<ProfessionalData[]>([]);
+  const [professionalsCursor, setProfessionalsCursor] = useState<
+    string | null
+  >(null);
   const [analytics, setAnalytics] = useState<AnalyticsData | null>(null);
   const [loading, setLoading] = useState(true);
   const [selectedAlert, setSelectedAlert] = useState<AlertData | null>(null);
@@ -1498,51 +1517,56 @@ const AdminDashboard: React.FC = () => {
   const [showAddProfessionalModal, setShowAddProfessionalModal] =
     useState(false);
 
+  // Map API data to ProfessionalData interface
+  const mapProfessional = (prof: ApiProfessional): ProfessionalData => ({
+    id:
+      typeof prof._id === "string"
+        ? parseInt(prof._id.replace(/\D/g, ""), 10) || prof._id
+        : prof._id,
+    name: prof.name,
+    email: prof.email,
+    phone: prof.phone || "",
+    hospital: prof.hospital || "",
+    active: prof.active !== undefined ? prof.active : true,
+    joinDate: prof.joinDate || new Date().toISOString().split("T")[0],
+    verified: prof.verified !== undefined ? prof.verified : false,
+    specialty: prof.specialty || "",
+    specializations: prof.specializations || [],
+    languages: prof.languages || [],
+    education: prof.education || "",
+    licenseNumber: prof.licenseNumber || "",
+    currentAssignments: prof.currentAssignments || [],
+    availabilityStatus: prof.availabilityStatus || "Available",
+    availableHours: prof.availableHours || "9 AM - 5 PM",
+    nextAvailableSlot: "",
+  });
+
+  // Load a page of professionals; without a cursor this replaces the list
+  const loadProfessionals = async (after: string | null = null) => {
+    const page = await fetchProfessionalsPage<ApiProfessional>({
+      fields: "full",
+      after,
+    });
+    const mapped = page.items.map(mapProfessional);
+    setProfessionals((previous) => (after ? [...previous, ...mapped] : mapped));
+    setProfessionalsCursor(page.nextCursor);
+  };
+
+  const handleLoadMoreProfessionals = async () => {
+    try {
+      await loadProfessionals(professionalsCursor);
+    } catch (error) {
+      console.error("Error fetching more professionals:", error);
+    }
+  };
+
   // Updated to fetch real professionals from the API
   useEffect(() => {
     const fetchData = async () => {
       setLoading(true);
       try {
-        // Fetch professionals from API
-        const professionalsResponse = await fetch(
-          "http://localhost:8000/api/professionals/"
-        );
-
-        if (!professionalsResponse.ok) {
-          throw new Error(
-            `Failed to fetch professionals: ${professionalsResponse.status}`
-          );
-        }
-
-        const professionalsData = await professionalsResponse.json();
-
-        // Map API data to ProfessionalData interface
-        const mappedProfessionals: ProfessionalData[] = professionalsData.map(
-          (prof: ApiProfessional) => ({
-            id:
-              typeof prof._id === "string"
-                ? parseInt(prof._id.replace(/\D/g, ""), 10) || prof._id
-                : prof._id,
-            name: prof.name,
-            email: prof.email,
-            phone: prof.phone || "",
-            hospital: prof.hospital || "",
-            active: prof.active !== undefined ? prof.active : true,
-            joinDate: prof.joinDate || new Date().toISOString().split("T")[0],
-            verified: prof.verified !== undefined ? prof.verified : false,
-            specialty: prof.specialty || "",
-            specializations: prof.specializations || [],
-            languages: prof.languages || [],
-            education: prof.education || "",
-            licenseNumber: prof.licenseNumber || "",
-            currentAssignments: prof.currentAssignments || [],
-            availabilityStatus: prof.availabilityStatus || "Available",
-            availableHours: prof.availableHours || "9 AM - 5 PM",
-            nextAvailableSlot: "",
-          })
-        );
-
-        setProfessionals(mappedProfessionals);
+        // Fetch the first page of professionals from the API
+        await loadProfessionals();
 
         // For completeness, still fetch other data
         setUsers(mockUsers);
@@ -1630,45 +1654,8 @@ const AdminDashboard: React.FC = () => {
         throw new Error(result.detail || `Server error: ${response.status}`);
       }
 
-      // After successful creation, refetch the professionals list to get updated data
-      const refreshResponse = await fetch(
-        "http://localhost:8000/api/professionals/"
-      );
-      if (!refreshResponse.ok) {
-        throw new Error(
-          `Failed to fetch professionals: ${refreshResponse.status}`
-        );
-      }
-
-      const refreshData = await refreshResponse.json();
-
-      // Map API data to ProfessionalData interface
-      const mappedProfessionals: ProfessionalData[] = refreshData.map(
-        (prof: ApiProfessional) => ({
-          id:
-            typeof prof._id === "string"
-              ? parseInt(prof._id.replace(/\D/g, ""), 10) || prof._id
-              : prof._id,
-          name: prof.name,
-          email: prof.email,
-          phone: prof.phone || "",
-          hospital: prof.hospital || "",
-          active: prof.active !== undefined ? prof.active : true,
-          joinDate: prof.joinDate || new Date().toISOString().split("T")[0],
-          verified: prof.verified !== undefined ? prof.verified : false,
-          specialty: prof.specialty || "",
-          specializations: prof.specializations || [],
-          languages: prof.languages || [],
-          education: prof.education || "",
-          licenseNumber: prof.licenseNumber || "",
-          currentAssignments: prof.currentAssignments || [],
-          availabilityStatus: prof.availabilityStatus || "Available",
-          availableHours: prof.availableHours || "9 AM - 5 PM",
-          nextAvailableSlot: "",
-        })
-      );
-
-      setProfessionals(mappedProfessionals);
+      // After successful creation, reload the first page to get updated data
+      await loadProfessionals();
       setShowAddProfessionalModal(false);
 
       // Show success message
@@ -1916,6 +1903,8 @@ const AdminDashboard: React.FC = () => {
                   professionals={filteredProfessionals}
                   onProfessionalSelect={handleProfessionalSelect}
                   onAddProfessional={() => setShowAddProfessionalModal(true)}
+                  hasMore={professionalsCursor !== null}
+                  onLoadMore={handleLoadMoreProfessionals}
                 />
               )}
 
@@ -9,13 +9,12 @@ import {
   User,
   Filter,
   Search,
-  ChevronLeft,
-  ChevronRight,
   X,
 } from "lucide-react";
 import Footer from "../components/Footer";
 import Navbar from "../components/Navbar";
 import { useAuth } from "../context/AuthContext"; // Import useAuth
+import { fetchProfessionalsPage } from "../services/professionalsService";
 
 // Types
 interface Doctor {
@@ -72,6 +71,8 @@ const DoctorChannelPage: React.FC = () => {
 
   const [doctors, setDoctors] = useState<Doctor[]>([]);
   const [loading, setLoading] = useState<boolean>(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
   const [filters, setFilters] = useState<FilterOptions>({
     searchTerm: "",
     specialty: "All",
@@ -188,22 +189,29 @@ const DoctorChannelPage: React.FC = () => {
     };
   };
 
-  // Fetch doctors from database
+  // Specialty and language are filtered by the API; the search box also
+  // matches hospitals and price is derived here, so those stay client-side
+  const serverFilters = {
+    specialty: filters.specialty !== "All" ? filters.specialty : undefined,
+    language:
+      filters.language && filters.language !== "All"
+        ? filters.language
+        : undefined,
+  };
+
+  // Fetch the first page of doctors from database
   useEffect(() => {
     const fetchDoctors = async () => {
       try {
         setLoading(true);
 
-        // Fetch professionals from your API
-        const response = await fetch(
-          "http://localhost:8000/api/professionals/"
-        );
-
-        if (!response.ok) {
-          throw new Error(`API returned status: ${response.status}`);
-        }
-
-        const data = await response.json();
+        // Fetch the first page of professionals matching the filters
+        const page = await fetchProfessionalsPage<ApiProfessional>({
+          fields: "card",
+          filters: serverFilters,
+        });
+        const data = page.items;
+        setNextCursor(page.nextCursor);
 
         if (Array.isArray(data)) {
           // Convert API data to Doctor format
@@ -254,7 +262,7 @@ const DoctorChannelPage: React.FC = () => {
           const allDoctors = [...processedDoctors];
 
           // Only add mock doctors if we have fewer than 3 real doctors
-          if (processedDoctors.length < 3) {
+          if (processedDoctors.length < 3 && !page.nextCursor) {
             allDoctors.push(...mockDoctors);
           }
 
@@ -275,7 +283,29 @@ const DoctorChannelPage: React.FC = () => {
     };
 
     fetchDoctors();
-  }, []);
+  }, [filters.specialty, filters.language]);
+
+  // Append the next page of doctors
+  const loadMoreDoctors = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await fetchProfessionalsPage<ApiProfessional>({
+        fields: "card",
+        after: nextCursor,
+        filters: serverFilters,
+      });
+      setDoctors((previous) => [
+        ...previous,
+        ...page.items.map(convertToDoctor),
+      ]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error("Error fetching more doctors:", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   // Filter doctors based on filters
   const filteredDoctors = doctors.filter((doctor) => {
@@ -869,20 +899,16 @@ const DoctorChannelPage: React.FC = () => {
         </div>
       )}
 
-      {/* Pagination (for future use) */}
-      {filteredDoctors.length > 0 && (
+      {/* Load the next page of doctors */}
+      {!loading && nextCursor && (
         <div className="mt-8 flex justify-center">
-          <nav className="flex items-center space-x-2">
-            <button className="px-3 py-2 rounded-md border border-gray-300 text-gray-500 bg-white hover:bg-gray-50">
-              <ChevronLeft className="h-5 w-5" />
-            </button>
-            <span className="px-4 py-2 rounded-md border border-indigo-500 bg-indigo-50 text-indigo-700 font-medium">
-              1
-            </span>
-            <button className="px-3 py-2 rounded-md border border-gray-300 text-gray-500 bg-white hover:bg-gray-50">
-              <ChevronRight className="h-5 w-5" />
-            </button>
-          </nav>
+          <button
+            onClick={loadMoreDoctors}
+            disabled={loadingMore}
+            className="px-4 py-2 rounded-md border border-indigo-500 bg-indigo-50 text-indigo-700 font-medium hover:bg-indigo-100 disabled:opacity-50"
+          >
+            {loadingMore ? "Loading..." : "Load more doctors"}
+          </button>
         </div>
       )}
       <Footer />
@@ -287,9 +287,13 @@ const ChatbotChat: React.FC = () => {
     setIsLoading(true);
 
     try {
-      const response = await axios.post("http://127.0.0.1:8000/predict/", {
-        statement: textToSend,
-      });
+      // Signed-in users send their token so the result is added to their mood timeline
+      const token = localStorage.getItem("access_token");
+      const response = await axios.post(
+        "http://127.0.0.1:8000/predict/",
+        { statement: textToSend },
+        token ? { headers: { Authorization: `Bearer ${token}` } } : undefined
+      );
       setIsLoading(false);
       const sentiment = response.data.sentiment;
       const confidence = response.data.confidence;
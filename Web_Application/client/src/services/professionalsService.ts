@@ -0,0 +1,49 @@
+// client/src/services/professionalsService.ts
+
+const PROFESSIONALS_URL = "http://localhost:8000/api/professionals/";
+const PAGE_SIZE = 50;
+
+// Filters the listing applies on the server; unset ones match everything
+export interface ProfessionalFilters {
+  specialty?: string;
+  language?: string;
+  q?: string;
+  active?: boolean;
+  verified?: boolean;
+  availabilityStatus?: string;
+}
+
+export interface ProfessionalsPage<T> {
+  items: T[];
+  // Pass back as `after` for the next page; null on the last one
+  nextCursor: string | null;
+}
+
+// Fetches one page of professionals in _id order, following X-Next-Cursor.
+// "card" leaves out license paths, assignments and audit fields.
+export async function fetchProfessionalsPage<T>({
+  fields = "card",
+  limit = PAGE_SIZE,
+  after = null,
+  filters = {},
+}: {
+  fields?: "card" | "full";
+  limit?: number;
+  after?: string | null;
+  filters?: ProfessionalFilters;
+} = {}): Promise<ProfessionalsPage<T>> {
+  const params = new URLSearchParams({ fields, limit: String(limit) });
+  if (after) params.set("after", after);
+  Object.entries(filters).forEach(([key, value]) => {
+    if (value !== undefined && value !== "") params.set(key, String(value));
+  });
+
+  const response = await fetch(`${PROFESSIONALS_URL}?${params}`);
+  if (!response.ok) {
+    throw new Error(`Failed to fetch professionals: ${response.status}`);
+  }
+  return {
+    items: await response.json(),
+    nextCursor: response.headers.get("X-Next-Cursor"),
+  };
+}
@@ -1,13 +1,27 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
+from server.app.api.dependencies import require_current_user_email
 from server.app.models.user import UserIn, UserOut, LoginRequest, Token
-from server.app.services.auth_service import register_user, login_user
+from server.app.services.auth_service import register_user, login_user, password_hasher, token_cache
 
 router = APIRouter()
 
 @router.post("/register", response_model=UserOut)
-def register(user: UserIn):
-    return register_user(user)
+async def register(user: UserIn):
+    return await register_user(user)
 
 @router.post("/login", response_model=Token)
-def login(request: LoginRequest):
-    return login_user(request.email, request.password)
+async def login(request: LoginRequest):
+    return await login_user(request.email, request.password)
+
+@router.get("/auth/validate")
+async def validate_token(email: str = Depends(require_current_user_email)):
+    # Polled by the client's AuthContext; repeat checks are served from the token cache
+    return {"valid": True, "email": email}
+
+@router.get("/auth/token-cache/stats")
+async def token_cache_stats():
+    return token_cache.stats()
+
+@router.get("/auth/hashing/stats")
+async def password_hashing_stats():
+    return password_hasher.stats()
@@ -1,5 +1,17 @@
 # server/app/api/chat_socket.py
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+import json
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from server.app.api.dependencies import require_current_user_email
+from server.app.api.sentiment import inference_executor, model_registry
+from server.app.services.chat_tagging import (
+    CHAT_SENTIMENT_COLLECTION,
+    CHAT_SENTIMENT_PERSIST,
+    CHAT_SENTIMENT_PUBLISH,
+    ChatSentimentTagger,
+)
+from server.app.services.model_registry import score_statements_with_model
+from server.app.services.statement_limits import cap_statement
+from server.app.utils.database import get_write_behind_buffer
 
 router = APIRouter()
 
@@ -7,6 +19,8 @@ class ConnectionManager:
     def __init__(self):
         # Mapping room IDs to lists of WebSocket connections
         self.active_connections: dict[str, list[WebSocket]] = {}
+        # Messages relayed per room, used to refer to a message in follow-up events
+        self.sequences: dict[str, int] = {}
 
     async def connect(self, room_id: str, websocket: WebSocket):
         await websocket.accept()
@@ -18,6 +32,11 @@ class ConnectionManager:
         self.active_connections[room_id].remove(websocket)
         if not self.active_connections[room_id]:
             del self.active_connections[room_id]
+            self.sequences.pop(room_id, None)
+
+    def next_sequence(self, room_id: str) -> int:
+        self.sequences[room_id] = self.sequences.get(room_id, 0) + 1
+        return self.sequences[room_id]
 
     async def broadcast(self, room_id: str, message: str, sender: WebSocket):
         """Send the message to all connections in the room except the sender."""
@@ -28,6 +47,24 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+async def score_chat_messages(texts: list[str]):
+    # Same model version and length cap as /predict/batch, scored on the inference workers
+    source = model_registry.route_batch()
+    statements = [cap_statement(text)[0] for text in texts]
+    return source.version, await inference_executor.run(score_statements_with_model, statements, source)
+
+async def publish_sentiment(room_id: str, tag: dict):
+    # Follow-up event to everyone in the room, the sender included
+    await manager.broadcast(room_id, json.dumps(tag), sender=None)
+
+# Tags every relayed message without delaying its delivery
+chat_sentiment_tagger = ChatSentimentTagger(
+    score_chat_messages,
+    publish=publish_sentiment if CHAT_SENTIMENT_PUBLISH == "room" else None,
+    # Batched through the shared write-behind buffer instead of an insert per message
+    record=get_write_behind_buffer(CHAT_SENTIMENT_COLLECTION).add if CHAT_SENTIMENT_PERSIST == "database" else None,
+)
+
 @router.websocket("/ws/{room_id}")
 async def websocket_endpoint(websocket: WebSocket, room_id: str):
     await manager.connect(room_id, websocket)
@@ -36,5 +73,14 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str):
             data = await websocket.receive_text()
             # Broadcast the message to all clients except the sender.
             await manager.broadcast(room_id, data, websocket)
+            chat_sentiment_tagger.submit(room_id, manager.next_sequence(room_id), data)
     except WebSocketDisconnect:
         manager.disconnect(room_id, websocket)
+
+@router.get("/chat/sentiment/stats", dependencies=[Depends(require_current_user_email)])
+async def chat_sentiment_stats():
+    return chat_sentiment_tagger.stats()
+
+@router.get("/chat/sentiment/{room_id}", dependencies=[Depends(require_current_user_email)])
+async def chat_room_sentiment(room_id: str):
+    return {"room_id": room_id, "tags": chat_sentiment_tagger.room_tags(room_id)}
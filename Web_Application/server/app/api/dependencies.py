@@ -0,0 +1,40 @@
+# server/app/api/dependencies.py
+import os
+from typing import Optional
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+
+# Bearer token of the caller; missing tokens are left to the dependencies below
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login", auto_error=False)
+
+# Signed-in users allowed on admin-only routes, as comma-separated emails
+ADMIN_EMAILS = {email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()}
+
+async def get_current_user_email(token: Optional[str] = Depends(oauth2_scheme)) -> Optional[str]:
+    # Anonymous callers get None, and so do callers with an expired or invalid
+    # token; require_current_user_email turns that into a 401
+    if token is None:
+        return None
+    # Imported here so routers using this work without the database/JWT configuration
+    from server.app.services.auth_service import get_email_from_token
+    try:
+        return get_email_from_token(token)
+    except HTTPException as e:
+        if e.status_code != status.HTTP_401_UNAUTHORIZED:
+            raise
+        return None
+
+async def require_current_user_email(email: Optional[str] = Depends(get_current_user_email)) -> str:
+    if email is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return email
+
+async def require_admin_email(email: str = Depends(require_current_user_email)) -> str:
+    # A verified token alone is not enough; the email has to be listed in ADMIN_EMAILS
+    if email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return email
@@ -0,0 +1,32 @@
+# server/app/api/live_sentiment_socket.py
+import asyncio
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from server.app.api.sentiment import model_registry
+from server.app.models.preprocessing import get_text_preprocessor
+from server.app.services.live_scoring import LiveScoringSession
+
+router = APIRouter()
+
+def active_model():
+    # Live feedback follows the active version; canary splits apply to /predict/ only,
+    # so a session never flips between versions mid-typing
+    return model_registry.active
+
+@router.websocket("/ws/sentiment")
+async def live_sentiment_endpoint(websocket: WebSocket):
+    await websocket.accept()
+    session = LiveScoringSession(websocket.send_json, active_model, get_text_preprocessor())
+    sender = asyncio.ensure_future(session.run())
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                session.receive(message)
+            except ValueError as e:
+                await websocket.send_json({"error": str(e)})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
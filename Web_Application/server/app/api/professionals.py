@@ -1,16 +1,40 @@
-from fastapi import APIRouter, File, Form, UploadFile, HTTPException, Depends, Header
+from fastapi import APIRouter, File, Form, UploadFile, HTTPException, Depends, Header, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 import json
 import os
+import re
 from datetime import datetime
 import shutil
 import uuid
 import logging
-from server.app.utils.database import db  # Make sure this path matches your project structure
+from bson import ObjectId
+from server.app.api.dependencies import require_admin_email
+from server.app.utils.database import get_async_database
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Professionals per listing page unless ?limit= asks for another size, up to the maximum
+PROFESSIONALS_PAGE_SIZE = int(os.getenv("PROFESSIONALS_PAGE_SIZE", "50"))
+PROFESSIONALS_MAX_PAGE_SIZE = int(os.getenv("PROFESSIONALS_MAX_PAGE_SIZE", "200"))
+# Documents fetched per round trip while streaming an export
+PROFESSIONALS_EXPORT_BATCH_SIZE = int(os.getenv("PROFESSIONALS_EXPORT_BATCH_SIZE", "500"))
+
+# Fields returned per profile; None returns the whole document.
+# Cards are what listings need, without license paths, assignments or audit fields
+PROJECTIONS = {
+    "card": {
+        field: 1 for field in (
+            "name", "specialty", "specializations", "languages", "hospital", "education", "joinDate",
+            "active", "verified", "availabilityStatus", "availableHours", "nextAvailableSlot", "profileImagePath",
+        )
+    },
+    "full": None,
+}
+PROFILE_PATTERN = f"^({'|'.join(PROJECTIONS)})$"
+
 
 # Helper function to save uploaded files
 async def save_upload_file(upload_file: UploadFile, folder: str) -> str:
@@ -119,8 +143,7 @@ async def create_professional(
 
         # Save to database
         logger.info("Saving professional to database")
-        professionals_collection = db["professionals"]
-        result = professionals_collection.insert_one(professional)
+        result = await get_async_database()["professionals"].insert_one(professional)
 
         # Return the new professional with ID
         professional["_id"] = str(result.inserted_id)
@@ -137,20 +160,100 @@ async def create_professional(
         raise HTTPException(status_code=500, detail=f"Failed to create professional: {str(e)}")
 
 
-# Get all professionals
+def professional_filter(
+        specialty: Optional[str] = Query(None),
+        active: Optional[bool] = Query(None),
+        verified: Optional[bool] = Query(None),
+        availabilityStatus: Optional[str] = Query(None),
+        language: Optional[str] = Query(None),
+        q: Optional[str] = Query(None, min_length=1, max_length=100, description="Part of the name, any case"),
+) -> dict:
+    """The MongoDB filter for the listing and export query parameters."""
+    query = {}
+    if specialty is not None:
+        query["specialty"] = specialty
+    if active is not None:
+        query["active"] = active
+    if verified is not None:
+        query["verified"] = verified
+    if availabilityStatus is not None:
+        query["availabilityStatus"] = availabilityStatus
+    if language is not None:
+        # Matches any element of the languages array
+        query["languages"] = language
+    if q is not None:
+        query["name"] = {"$regex": re.escape(q), "$options": "i"}
+    return query
+
+
+def serialize_professional(professional: dict) -> dict:
+    # Convert ObjectId to string for JSON serialization
+    professional["_id"] = str(professional["_id"])
+    if "createdBy" in professional and professional["createdBy"]:
+        professional["createdBy"] = str(professional["createdBy"])
+    return professional
+
+
+# Get a page of professionals
 @router.get("/")
-async def get_professionals(current_user: dict = Depends(get_admin_user)):
-    try:
-        professionals_collection = db["professionals"]
-        professionals = list(professionals_collection.find({}))
+async def get_professionals(
+        response: Response,
+        query: dict = Depends(professional_filter),
+        fields: str = Query("card", pattern=PROFILE_PATTERN),
+        limit: int = Query(PROFESSIONALS_PAGE_SIZE, ge=1, le=PROFESSIONALS_MAX_PAGE_SIZE),
+        after: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+        current_user: dict = Depends(get_admin_user),
+):
+    """Professionals in ``_id`` order, one page at a time.
 
-        # Convert ObjectId to string for JSON serialization
-        for professional in professionals:
-            professional["_id"] = str(professional["_id"])
-            if "createdBy" in professional and professional["createdBy"]:
-                professional["createdBy"] = str(professional["createdBy"])
+    Pages are keyed on ``_id`` rather than skipped over, so each page costs
+    the same however deep it is. While more remain, the ``X-Next-Cursor``
+    header holds the value to pass as ``after`` for the next page.
+    """
+    if after is not None:
+        if not ObjectId.is_valid(after):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query["_id"] = {"$gt": ObjectId(after)}
 
-        return professionals
+    try:
+        # One extra document tells whether there is a next page
+        cursor = get_async_database()["professionals"].find(query, PROJECTIONS[fields]).sort("_id", 1)
+        professionals = await cursor.limit(limit + 1).to_list(length=limit + 1)
     except Exception as e:
         logger.error(f"Error retrieving professionals: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to retrieve professionals: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve professionals: {str(e)}")
+
+    if len(professionals) > limit:
+        professionals = professionals[:limit]
+        response.headers["X-Next-Cursor"] = str(professionals[-1]["_id"])
+    return [serialize_professional(professional) for professional in professionals]
+
+
+async def stream_professionals(cursor):
+    """The cursor's documents as one JSON array, encoded as they arrive."""
+    yield "["
+    first = True
+    async for professional in cursor:
+        yield ("" if first else ",") + json.dumps(jsonable_encoder(serialize_professional(professional)))
+        first = False
+    yield "]"
+
+
+# Export every matching professional
+@router.get("/export")
+async def export_professionals(
+        query: dict = Depends(professional_filter),
+        fields: str = Query("card", pattern=PROFILE_PATTERN),
+        admin_email: str = Depends(require_admin_email),
+):
+    """All matching professionals as a streamed JSON array, without holding them in memory.
+
+    Only listed admins may export, and ``fields=full`` (license paths,
+    assignments, audit fields) has to be asked for explicitly.
+    """
+    cursor = get_async_database()["professionals"].find(query, PROJECTIONS[fields]).sort("_id", 1)
+    return StreamingResponse(
+        stream_professionals(cursor.batch_size(PROFESSIONALS_EXPORT_BATCH_SIZE)),
+        media_type="application/json",
+        headers={"Content-Disposition": 'attachment; filename="professionals.json"'},
+    )
\ No newline at end of file
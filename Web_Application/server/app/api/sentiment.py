@@ -1,24 +1,235 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
-from server.app.models.sentiment_model import predict_sentiment
-from server.app.models.preprocessing import preprocess_text
+import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from server.app.api.dependencies import get_current_user_email, require_current_user_email
+from server.app.services.bulk_scoring import (
+    BULK_SCORING_MAX_ROWS,
+    CSV_CONTENT_TYPES,
+    NDJSON_CONTENT_TYPES,
+    iter_csv_rows,
+    iter_lines,
+    iter_ndjson_rows,
+    stream_scores,
+)
+from server.app.services.inference_executor import InferenceExecutor, InferenceQueueFull
+from server.app.services.inference_scheduler import InferenceScheduler
+from server.app.services.drift_monitor import DRIFT_TOP_K, DriftMonitors
+from server.app.services.mood_timeline import ROLLUP_PERIODS, MoodTimelineStore
+from server.app.services.model_registry import (
+    ModelRegistry,
+    get_loaded_model,
+    predict_windows_with_model,
+    predict_with_model,
+    score_statements_with_model,
+)
+from server.app.services.prediction_cache import PredictionCache
+from server.app.services.statement_limits import (
+    LONG_STATEMENT_AGGREGATE,
+    LONG_STATEMENT_MODE,
+    cap_statement,
+    prepare_statement,
+)
+from server.app.utils.database import register_write_behind_buffer
+
+# Upper bound on statements accepted by a single batch request
+MAX_BATCH_SIZE = 1000
 
 # Pydantic model for input validation
 class StatementRequest(BaseModel):
     statement: str
+    # Handling of statements over STATEMENT_MAX_CHARS; defaults come from the environment
+    long_text: Optional[Literal["truncate", "window"]] = None
+    aggregate: Optional[Literal["mean", "max"]] = None
+
+class BatchStatementRequest(BaseModel):
+    statements: List[str] = Field(..., max_length=MAX_BATCH_SIZE)
 
 # Initialize API router
 router = APIRouter()
 
+# CPU-bound scoring runs on the backend chosen by INFERENCE_BACKEND
+inference_executor = InferenceExecutor()
+
+# Active model version plus any canary/shadow candidate
+model_registry = ModelRegistry(inference_executor)
+
+# Concurrent single-statement requests are coalesced into per-version micro-batches
+inference_scheduler = InferenceScheduler(predict_with_model, executor=inference_executor)
+
+# Final predictions keyed on the preprocessed statement
+prediction_cache = PredictionCache()
+
+# Output distribution of each served model version, for spotting drift
+drift_monitors = DriftMonitors()
+
+# Per-user prediction history and daily/weekly rollups, written in batches
+# through a buffer in the shared write-behind registry
+mood_timeline = MoodTimelineStore()
+register_write_behind_buffer(mood_timeline.buffer)
+
+class RequestBodyStreamingResponse(StreamingResponse):
+    """StreamingResponse for generators that are still reading the request body.
+
+    The stock response watches for client disconnects by reading from
+    ``receive`` while it streams, which would swallow the body chunks the
+    generator is waiting for. Here a disconnect surfaces as a failed send.
+    """
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+def inference_unavailable() -> HTTPException:
+    # Raised when the inference queue is saturated so clients back off
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Sentiment service is busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/predict/")
-async def predict_sentiment_endpoint(request: StatementRequest):
-    # Preprocess the input statement
-    processed_text = preprocess_text(request.statement)
+async def predict_sentiment_endpoint(
+        request: StatementRequest,
+        user_email: Optional[str] = Depends(get_current_user_email),
+):
+    # Preprocess the input statement; long ones are truncated or split into
+    # sentence windows so the work per request stays bounded
+    prepared = prepare_statement(request.statement, request.long_text or LONG_STATEMENT_MODE)
+
+    if prepared.windowed:
+        # All windows are scored together and aggregated on the worker
+        aggregate = request.aggregate or LONG_STATEMENT_AGGREGATE
+        cache_key = (aggregate,) + prepared.windows
+
+        def score(key, source):
+            return inference_executor.run(predict_windows_with_model, list(key[1:]), source, aggregate)
+    else:
+        cache_key = prepared.windows[0]
+        score = inference_scheduler.submit
+
+    # Routing depends only on the statement, so cached results stay valid
+    # until the registry's generation changes
+    route = model_registry.route("\n".join(prepared.windows))
+
+    async def compute():
+        result = await score(cache_key, route.serve)
+        if route.shadow is not None:
+            model_registry.compare_in_background(score, cache_key, result, route.shadow)
+        return result
+
+    # Predict sentiment and confidence scores, reusing cached or in-flight results
+    try:
+        sentiment, confidence_scores = await prediction_cache.get_or_compute(
+            cache_key,
+            model_registry.generation,
+            compute,
+        )
+    except InferenceQueueFull:
+        raise inference_unavailable()
 
-    # Predict sentiment and confidence scores
-    sentiment, confidence_scores = predict_sentiment(processed_text)
+    drift_monitors.get(
+        route.serve.version,
+        lambda: get_loaded_model(route.serve).vocabulary.__contains__,
+    ).record(sentiment, max(confidence_scores), prepared.windows[0])
+
+    if user_email is not None:
+        labels = get_loaded_model(route.serve).labels
+        mood_timeline.record(user_email, sentiment, dict(zip(labels, confidence_scores)), route.serve.version)
 
     return {
         "sentiment": sentiment,
-        "confidence": confidence_scores
+        "confidence": confidence_scores,
+        "model_version": route.serve.version,
+        "truncated": prepared.truncated,
+        "windows": len(prepared.windows)
+    }
+
+@router.post("/predict/batch")
+async def predict_sentiment_batch_endpoint(request: BatchStatementRequest):
+    # Cap each statement, then preprocess and score them together as one matrix
+    statements, truncated = zip(*map(cap_statement, request.statements)) if request.statements else ((), ())
+    source = model_registry.route_batch()
+    try:
+        predictions = await inference_executor.run(score_statements_with_model, list(statements), source)
+    except InferenceQueueFull:
+        raise inference_unavailable()
+
+    return {
+        "model_version": source.version,
+        "results": [
+            {"sentiment": sentiment, "confidence": confidence_scores, "truncated": was_truncated}
+            for (sentiment, confidence_scores), was_truncated in zip(predictions, truncated)
+        ]
     }
+
+@router.post("/predict/stream")
+async def predict_sentiment_stream_endpoint(
+        request: Request,
+        max_rows: Optional[int] = Query(None, ge=1, le=BULK_SCORING_MAX_ROWS),
+):
+    # Rows are parsed as the body arrives and results are streamed back as NDJSON,
+    # so neither the upload nor the response is ever held in memory
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_CONTENT_TYPES:
+        rows = iter_ndjson_rows(iter_lines(request.stream()))
+    elif content_type in CSV_CONTENT_TYPES:
+        rows = iter_csv_rows(iter_lines(request.stream()))
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Expected one of {', '.join(NDJSON_CONTENT_TYPES + CSV_CONTENT_TYPES)}",
+        )
+
+    # One version scores the whole upload
+    source = model_registry.route_batch()
+
+    def score_chunk(statements):
+        return inference_executor.run(score_statements_with_model, statements, source)
+
+    return RequestBodyStreamingResponse(
+        stream_scores(rows, score_chunk, source.version, max_rows=max_rows or BULK_SCORING_MAX_ROWS),
+        media_type="application/x-ndjson",
+        headers={"X-Model-Version": source.version},
+    )
+
+@router.get("/predict/timeline")
+def mood_timeline_endpoint(
+        period: str = Query("day", pattern=f"^({'|'.join(ROLLUP_PERIODS)})$"),
+        days: int = Query(30, ge=1, le=366),
+        user_email: str = Depends(require_current_user_email),
+):
+    # One rollup document per day or week, read straight from the rollup collection
+    since = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days - 1)
+    return {"period": period, "buckets": mood_timeline.timeline(user_email, period, since)}
+
+@router.get("/predict/timeline/stats")
+async def mood_timeline_stats():
+    return mood_timeline.stats()
+
+@router.get("/admin/sentiment/drift", dependencies=[Depends(require_current_user_email)])
+async def sentiment_drift(top_k: int = Query(DRIFT_TOP_K, ge=1, le=256)):
+    return drift_monitors.snapshot(top_k)
+
+@router.post("/admin/sentiment/drift/reset", dependencies=[Depends(require_current_user_email)])
+async def reset_sentiment_drift():
+    drift_monitors.reset()
+    return {"message": "Drift monitors reset"}
+
+@router.get("/predict/cache/stats")
+async def prediction_cache_stats():
+    return prediction_cache.stats()
+
+@router.get("/predict/executor/stats")
+async def inference_executor_stats():
+    return inference_executor.stats()
+
+@router.get("/predict/models")
+async def model_registry_stats():
+    return model_registry.stats()
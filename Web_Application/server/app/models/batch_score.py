@@ -0,0 +1,199 @@
+import os
+import time
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+from server.app.models import model_loader
+from server.app.models.model_artifact import MODEL_ARTIFACT_DIRECTORY
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+BATCH_SCORE_CHUNK_SIZE = int(os.getenv("BATCH_SCORE_CHUNK_SIZE", "5000"))
+OUTPUT_FORMATS = ("csv", "parquet")
+
+# Model components and preprocessor of this (worker) process
+_worker_state = {}
+
+
+def _initialize_worker(model_dir: str, artifact_dir: Optional[str], scorer: str):
+    # Load once per process; chunks only carry the statements
+    from server.app.models.preprocessing import get_text_preprocessor
+
+    _worker_state["components"] = model_loader.load_model_components(model_dir, artifact_dir, scorer)
+    _worker_state["preprocess"] = get_text_preprocessor()
+
+
+def _score_chunk(statements: List[str]):
+    """Preprocess and score one chunk; returns labels, probabilities and class names."""
+    components = _worker_state["components"]
+    preprocess = _worker_state["preprocess"]
+    results = model_loader.score_batch(
+        [preprocess(statement) for statement in statements],
+        components["model"],
+        components["vectorizer"],
+        components["linear_scorer"],
+        components["label_encoder"],
+    )
+    scorer = components["linear_scorer"] or components["model"]
+    classes = [str(label) for label in components["label_encoder"].inverse_transform(scorer.classes_)]
+    sentiments = [sentiment for sentiment, _ in results]
+    probabilities = np.array([confidence for _, confidence in results], dtype=np.float64).reshape(len(results), -1)
+    return sentiments, probabilities, classes
+
+
+class _OutputWriter:
+    """Appends scored chunks to a CSV or Parquet file."""
+
+    def __init__(self, path: str, output_format: str):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format '{output_format}', expected one of {OUTPUT_FORMATS}")
+        self.path = path
+        self.output_format = output_format
+        self._parquet_writer = None
+        self._wrote_header = False
+
+    def write(self, frame):
+        if self.output_format == "csv":
+            frame.to_csv(self.path, mode="a" if self._wrote_header else "w", header=not self._wrote_header, index=False)
+            self._wrote_header = True
+            return
+
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+        self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def score_csv(
+        input_path: str,
+        output_path: str,
+        output_format: Optional[str] = None,
+        statement_column: str = "Statement",
+        chunk_size: int = BATCH_SCORE_CHUNK_SIZE,
+        workers: int = os.cpu_count() or 1,
+        probabilities: bool = False,
+        model_dir: str = model_loader.data_directory,
+        artifact_dir: Optional[str] = MODEL_ARTIFACT_DIRECTORY,
+        scorer: str = model_loader.SENTIMENT_SCORER,
+) -> dict:
+    """Score every row of ``input_path`` and write the input plus predictions.
+
+    The file is read ``chunk_size`` rows at a time and chunks are fanned out
+    to ``workers`` processes (0 scores in this process), keeping at most two
+    chunks per worker in flight so memory does not grow with the file size.
+    Output rows keep the input order. Returns row count, time and rows/sec.
+    """
+    import pandas as pd
+
+    output_format = output_format or ("parquet" if output_path.endswith(".parquet") else "csv")
+    writer = _OutputWriter(output_path, output_format)
+    initargs = (model_dir, artifact_dir, scorer)
+
+    if workers > 0:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialize_worker,
+            initargs=initargs,
+        )
+        submit = pool.submit
+    else:
+        pool = None
+        _initialize_worker(*initargs)
+
+        def submit(fn, *args):
+            # Run synchronously behind the same interface as the pool
+            future = Future()
+            future.set_result(fn(*args))
+            return future
+
+    rows = 0
+    started_at = time.perf_counter()
+    pending = deque()
+
+    def write_oldest():
+        nonlocal rows
+        frame, future = pending.popleft()
+        sentiments, probs, classes = future.result()
+        frame["sentiment"] = sentiments
+        frame["confidence"] = probs.max(axis=1) if len(probs) else []
+        if probabilities:
+            for i, label in enumerate(classes):
+                frame[f"p_{label}"] = probs[:, i]
+        writer.write(frame)
+        rows += len(frame)
+        elapsed = time.perf_counter() - started_at
+        logger.info(f"Scored {rows} rows ({rows / elapsed:,.0f} rows/sec)")
+
+    try:
+        for frame in pd.read_csv(input_path, chunksize=chunk_size):
+            if statement_column not in frame.columns:
+                raise ValueError(f"Input has no '{statement_column}' column")
+            statements = frame[statement_column].fillna("").astype(str).tolist()
+            pending.append((frame, submit(_score_chunk, statements)))
+            if len(pending) >= max(1, workers) * 2:
+                write_oldest()
+        while pending:
+            write_oldest()
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.perf_counter() - started_at
+    return {
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed > 0 else 0.0,
+        "workers": workers,
+        "output": output_path,
+        "format": output_format,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Score a CSV of statements with the served sentiment model")
+    parser.add_argument("input", help="CSV with a Statement column, e.g. 'Mental Health Sentiments.csv'")
+    parser.add_argument("output", help="Output file; .parquet writes Parquet, anything else CSV")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS)
+    parser.add_argument("--statement-column", default="Statement")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_SCORE_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="0 scores in this process")
+    parser.add_argument("--probabilities", action="store_true", help="Add a p_<label> column per class")
+    parser.add_argument("--model-dir", default=model_loader.data_directory)
+    parser.add_argument("--scorer", default=model_loader.SENTIMENT_SCORER, choices=("auto", "sklearn", "linear"))
+    args = parser.parse_args()
+
+    artifact_dir = MODEL_ARTIFACT_DIRECTORY if args.model_dir == model_loader.data_directory else os.path.join(args.model_dir, "model_artifact")
+    summary = score_csv(
+        args.input,
+        args.output,
+        args.format,
+        args.statement_column,
+        args.chunk_size,
+        args.workers,
+        args.probabilities,
+        args.model_dir,
+        artifact_dir,
+        args.scorer,
+    )
+    print(f"Scored {summary['rows']} rows in {summary['seconds']:.1f}s "
+          f"({summary['rows_per_sec']:,.0f} rows/sec, {summary['workers']} workers) -> {summary['output']}")
@@ -0,0 +1,287 @@
+import os
+import copy
+import time
+import pickle
+import shutil
+import logging
+from typing import List, Optional, Sequence
+
+import joblib
+import numpy as np
+
+from server.app.models.linear_scorer import LinearScorer, export_linear_model
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Storage types for the coefficient matrix; int8 keeps a per-class scale
+QUANTIZATION_MODES = ("float64", "float32", "float16", "int8")
+
+# Thresholds on max |coef| across classes swept when no operating point is given
+DEFAULT_THRESHOLDS = (0.0, 0.01, 0.05, 0.1, 0.25)
+
+
+def feature_importance(coef: np.ndarray) -> np.ndarray:
+    """Largest absolute coefficient of each feature across all classes."""
+    return np.abs(np.asarray(coef)).max(axis=0)
+
+
+def prune_arrays(arrays: dict, threshold: float) -> dict:
+    """Drop the features whose coefficients are below ``threshold`` in every class."""
+    keep = np.flatnonzero(feature_importance(arrays["coef"]) >= threshold)
+    pruned = dict(arrays)
+    pruned["terms"] = [arrays["terms"][i] for i in keep]
+    pruned["idf"] = np.asarray(arrays["idf"])[keep]
+    pruned["coef"] = np.asarray(arrays["coef"])[:, keep]
+    return pruned
+
+
+def quantize_arrays(arrays: dict, mode: str) -> dict:
+    """Store the coefficients as ``mode``; int8 uses a symmetric per-class scale."""
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode '{mode}'")
+    coef = np.asarray(arrays["coef"], dtype=np.float64)
+    quantized = dict(arrays)
+    if mode == "int8":
+        scale = np.abs(coef).max(axis=1) / 127.0 if coef.size else np.ones(coef.shape[0])
+        scale[scale == 0] = 1.0
+        quantized["coef"] = np.round(coef / scale[:, None]).astype(np.int8)
+        quantized["coef_scale"] = scale
+    else:
+        quantized["coef"] = coef.astype(mode)
+        quantized["coef_scale"] = None
+    return quantized
+
+
+def dequantized_coef(arrays: dict) -> np.ndarray:
+    """The float64 coefficients a (possibly quantized) export actually scores with."""
+    coef = np.asarray(arrays["coef"], dtype=np.float64)
+    if arrays.get("coef_scale") is not None:
+        coef = coef * np.asarray(arrays["coef_scale"])[:, None]
+    return coef
+
+
+def build_pipeline(vectorizer, model, arrays: dict):
+    """Copies of ``vectorizer`` and ``model`` restricted to the exported features.
+
+    The model gets the dequantized coefficients, so scoring through sklearn
+    gives the same results as the quantized artifact.
+    """
+    reduced_vectorizer = copy.deepcopy(vectorizer)
+    reduced_vectorizer.vocabulary_ = {term: column for column, term in enumerate(arrays["terms"])}
+    if vectorizer.use_idf:
+        reduced_vectorizer.idf_ = np.asarray(arrays["idf"], dtype=np.float64)
+    # The inner TfidfTransformer validates its input width against the fit
+    reduced_vectorizer._tfidf.n_features_in_ = len(arrays["terms"])
+    # Only kept for introspection and can be as large as the vocabulary itself
+    if hasattr(reduced_vectorizer, "stop_words_"):
+        reduced_vectorizer.stop_words_ = set()
+
+    reduced_model = copy.deepcopy(model)
+    reduced_model.coef_ = dequantized_coef(arrays)
+    reduced_model.n_features_in_ = len(arrays["terms"])
+    return reduced_vectorizer, reduced_model
+
+
+def artifact_bytes(arrays: dict) -> int:
+    """Approximate on-disk (and mapped) size of the arrays as a model artifact."""
+    terms = sum(len(term.encode("utf-8")) for term in arrays["terms"])
+    # Hash, column and offset entries per term (see model_artifact.write_model_artifact)
+    index = len(arrays["terms"]) * (8 + 4 + 8)
+    coef_scale = 0 if arrays.get("coef_scale") is None else np.asarray(arrays["coef_scale"]).nbytes
+    return int(terms + index + np.asarray(arrays["idf"]).nbytes + np.asarray(arrays["coef"]).nbytes + coef_scale)
+
+
+def _per_statement_ms(score, texts: List[str], repeats: int) -> float:
+    score(texts[:8])  # warm-up
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        score(texts)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000 / len(texts)
+
+
+def evaluate_operating_point(
+        vectorizer,
+        model,
+        arrays: dict,
+        texts: List[str],
+        labels: Optional[np.ndarray] = None,
+        baseline_proba: Optional[np.ndarray] = None,
+        repeats: int = 3,
+) -> dict:
+    """Size, latency and accuracy of one pruned/quantized export."""
+    reduced_vectorizer, reduced_model = build_pipeline(vectorizer, model, arrays)
+    scorer = LinearScorer.from_arrays(arrays)
+    proba = scorer.predict_proba(texts)
+    predictions = scorer.classes_[proba.argmax(axis=1)]
+
+    report = {
+        "n_features": len(arrays["terms"]),
+        "coef_dtype": str(np.asarray(arrays["coef"]).dtype),
+        "pickle_bytes": len(pickle.dumps(reduced_vectorizer)) + len(pickle.dumps(reduced_model)),
+        "artifact_bytes": artifact_bytes(arrays),
+        "sklearn_ms": _per_statement_ms(
+            lambda batch: reduced_model.predict_proba(reduced_vectorizer.transform(batch)), texts, repeats
+        ),
+        "linear_ms": _per_statement_ms(scorer.predict_proba, texts, repeats),
+    }
+    if labels is not None:
+        report["accuracy"] = float(np.mean(predictions == labels))
+    if baseline_proba is not None:
+        baseline_predictions = scorer.classes_[baseline_proba.argmax(axis=1)]
+        report["agreement"] = float(np.mean(predictions == baseline_predictions))
+        report["max_proba_delta"] = float(np.abs(proba - baseline_proba).max()) if len(texts) else 0.0
+    return report
+
+
+def compare_operating_points(
+        vectorizer,
+        model,
+        texts: List[str],
+        labels: Optional[np.ndarray] = None,
+        thresholds: Sequence[float] = DEFAULT_THRESHOLDS,
+        quantizations: Sequence[str] = ("float64",),
+        repeats: int = 3,
+) -> List[dict]:
+    """Evaluate every threshold/quantization pair against the unmodified model.
+
+    The first row is always the baseline (no pruning, float64); every row
+    carries its deltas against it so operating points can be compared directly.
+    """
+    if not texts:
+        raise ValueError("At least one evaluation statement is required")
+    full = export_linear_model(vectorizer, model)
+    baseline_proba = LinearScorer.from_arrays(full).predict_proba(texts)
+    baseline = evaluate_operating_point(vectorizer, model, full, texts, labels, baseline_proba, repeats)
+    baseline.update(threshold=0.0, quantization="float64")
+
+    rows = [baseline]
+    for threshold in thresholds:
+        pruned = prune_arrays(full, threshold)
+        for quantization in quantizations:
+            if threshold == 0 and quantization == "float64":
+                continue
+            row = evaluate_operating_point(
+                vectorizer, model, quantize_arrays(pruned, quantization), texts, labels, baseline_proba, repeats
+            )
+            row.update(threshold=threshold, quantization=quantization)
+            rows.append(row)
+
+    for row in rows:
+        row["memory_delta"] = row["artifact_bytes"] / baseline["artifact_bytes"] - 1 if baseline["artifact_bytes"] else 0.0
+        row["latency_delta"] = row["linear_ms"] / baseline["linear_ms"] - 1 if baseline["linear_ms"] else 0.0
+        if labels is not None:
+            row["accuracy_delta"] = row["accuracy"] - baseline["accuracy"]
+    return rows
+
+
+def format_report(rows: List[dict]) -> str:
+    columns = [
+        ("threshold", "{:>9}", "{:>9.3f}"),
+        ("quantization", "{:>12}", "{:>12}"),
+        ("n_features", "{:>10}", "{:>10d}"),
+        ("artifact_bytes", "{:>14}", "{:>14,d}"),
+        ("memory_delta", "{:>12}", "{:>+12.1%}"),
+        ("linear_ms", "{:>9}", "{:>9.4f}"),
+        ("sklearn_ms", "{:>10}", "{:>10.4f}"),
+        ("latency_delta", "{:>13}", "{:>+13.1%}"),
+        ("agreement", "{:>9}", "{:>9.2%}"),
+        ("accuracy", "{:>8}", "{:>8.2%}"),
+        ("accuracy_delta", "{:>14}", "{:>+14.2%}"),
+    ]
+    columns = [column for column in columns if column[0] in rows[0]]
+    lines = [" ".join(header.format(name) for name, header, _ in columns)]
+    for row in rows:
+        lines.append(" ".join(value.format(row[name]) for name, _, value in columns))
+    return "\n".join(lines)
+
+
+def load_evaluation_set(path: str, sample: Optional[int] = None, seed: int = 42):
+    """Preprocessed statements and their labels from a ``Statement``/``Status`` CSV."""
+    import pandas as pd
+    from server.app.models.preprocessing import preprocess_text
+
+    frame = pd.read_csv(path)
+    if sample is not None and sample < len(frame):
+        frame = frame.sample(n=sample, random_state=seed)
+    texts = [preprocess_text(statement) for statement in frame["Statement"].fillna("Missing Statement")]
+    labels = frame["Status"].to_numpy() if "Status" in frame else None
+    return texts, labels
+
+
+def write_compacted_model(vectorizer, model, arrays: dict, data_dir: str, artifact: bool = False,
+                          artifact_dir: Optional[str] = None) -> str:
+    """Write the reduced pickles used by predict_sentiment and, optionally, the artifact.
+
+    The pickles being replaced are first copied to
+    ``model_backups/<model version>`` so a bad compaction can be rolled back,
+    and each new pickle is renamed into place only once fully written.
+    Without ``artifact`` any existing artifact is removed, since the server
+    would otherwise keep serving the unpruned model from it. Returns the
+    backup directory.
+    """
+    from server.app.models import model_loader
+    from server.app.models.model_artifact import write_model_artifact
+
+    backup_dir = os.path.join(data_dir, "model_backups", model_loader.compute_model_version(data_dir))
+    os.makedirs(backup_dir, exist_ok=True)
+    for filename in model_loader.MODEL_FILES:
+        if not os.path.exists(os.path.join(backup_dir, filename)):
+            shutil.copy2(os.path.join(data_dir, filename), os.path.join(backup_dir, filename))
+    logger.info(f"Backed up the current model to {backup_dir}")
+
+    reduced_vectorizer, reduced_model = build_pipeline(vectorizer, model, arrays)
+    model_loader.dump_atomically(reduced_model, os.path.join(data_dir, "mental_health_model.pkl"))
+    model_loader.dump_atomically(reduced_vectorizer, os.path.join(data_dir, "vectorizer.pkl"))
+    logger.info(f"Wrote compacted model with {len(arrays['terms'])} features to {data_dir}")
+
+    artifact_dir = artifact_dir or os.path.join(data_dir, "model_artifact")
+    if artifact:
+        write_model_artifact(arrays, artifact_dir, model_loader.compute_model_version(data_dir))
+    elif os.path.isdir(artifact_dir):
+        logger.warning(f"Removing stale model artifact at {artifact_dir}")
+        shutil.rmtree(artifact_dir)
+    return backup_dir
+
+
+if __name__ == "__main__":
+    import json
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Prune and quantize the served sentiment model")
+    parser.add_argument("--eval-csv", required=True, help="Statement/Status CSV used to measure the deltas")
+    parser.add_argument("--sample", type=int, default=2000, help="Evaluate on this many random rows")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=list(DEFAULT_THRESHOLDS))
+    parser.add_argument("--quantize", nargs="+", default=["float64"], choices=QUANTIZATION_MODES)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument(
+        "--write", action="store_true",
+        help="Replace the served pickles with the single --thresholds/--quantize operating point",
+    )
+    parser.add_argument("--artifact", action="store_true", help="With --write, also write the model artifact")
+    args = parser.parse_args()
+
+    # Always compact the original pickles, not an existing artifact
+    os.environ["SENTIMENT_SCORER"] = "sklearn"
+    from server.app.models.sentiment_model import data_directory, label_encoder, model, vectorizer
+
+    texts, statuses = load_evaluation_set(args.eval_csv, args.sample)
+    labels = None
+    if statuses is not None:
+        known = np.isin(statuses, label_encoder.classes_)
+        texts = [text for text, keep in zip(texts, known) if keep]
+        labels = label_encoder.transform(statuses[known])
+
+    rows = compare_operating_points(vectorizer, model, texts, labels, args.thresholds, args.quantize)
+    print(json.dumps(rows, indent=2) if args.json else format_report(rows))
+
+    if args.write:
+        if len(args.thresholds) != 1 or len(args.quantize) != 1:
+            parser.error("--write needs exactly one threshold and one quantization mode")
+        arrays = quantize_arrays(prune_arrays(export_linear_model(vectorizer, model), args.thresholds[0]), args.quantize[0])
+        from server.app.models.model_artifact import MODEL_ARTIFACT_DIRECTORY
+
+        write_compacted_model(vectorizer, model, arrays, data_directory, args.artifact, MODEL_ARTIFACT_DIRECTORY)
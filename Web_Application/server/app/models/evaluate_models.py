@@ -0,0 +1,348 @@
+import os
+import json
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence
+
+import joblib
+import numpy as np
+
+from server.app.models.train_model import TRAINING_CACHE_DIRECTORY, StageTimer, load_or_preprocess, load_training_set
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Columns of the hashing variants; fixed, since there is no vocabulary to size them
+EVALUATION_HASH_FEATURES = int(os.getenv("EVALUATION_HASH_FEATURES", str(2 ** 20)))
+
+# Variant names read <features>-<ngrams>-<classifier>, e.g. "hashing-unigram-sgd"
+FEATURE_TYPES = ("tfidf", "hashing")
+NGRAM_RANGES = {"unigram": (1, 1), "bigram": (1, 2), "trigram": (1, 3)}
+CLASSIFIERS = ("lbfgs", "liblinear", "sgd")
+
+# The notebook's pipeline first, then one change at a time against it
+DEFAULT_VARIANTS = (
+    "tfidf-bigram-lbfgs",
+    "tfidf-unigram-lbfgs",
+    "tfidf-bigram-liblinear",
+    "tfidf-bigram-sgd",
+    "hashing-bigram-lbfgs",
+)
+
+
+def parse_variant(name: str) -> dict:
+    """The feature type, n-gram range and classifier a variant name stands for."""
+    parts = name.split("-")
+    if len(parts) != 3 or parts[0] not in FEATURE_TYPES or parts[1] not in NGRAM_RANGES or parts[2] not in CLASSIFIERS:
+        raise ValueError(
+            f"Unknown variant '{name}', expected <{'|'.join(FEATURE_TYPES)}>-"
+            f"<{'|'.join(NGRAM_RANGES)}>-<{'|'.join(CLASSIFIERS)}>"
+        )
+    return {"features": parts[0], "ngram_range": NGRAM_RANGES[parts[1]], "classifier": parts[2]}
+
+
+def build_variant(name: str, n_classes: int, C: float = 1.0, balanced: bool = True, seed: int = 42):
+    """Unfitted vectorizer and classifier for a variant.
+
+    Hashing variants keep the TF-IDF weighting, so only the vocabulary
+    differs from the fitted pipeline. liblinear only trains binary models,
+    so with more classes it is wrapped in a one-vs-rest classifier.
+    """
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression, SGDClassifier
+    from sklearn.multiclass import OneVsRestClassifier
+    from sklearn.pipeline import make_pipeline
+
+    spec = parse_variant(name)
+    if spec["features"] == "tfidf":
+        vectorizer = TfidfVectorizer(ngram_range=spec["ngram_range"])
+    else:
+        vectorizer = make_pipeline(
+            HashingVectorizer(
+                ngram_range=spec["ngram_range"], n_features=EVALUATION_HASH_FEATURES, alternate_sign=False, norm=None,
+            ),
+            TfidfTransformer(),
+        )
+
+    class_weight = "balanced" if balanced else None
+    if spec["classifier"] == "sgd":
+        model = SGDClassifier(loss="log_loss", class_weight=class_weight, random_state=seed)
+    else:
+        model = LogisticRegression(C=C, solver=spec["classifier"], max_iter=1000, class_weight=class_weight)
+        if spec["classifier"] == "liblinear" and n_classes > 2:
+            model = OneVsRestClassifier(model)
+    return vectorizer, model
+
+
+def feature_count(vectorizer) -> int:
+    if hasattr(vectorizer, "vocabulary_"):
+        return len(vectorizer.vocabulary_)
+    return vectorizer.steps[0][1].n_features
+
+
+def linear_artifact_bytes(vectorizer, model) -> Optional[int]:
+    """Size of the memory-mapped artifact for the variant, or None if it cannot be exported."""
+    from server.app.models.compact_model import artifact_bytes
+    from server.app.models.linear_scorer import export_linear_model
+
+    try:
+        return artifact_bytes(export_linear_model(vectorizer, model))
+    except (AttributeError, ValueError):
+        # Hashing vectorizers have no terms and one-vs-rest wrappers no coef_
+        return None
+
+
+def latency(score, texts: List[str], batch_size: int, single_items: int, repeats: int) -> dict:
+    """Per-call latency for single statements and per-statement latency in batches, in ms."""
+    singles = texts[:single_items]
+    score(singles[:1])  # warm-up
+    samples = []
+    for text in singles:
+        start = time.perf_counter()
+        score([text])
+        samples.append(time.perf_counter() - start)
+    p50, p95 = np.percentile(samples, [50, 95]) * 1000
+
+    batch = (texts * (batch_size // max(1, len(texts)) + 1))[:batch_size]
+    score(batch)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        score(batch)
+        best = min(best, time.perf_counter() - start)
+    return {"single_p50_ms": float(p50), "single_p95_ms": float(p95), "batch_ms": best * 1000 / len(batch)}
+
+
+def resident_memory_bytes() -> Optional[int]:
+    """Resident set size of this process; None where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _serving_footprint(path: str, texts: List[str]) -> Optional[int]:
+    # Runs in a fresh process: resident memory added by loading and scoring the variant
+    import sklearn.feature_extraction.text  # noqa: F401
+    import sklearn.linear_model  # noqa: F401
+    import sklearn.multiclass  # noqa: F401
+    import sklearn.pipeline  # noqa: F401
+
+    before = resident_memory_bytes()
+    vectorizer, model = joblib.load(path)
+    model.predict_proba(vectorizer.transform(texts))
+    after = resident_memory_bytes()
+    return None if before is None or after is None else after - before
+
+
+def serving_footprint(path: str, texts: List[str]) -> Optional[int]:
+    """Resident bytes a server process gains by loading the variant at ``path`` and scoring ``texts``.
+
+    Measured in a spawned process so earlier variants and the training data
+    do not count.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_serving_footprint, path, texts).result()
+
+
+def evaluate_variant(
+        name: str,
+        train_texts: List[str],
+        y_train: np.ndarray,
+        test_texts: List[str],
+        y_test: np.ndarray,
+        class_names: List[str],
+        work_directory: str,
+        C: float = 1.0,
+        balanced: bool = True,
+        batch_size: int = 256,
+        single_items: int = 200,
+        repeats: int = 5,
+        memory: bool = True,
+        seed: int = 42,
+) -> dict:
+    """Fit one variant on the training split and measure it on the held-out split."""
+    from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, f1_score
+
+    vectorizer, model = build_variant(name, len(class_names), C, balanced, seed)
+    timer = StageTimer()
+    with timer.stage(f"{name}: fit"):
+        model.fit(vectorizer.fit_transform(train_texts), y_train)
+
+    # Vectorized over the whole split at once
+    predictions = model.predict(vectorizer.transform(test_texts))
+    labels = np.arange(len(class_names))
+
+    path = os.path.join(work_directory, f"{name}.joblib")
+    joblib.dump((vectorizer, model), path)
+
+    row = {
+        "variant": name,
+        "features": feature_count(vectorizer),
+        "fit_seconds": timer.seconds[f"{name}: fit"],
+        "accuracy": float(accuracy_score(y_test, predictions)),
+        "macro_f1": float(f1_score(y_test, predictions, labels=labels, average="macro", zero_division=0)),
+    }
+    row.update(latency(
+        lambda batch: model.predict_proba(vectorizer.transform(batch)), test_texts, batch_size, single_items, repeats,
+    ))
+    row["pickle_bytes"] = os.path.getsize(path)
+    row["artifact_bytes"] = linear_artifact_bytes(vectorizer, model)
+    row["rss_bytes"] = serving_footprint(path, test_texts[:batch_size]) if memory else None
+    row["classification_report"] = classification_report(
+        y_test, predictions, labels=labels, target_names=class_names, output_dict=True, zero_division=0,
+    )
+    row["confusion_matrix"] = confusion_matrix(y_test, predictions, labels=labels).tolist()
+    return row
+
+
+def compare_variants(
+        input_path: str,
+        variants: Sequence[str] = DEFAULT_VARIANTS,
+        work_directory: Optional[str] = None,
+        C: float = 1.0,
+        balanced: bool = True,
+        test_size: float = 0.2,
+        batch_size: int = 256,
+        single_items: int = 200,
+        repeats: int = 5,
+        memory: bool = True,
+        workers: int = os.cpu_count() or 1,
+        cache_directory: Optional[str] = TRAINING_CACHE_DIRECTORY,
+        seed: int = 42,
+) -> dict:
+    """Train every variant on the same split of a CSV and compare accuracy with serving cost.
+
+    The split and preprocessing match train_model.train, so the held-out rows
+    are the ones its report was computed on. The fitted variants are written
+    to ``work_directory`` (a temporary directory by default) to measure their
+    size and, in a fresh process each, their resident memory.
+    """
+    import tempfile
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder
+
+    for name in variants:
+        parse_variant(name)
+
+    statements, statuses = load_training_set(input_path)
+    texts, _ = load_or_preprocess(statements, cache_directory, workers)
+    label_encoder = LabelEncoder().fit(statuses)
+    labels = label_encoder.transform(statuses)
+    train_texts, test_texts, y_train, y_test = train_test_split(
+        texts, labels, test_size=test_size, random_state=seed, stratify=labels
+    )
+    class_names = [str(label) for label in label_encoder.classes_]
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        directory = work_directory or temporary_directory
+        os.makedirs(directory, exist_ok=True)
+        rows = [
+            evaluate_variant(
+                name, train_texts, y_train, test_texts, y_test, class_names, directory,
+                C, balanced, batch_size, single_items, repeats, memory, seed,
+            )
+            for name in variants
+        ]
+
+    return {
+        "input": os.path.abspath(input_path),
+        "train_rows": len(train_texts),
+        "test_rows": len(test_texts),
+        "classes": class_names,
+        "batch_size": batch_size,
+        "variants": rows,
+    }
+
+
+def _format_bytes(value: Optional[int]) -> str:
+    return "-" if value is None else f"{value / 2 ** 20:,.2f}"
+
+
+def format_comparison(rows: List[dict]) -> str:
+    columns = [
+        ("variant", "{:<24}", lambda v: f"{v:<24}"),
+        ("features", "{:>9}", lambda v: f"{v:>9,d}"),
+        ("accuracy", "{:>8}", lambda v: f"{v:>8.2%}"),
+        ("macro_f1", "{:>8}", lambda v: f"{v:>8.4f}"),
+        ("fit_seconds", "{:>11}", lambda v: f"{v:>11.2f}"),
+        ("single_p50_ms", "{:>13}", lambda v: f"{v:>13.3f}"),
+        ("single_p95_ms", "{:>13}", lambda v: f"{v:>13.3f}"),
+        ("batch_ms", "{:>8}", lambda v: f"{v:>8.4f}"),
+        ("pickle_mb", "{:>9}", lambda v: f"{v:>9}"),
+        ("artifact_mb", "{:>11}", lambda v: f"{v:>11}"),
+        ("rss_mb", "{:>8}", lambda v: f"{v:>8}"),
+    ]
+    sizes = {"pickle_mb": "pickle_bytes", "artifact_mb": "artifact_bytes", "rss_mb": "rss_bytes"}
+    lines = [" ".join(header.format(name) for name, header, _ in columns)]
+    for row in rows:
+        values = []
+        for name, _, format_value in columns:
+            value = _format_bytes(row[sizes[name]]) if name in sizes else row[name]
+            values.append(format_value(value))
+        lines.append(" ".join(values))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Compare sentiment model variants on accuracy and serving cost")
+    parser.add_argument("input", help="Statement/Status CSV, e.g. 'Mental Health Sentiments.csv'")
+    parser.add_argument("--variants", nargs="+", default=list(DEFAULT_VARIANTS), help="<features>-<ngrams>-<classifier>")
+    parser.add_argument("--C", dest="C", type=float, default=1.0)
+    parser.add_argument("--no-class-weight", action="store_true", help="Do not balance the class weights")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--single-items", type=int, default=200, help="Statements timed one at a time")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the per-variant resident memory measurement")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--cache-dir", default=TRAINING_CACHE_DIRECTORY)
+    parser.add_argument("--no-cache", action="store_true", help="Always preprocess from scratch")
+    parser.add_argument("--work-dir", help="Keep the fitted variants here instead of a temporary directory")
+    parser.add_argument("--output", help="Write the full report, with classification reports and confusion matrices, as JSON")
+    parser.add_argument("--details", action="store_true", help="Also print each variant's classification report")
+    args = parser.parse_args()
+
+    try:
+        for variant in args.variants:
+            parse_variant(variant)
+    except ValueError as e:
+        parser.error(str(e))
+
+    report = compare_variants(
+        args.input,
+        args.variants,
+        args.work_dir,
+        args.C,
+        not args.no_class_weight,
+        args.test_size,
+        args.batch_size,
+        args.single_items,
+        args.repeats,
+        not args.no_memory,
+        args.workers,
+        None if args.no_cache else args.cache_dir,
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    print(f"{report['train_rows']} training / {report['test_rows']} held-out statements, "
+          f"batches of {report['batch_size']}")
+    print(format_comparison(report["variants"]))
+    if args.details:
+        for row in report["variants"]:
+            print(f"\n{row['variant']}")
+            for label, values in row["classification_report"].items():
+                if isinstance(values, dict):
+                    print(f"  {label:<22} precision {values['precision']:.3f}  recall {values['recall']:.3f}  "
+                          f"f1 {values['f1-score']:.3f}  support {values['support']:.0f}")
+            print(f"  confusion matrix (rows true, columns predicted: {', '.join(report['classes'])})")
+            for true_row in row["confusion_matrix"]:
+                print("  " + " ".join(f"{count:>6d}" for count in true_row))
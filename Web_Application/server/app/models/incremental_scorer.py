@@ -0,0 +1,120 @@
+import re
+from collections import Counter
+from typing import Callable, Dict, Iterable, List
+
+import numpy as np
+
+from server.app.models.linear_scorer import LinearScorer, decision_to_proba
+
+# The word still being typed: trailing letters after the last non-letter
+TRAILING_WORD = re.compile(r'[a-zA-Z]*\Z')
+
+
+class IncrementalDocument:
+    """Running tf-idf features and class scores of a statement as it is typed.
+
+    Preprocessing only ever splits on non-letters, so text up to the last
+    non-letter is final: its n-gram counts are kept, together with the
+    unnormalized class scores (sum of weight * coefficient row) and the sum
+    of squared weights. Appending text only visits the new n-grams, and the
+    trailing, possibly unfinished word is added on top of that state when
+    scoring without being committed. Any edit other than an append rebuilds
+    the state from the new text.
+    """
+
+    def __init__(self, scorer: LinearScorer, preprocess: Callable[[str], str]):
+        if scorer.norm not in ("l1", "l2", None):
+            raise ValueError(f"Unsupported norm '{scorer.norm}'")
+        self.scorer = scorer
+        self.preprocess = preprocess
+        self.rebuilds = 0
+        self.reset()
+
+    def reset(self):
+        self.committed_text = ""
+        self.tail = ""
+        self.token_count = 0
+        # Last max_n - 1 tokens, the left context of the next n-grams
+        self.context: List[str] = []
+        self.counts: Dict[int, int] = {}
+        self.weighted = np.zeros(len(self.scorer.intercept), dtype=np.float64)
+        self.norm_sum = 0.0
+
+    def _ngrams(self, context: List[str], tokens: List[str]) -> List[str]:
+        # N-grams that end in one of ``tokens``, given the tokens before them
+        sequence = context + tokens
+        min_n, max_n = self.scorer.min_n, self.scorer.max_n
+        ngrams = []
+        for end in range(len(context), len(sequence)):
+            for n in range(min_n, max_n + 1):
+                if end - n + 1 >= 0:
+                    ngrams.append(' '.join(sequence[end - n + 1:end + 1]))
+        return ngrams
+
+    def _weight(self, column: int, count: int) -> float:
+        if count == 0:
+            return 0.0
+        if self.scorer.binary:
+            tf = 1.0
+        elif self.scorer.sublinear_tf:
+            tf = 1.0 + np.log(count)
+        else:
+            tf = float(count)
+        return tf * self.scorer.idf[column]
+
+    def _add(self, counts: Dict[int, int], columns: Iterable[int], weighted: np.ndarray, norm_sum: float) -> float:
+        # Add occurrences of ``columns`` in place; returns the new norm sum
+        for column, added in Counter(columns).items():
+            count = counts.get(column, 0)
+            old, new = self._weight(column, count), self._weight(column, count + added)
+            counts[column] = count + added
+            if new != old:
+                weighted += (new - old) * self.scorer.coef_by_feature[column]
+                norm_sum += new * new - old * old if self.scorer.norm == "l2" else new - old
+        return norm_sum
+
+    def _tokens(self, raw: str) -> List[str]:
+        return self.scorer.tokenize(self.preprocess(raw)) if raw else []
+
+    def update(self, text: str):
+        """Move to ``text``, only processing what was appended since the last call."""
+        if not text.startswith(self.committed_text):
+            self.reset()
+            self.rebuilds += 1
+
+        boundary = TRAILING_WORD.search(text).start()
+        tokens = self._tokens(text[len(self.committed_text):boundary])
+        if tokens:
+            columns = self.scorer.vocabulary.lookup(self._ngrams(self.context, tokens))
+            self.norm_sum = self._add(self.counts, columns.tolist(), self.weighted, self.norm_sum)
+            self.token_count += len(tokens)
+            keep = self.scorer.max_n - 1
+            self.context = (self.context + tokens)[-keep:] if keep else []
+        self.committed_text = text[:boundary]
+        self.tail = text[boundary:]
+
+    def decision(self) -> np.ndarray:
+        """Class scores of the committed text plus the word being typed."""
+        weighted, norm_sum = self.weighted, self.norm_sum
+        tail_tokens = self._tokens(self.tail)
+        if tail_tokens:
+            columns = self.scorer.vocabulary.lookup(self._ngrams(self.context, tail_tokens)).tolist()
+            if columns:
+                # Score against a copy so the unfinished word is not committed
+                weighted = weighted.copy()
+                counts = {column: self.counts.get(column, 0) for column in columns}
+                norm_sum = self._add(counts, columns, weighted, norm_sum)
+
+        if self.scorer.norm == "l2":
+            norm = np.sqrt(norm_sum)
+        elif self.scorer.norm == "l1":
+            norm = norm_sum
+        else:
+            norm = 1.0
+        contribution = weighted / norm if norm > 0 else np.zeros_like(weighted)
+        if self.scorer.coef_scale is not None:
+            contribution = contribution * self.scorer.coef_scale
+        return self.scorer.intercept + contribution
+
+    def predict_proba(self) -> np.ndarray:
+        return decision_to_proba(self.decision()[np.newaxis, :], self.scorer.probability_mode)[0]
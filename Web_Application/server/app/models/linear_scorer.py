@@ -0,0 +1,231 @@
+import re
+import logging
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# How class scores become probabilities, mirroring LogisticRegression.predict_proba
+PROBABILITY_MODES = ("multinomial", "ovr", "binary_ovr", "binary_multinomial")
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    scores = scores - scores.max(axis=1, keepdims=True)
+    np.exp(scores, out=scores)
+    scores /= scores.sum(axis=1, keepdims=True)
+    return scores
+
+
+def _expit(scores: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-scores))
+
+
+def _ovr_normalize(prob: np.ndarray) -> np.ndarray:
+    prob_sum = prob.sum(axis=1, keepdims=True)
+    all_zero = prob_sum[:, 0] == 0
+    if all_zero.any():
+        prob[all_zero, :] = 1
+        prob_sum[all_zero] = prob.shape[1]
+    return prob / prob_sum
+
+
+def decision_to_proba(decision: np.ndarray, mode: str) -> np.ndarray:
+    """Turn raw decision values into class probabilities the way sklearn does."""
+    if mode == "multinomial":
+        return _softmax(decision)
+    if mode == "ovr":
+        return _ovr_normalize(_expit(decision))
+    if mode == "binary_ovr":
+        positive = _expit(decision[:, 0])
+        return np.stack([1 - positive, positive], axis=1)
+    if mode == "binary_multinomial":
+        return _softmax(np.concatenate([-decision, decision], axis=1))
+    raise ValueError(f"Unknown probability mode '{mode}'")
+
+
+def _detect_probability_mode(model, coef: np.ndarray, intercept: np.ndarray) -> str:
+    # sklearn's choice between softmax and one-vs-rest depends on the version,
+    # solver and multi_class setting, so compare against predict_proba directly
+    rng = np.random.default_rng(0)
+    probe = rng.random((4, coef.shape[1]))
+    expected = model.predict_proba(probe)
+    decision = probe @ coef.T + intercept
+    modes = ("binary_ovr", "binary_multinomial") if coef.shape[0] == 1 else ("multinomial", "ovr")
+    for mode in modes:
+        if np.allclose(decision_to_proba(decision.copy(), mode), expected, atol=1e-8):
+            return mode
+    raise ValueError("Could not reproduce model.predict_proba with a linear scorer")
+
+
+def export_linear_model(vectorizer, model) -> dict:
+    """Extract the arrays and settings needed to score a fitted TfidfVectorizer + linear model.
+
+    Returns ``terms`` (in column order), ``idf``, ``coef`` (classes x
+    features), ``intercept``, ``classes`` and a JSON-serializable ``settings``
+    dict describing tokenization, weighting and the probability mode.
+    """
+    if vectorizer.analyzer != "word" or vectorizer.tokenizer is not None or vectorizer.preprocessor is not None:
+        raise ValueError("Only the built-in word analyzer is supported")
+    if vectorizer.strip_accents is not None:
+        raise ValueError("strip_accents is not supported")
+    if vectorizer.norm not in ("l1", "l2", None):
+        raise ValueError(f"Unsupported norm '{vectorizer.norm}'")
+
+    terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    n_features = len(terms)
+    idf = np.asarray(vectorizer.idf_, dtype=np.float64) if vectorizer.use_idf else np.ones(n_features)
+    coef = np.asarray(model.coef_, dtype=np.float64)
+    intercept = np.asarray(model.intercept_, dtype=np.float64)
+    if coef.shape[1] != n_features:
+        raise ValueError("Model and vectorizer feature counts do not match")
+    stop_words = vectorizer.get_stop_words()
+
+    return {
+        "terms": terms,
+        "idf": idf,
+        "coef": coef,
+        "intercept": intercept,
+        "classes": np.asarray(model.classes_),
+        "settings": {
+            "probability_mode": _detect_probability_mode(model, coef, intercept),
+            "token_pattern": vectorizer.token_pattern,
+            "ngram_range": list(vectorizer.ngram_range),
+            "lowercase": bool(vectorizer.lowercase),
+            "binary": bool(vectorizer.binary),
+            "sublinear_tf": bool(vectorizer.sublinear_tf),
+            "norm": vectorizer.norm,
+            "stop_words": sorted(stop_words) if stop_words else [],
+        },
+    }
+
+
+class DictVocabulary:
+    """In-memory term -> column lookup."""
+
+    def __init__(self, terms: Iterable[str]):
+        self.columns = {term: column for column, term in enumerate(terms)}
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self.columns
+
+    def lookup(self, ngrams: List[str]) -> np.ndarray:
+        """Columns of the n-grams present in the vocabulary, repeats included."""
+        get = self.columns.get
+        return np.fromiter(
+            (column for column in map(get, ngrams) if column is not None), dtype=np.intp
+        )
+
+
+class LinearScorer:
+    """NumPy-only replacement for ``TfidfVectorizer.transform`` + ``predict_proba``.
+
+    Tokenizes, builds n-grams, applies tf-idf weighting and normalization, and
+    computes class probabilities straight from the exported arrays, avoiding
+    sklearn's per-call input validation and sparse-matrix construction. The
+    arrays may be memory-mapped; only the rows a document touches are read.
+    """
+
+    def __init__(
+            self,
+            vocabulary,
+            idf: np.ndarray,
+            coef_by_feature: np.ndarray,
+            intercept: np.ndarray,
+            classes: np.ndarray,
+            settings: dict,
+            model_version: Optional[str] = None,
+            coef_scale: Optional[np.ndarray] = None,
+    ):
+        if settings["probability_mode"] not in PROBABILITY_MODES:
+            raise ValueError(f"Unknown probability mode '{settings['probability_mode']}'")
+        self.vocabulary = vocabulary
+        self.idf = idf
+        # Feature-major so each document gathers contiguous rows
+        self.coef_by_feature = coef_by_feature
+        # Per-class multiplier for integer-quantized coefficients
+        self.coef_scale = None if coef_scale is None else np.asarray(coef_scale, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.classes_ = classes
+        self.settings = settings
+        self.model_version = model_version
+        self.probability_mode = settings["probability_mode"]
+        self.token_pattern = re.compile(settings["token_pattern"])
+        self.min_n, self.max_n = settings["ngram_range"]
+        self.lowercase = settings["lowercase"]
+        self.binary = settings["binary"]
+        self.sublinear_tf = settings["sublinear_tf"]
+        self.norm = settings["norm"]
+        self.stop_words = frozenset(settings["stop_words"])
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, model_version: Optional[str] = None) -> "LinearScorer":
+        return cls(
+            DictVocabulary(arrays["terms"]),
+            arrays["idf"],
+            np.ascontiguousarray(arrays["coef"].T),
+            arrays["intercept"],
+            arrays["classes"],
+            arrays["settings"],
+            model_version,
+            arrays.get("coef_scale"),
+        )
+
+    @classmethod
+    def from_pipeline(cls, vectorizer, model, model_version: Optional[str] = None) -> "LinearScorer":
+        return cls.from_arrays(export_linear_model(vectorizer, model), model_version)
+
+    def tokenize(self, text: str) -> List[str]:
+        """Split text into the vectorizer's tokens, before n-grams are formed."""
+        if self.lowercase:
+            text = text.lower()
+        tokens = self.token_pattern.findall(text)
+        if self.stop_words:
+            tokens = [token for token in tokens if token not in self.stop_words]
+        return tokens
+
+    def analyze(self, text: str) -> List[str]:
+        """Split text into the n-grams the vectorizer would count."""
+        tokens = self.tokenize(text)
+        if self.max_n == 1:
+            return tokens
+
+        ngrams = list(tokens) if self.min_n == 1 else []
+        for n in range(max(2, self.min_n), self.max_n + 1):
+            ngrams.extend(' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return ngrams
+
+    def decision_function(self, texts: List[str]) -> np.ndarray:
+        scores = np.tile(self.intercept, (len(texts), 1))
+        for row, text in enumerate(texts):
+            columns = self.vocabulary.lookup(self.analyze(text))
+            if not len(columns):
+                continue
+
+            columns, counts = np.unique(columns, return_counts=True)
+            weights = counts.astype(np.float64)
+            if self.binary:
+                weights[:] = 1.0
+            elif self.sublinear_tf:
+                weights = 1.0 + np.log(weights)
+            weights *= self.idf[columns]
+            if self.norm == "l2":
+                weights /= np.sqrt(weights @ weights)
+            elif self.norm == "l1":
+                weights /= np.abs(weights).sum()
+
+            contribution = weights @ self.coef_by_feature[columns]
+            if self.coef_scale is not None:
+                contribution *= self.coef_scale
+            scores[row] += contribution
+        return scores
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        return decision_to_proba(self.decision_function(texts), self.probability_mode)
+
+    def predict(self, texts: List[str]) -> np.ndarray:
+        return self.classes_[self.predict_proba(texts).argmax(axis=1)]
@@ -0,0 +1,178 @@
+import os
+import json
+import mmap
+import shutil
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import numpy as np
+
+from server.app.models.linear_scorer import LinearScorer
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Default location of the memory-mapped model artifact
+MODEL_ARTIFACT_DIRECTORY = os.path.join(os.path.dirname(__file__), '../../data', 'model_artifact')
+MANIFEST_FILE = "manifest.json"
+ARTIFACT_FORMAT_VERSION = 1
+
+# Files are opened with mmap so every worker on the host shares the same pages
+MAPPED_ARRAYS = ("vocab_hashes", "vocab_columns", "vocab_offsets", "idf", "coef")
+
+
+def term_hash(term: str) -> int:
+    """Stable 64-bit hash of a vocabulary term (Python's hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class HashedVocabulary:
+    """Vocabulary stored as sorted 64-bit term hashes plus the terms themselves.
+
+    Lookups hash the n-grams, binary-search the sorted hash array and confirm
+    each candidate against the stored term bytes, so results are exact even if
+    two terms ever share a hash.
+    """
+
+    def __init__(self, hashes: np.ndarray, columns: np.ndarray, offsets: np.ndarray, terms_blob):
+        self.hashes = hashes
+        self.columns = columns
+        self.offsets = offsets
+        self.terms_blob = terms_blob
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def __contains__(self, term: str) -> bool:
+        return len(self.lookup([term])) > 0
+
+    def _term_bytes(self, position: int) -> bytes:
+        return self.terms_blob[int(self.offsets[position]):int(self.offsets[position + 1])]
+
+    def lookup(self, ngrams: List[str]) -> np.ndarray:
+        """Columns of the n-grams present in the vocabulary, repeats included."""
+        size = len(self.hashes)
+        if not ngrams or not size:
+            return np.empty(0, dtype=np.intp)
+
+        query = np.fromiter((term_hash(ngram) for ngram in ngrams), dtype=np.uint64, count=len(ngrams))
+        positions = np.searchsorted(self.hashes, query)
+        candidates = np.flatnonzero(positions < size)
+        candidates = candidates[self.hashes[positions[candidates]] == query[candidates]]
+
+        found = []
+        for i in candidates:
+            encoded = ngrams[i].encode("utf-8")
+            position = positions[i]
+            while position < size and self.hashes[position] == query[i]:
+                if self._term_bytes(position) == encoded:
+                    found.append(self.columns[position])
+                    break
+                position += 1
+        return np.array(found, dtype=np.intp)
+
+
+def write_model_artifact(arrays: dict, directory: str = MODEL_ARTIFACT_DIRECTORY, model_version: Optional[str] = None):
+    """Write ``export_linear_model`` output as a versioned artifact directory.
+
+    The directory is built next to the target and swapped in with renames so
+    readers never see a half-written artifact.
+    """
+    terms = arrays["terms"]
+    hashes = np.fromiter((term_hash(term) for term in terms), dtype=np.uint64, count=len(terms))
+    order = np.argsort(hashes, kind="stable")
+    encoded = [terms[i].encode("utf-8") for i in order]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    np.cumsum([len(term) for term in encoded], out=offsets[1:])
+
+    staging = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    np.save(os.path.join(staging, "vocab_hashes.npy"), hashes[order])
+    np.save(os.path.join(staging, "vocab_columns.npy"), order.astype(np.int32))
+    np.save(os.path.join(staging, "vocab_offsets.npy"), offsets)
+    with open(os.path.join(staging, "vocab_terms.bin"), "wb") as f:
+        f.write(b"".join(encoded))
+    np.save(os.path.join(staging, "idf.npy"), np.asarray(arrays["idf"]))
+    np.save(os.path.join(staging, "coef.npy"), np.ascontiguousarray(np.asarray(arrays["coef"]).T))
+    np.save(os.path.join(staging, "intercept.npy"), np.asarray(arrays["intercept"], dtype=np.float64))
+    np.save(os.path.join(staging, "classes.npy"), np.asarray(arrays["classes"]))
+    if arrays.get("coef_scale") is not None:
+        np.save(os.path.join(staging, "coef_scale.npy"), np.asarray(arrays["coef_scale"], dtype=np.float64))
+
+    manifest = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "model_version": model_version,
+        "n_features": len(terms),
+        "n_classes": int(np.asarray(arrays["intercept"]).shape[0]),
+        "coef_dtype": str(np.asarray(arrays["coef"]).dtype),
+        "coef_scale": arrays.get("coef_scale") is not None,
+        "settings": arrays["settings"],
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    with open(os.path.join(staging, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    previous = f"{directory}.old-{os.getpid()}"
+    if os.path.exists(directory):
+        os.rename(directory, previous)
+    os.rename(staging, directory)
+    shutil.rmtree(previous, ignore_errors=True)
+    logger.info(f"Wrote model artifact with {len(terms)} features to {directory}")
+
+
+def read_manifest(directory: str = MODEL_ARTIFACT_DIRECTORY) -> Optional[dict]:
+    path = os.path.join(directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_model_artifact(directory: str = MODEL_ARTIFACT_DIRECTORY) -> LinearScorer:
+    """Open an artifact directory as a LinearScorer backed by memory-mapped arrays."""
+    manifest = read_manifest(directory)
+    if manifest is None:
+        raise FileNotFoundError(f"No model artifact manifest in {directory}")
+    if manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported model artifact format version: {manifest.get('format_version')}")
+
+    mapped = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in MAPPED_ARRAYS}
+
+    terms_path = os.path.join(directory, "vocab_terms.bin")
+    if os.path.getsize(terms_path):
+        with open(terms_path, "rb") as f:
+            terms_blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    else:
+        terms_blob = b""
+
+    vocabulary = HashedVocabulary(mapped["vocab_hashes"], mapped["vocab_columns"], mapped["vocab_offsets"], terms_blob)
+    return LinearScorer(
+        vocabulary,
+        mapped["idf"],
+        mapped["coef"],
+        np.load(os.path.join(directory, "intercept.npy")),
+        np.load(os.path.join(directory, "classes.npy")),
+        manifest["settings"],
+        manifest.get("model_version"),
+        np.load(os.path.join(directory, "coef_scale.npy")) if manifest.get("coef_scale") else None,
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Export the served pickles as a memory-mapped model artifact")
+    parser.add_argument("--output", default=MODEL_ARTIFACT_DIRECTORY)
+    args = parser.parse_args()
+
+    # Export from the pickles even if an artifact already exists
+    os.environ["SENTIMENT_SCORER"] = "sklearn"
+    from server.app.models.linear_scorer import export_linear_model
+    from server.app.models.sentiment_model import model, vectorizer, model_version
+
+    write_model_artifact(export_linear_model(vectorizer, model), args.output, model_version)
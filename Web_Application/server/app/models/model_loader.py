@@ -0,0 +1,121 @@
+import os
+import joblib
+import numpy as np
+import hashlib
+import logging
+from server.app.models.linear_scorer import LinearScorer
+from server.app.models.model_artifact import MODEL_ARTIFACT_DIRECTORY, load_model_artifact, read_manifest
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# "auto" prefers the memory-mapped artifact and falls back to the pickles;
+# "sklearn" always scores through vectorizer/model; "linear" always uses the
+# NumPy LinearScorer, extracting it from the pickles if there is no artifact
+SENTIMENT_SCORER = os.getenv("SENTIMENT_SCORER", "auto")
+
+# Directory holding the served pickles
+data_directory = os.path.join(os.path.dirname(__file__), '../../data')
+
+MODEL_FILES = ["mental_health_model.pkl", "vectorizer.pkl", "label_encoder.pkl"]
+
+# How per-window class probabilities of a long statement are combined
+WINDOW_AGGREGATES = ("mean", "max")
+
+
+def compute_model_version(directory: str = data_directory) -> str:
+    """Short content hash of the model artifacts, used to tell model versions apart."""
+    digest = hashlib.sha256()
+    for filename in MODEL_FILES:
+        with open(os.path.join(directory, filename), "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def dump_atomically(value, path: str):
+    """Pickle ``value`` next to ``path`` and rename it into place, so readers never see a partial file."""
+    joblib.dump(value, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+def load_model_components(
+        directory: str = data_directory,
+        artifact_directory: str = MODEL_ARTIFACT_DIRECTORY,
+        scorer: str = SENTIMENT_SCORER,
+) -> dict:
+    """Load one model version: the scorer (artifact or pickles) and its label encoder.
+
+    An artifact is only used if its manifest's ``model_version`` matches the
+    content hash of the pickles; one left over from before a retrain or a
+    swap of the pickles is ignored, since its classes may no longer line up
+    with the label encoder.
+    """
+    components = {"model": None, "vectorizer": None, "linear_scorer": None}
+    model_version = compute_model_version(directory)
+    manifest = read_manifest(artifact_directory) if scorer != "sklearn" and artifact_directory else None
+    if manifest is not None and manifest.get("model_version") != model_version:
+        logger.warning(f"Ignoring stale model artifact in {artifact_directory}: it was built for model "
+                       f"{manifest.get('model_version')}, but the pickles are {model_version}")
+        manifest = None
+
+    if manifest is not None:
+        # Memory-mapped arrays: workers share pages and skip unpickling the vocabulary
+        logger.info(f"Loading memory-mapped model artifact from {artifact_directory}")
+        components["linear_scorer"] = load_model_artifact(artifact_directory)
+        components["model_version"] = model_version
+    else:
+        components["model"] = joblib.load(os.path.join(directory, "mental_health_model.pkl"))
+        components["vectorizer"] = joblib.load(os.path.join(directory, "vectorizer.pkl"))
+        components["model_version"] = model_version
+        if scorer == "linear":
+            components["linear_scorer"] = LinearScorer.from_pipeline(
+                components["vectorizer"], components["model"], components["model_version"]
+            )
+    components["label_encoder"] = joblib.load(os.path.join(directory, "label_encoder.pkl"))
+    return components
+
+
+def score_batch(processed_texts: list[str], model, vectorizer, linear_scorer, label_encoder):
+    """Score preprocessed statements with the given model components."""
+    if not processed_texts:
+        return []
+
+    if linear_scorer is not None:
+        # Score straight from the exported arrays, skipping sklearn's validation
+        confidence_scores = linear_scorer.predict_proba(processed_texts)
+        predictions = linear_scorer.classes_[confidence_scores.argmax(axis=1)]
+    else:
+        # Vectorize the whole batch into one sparse matrix
+        input_matrix = vectorizer.transform(processed_texts)
+
+        # One predict_proba call; the predicted class is the most probable column
+        confidence_scores = model.predict_proba(input_matrix)
+        predictions = model.classes_[confidence_scores.argmax(axis=1)]
+
+    # Decode all labels at once
+    sentiments = label_encoder.inverse_transform(predictions)
+
+    return list(zip(sentiments, confidence_scores.tolist()))
+
+
+def score_windows(processed_windows: list[str], aggregate: str, model, vectorizer, linear_scorer, label_encoder):
+    """Score the windows of one long statement and combine them into a single prediction.
+
+    ``mean`` averages the class probabilities; ``max`` takes each class's
+    highest window probability and renormalizes so the scores sum to one.
+    """
+    if aggregate not in WINDOW_AGGREGATES:
+        raise ValueError(f"Unknown window aggregate '{aggregate}', expected one of {WINDOW_AGGREGATES}")
+
+    results = score_batch(processed_windows, model, vectorizer, linear_scorer, label_encoder)
+    probabilities = np.array([confidence_scores for _, confidence_scores in results], dtype=np.float64)
+    if aggregate == "mean":
+        combined = probabilities.mean(axis=0)
+    else:
+        combined = probabilities.max(axis=0)
+        combined /= combined.sum()
+
+    classes = (linear_scorer if linear_scorer is not None else model).classes_
+    sentiment = label_encoder.inverse_transform(classes[[combined.argmax()]])[0]
+    return sentiment, combined.tolist()
@@ -1,10 +1,165 @@
 import re
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
+import os
+import gzip
+import json
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Anything that is not an ASCII letter becomes a token boundary
+NON_ALPHA_PATTERN = re.compile(r'[^a-zA-Z]')
+
+# Prebuilt stopword/lemma tables; when present, serving needs no NLTK corpora
+PREPROCESSING_TABLES_PATH = os.path.join(
+    os.path.dirname(__file__), '../../data', 'preprocessing_tables.json.gz'
+)
+PREPROCESSING_TABLES_VERSION = 1
+
+# Upper bound on distinct tokens remembered by the lemma memo
+LEMMA_MEMO_SIZE = int(os.getenv("LEMMA_MEMO_SIZE", "50000"))
+
+# WordNet noun suffix rules (old, new) used by WordNetLemmatizer.lemmatize
+NOUN_SUBSTITUTIONS = [
+    ("s", ""), ("ses", "s"), ("xes", "x"), ("zes", "z"),
+    ("ches", "ch"), ("shes", "sh"), ("men", "man"), ("ies", "y"),
+]
+
+
+class TextPreprocessor:
+    """Long-lived equivalent of the training notebook's ``preprocess_text``.
+
+    The stopword set is frozen and the regex precompiled once. Lemmas come
+    either from a prebuilt lookup table (tokens missing from it are already
+    their own lemma) or from NLTK's WordNetLemmatizer behind a bounded memo.
+    """
+
+    def __init__(
+            self,
+            stop_words: Iterable[str],
+            lemma_table: Optional[Dict[str, str]] = None,
+            lemmatize=None,
+            memo_size: int = LEMMA_MEMO_SIZE,
+    ):
+        self.stop_words = frozenset(stop_words)
+        self.lemma_table = lemma_table
+        if lemma_table is not None:
+            self._lemmatize = lambda word: lemma_table.get(word, word)
+        else:
+            if lemmatize is None:
+                raise ValueError("Either lemma_table or lemmatize must be provided")
+            self._lemmatize = lru_cache(maxsize=memo_size)(lemmatize)
+
+    @classmethod
+    def from_nltk(cls, memo_size: int = LEMMA_MEMO_SIZE) -> "TextPreprocessor":
+        """Build from the NLTK corpora, loading WordNet eagerly instead of on first use."""
+        from nltk.corpus import stopwords, wordnet
+        from nltk.stem import WordNetLemmatizer
+
+        wordnet.ensure_loaded()
+        return cls(stopwords.words('english'), lemmatize=WordNetLemmatizer().lemmatize, memo_size=memo_size)
+
+    @classmethod
+    def from_tables(cls, path: str = PREPROCESSING_TABLES_PATH) -> "TextPreprocessor":
+        """Build from a tables artifact written by ``build_preprocessing_tables``."""
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            tables = json.load(f)
+        if tables.get("version") != PREPROCESSING_TABLES_VERSION:
+            raise ValueError(f"Unsupported preprocessing tables version: {tables.get('version')}")
+        return cls(tables["stopwords"], lemma_table=tables["lemmas"])
+
+    @classmethod
+    def load(cls) -> "TextPreprocessor":
+        """Prefer the prebuilt tables and fall back to the NLTK corpora."""
+        if os.path.exists(PREPROCESSING_TABLES_PATH):
+            logger.info(f"Loading preprocessing tables from {PREPROCESSING_TABLES_PATH}")
+            return cls.from_tables(PREPROCESSING_TABLES_PATH)
+        return cls.from_nltk()
+
+    def lemmatize(self, word: str) -> str:
+        return self._lemmatize(word)
+
+    def fingerprint(self) -> str:
+        """Hash of the stopwords and lemma source; changes whenever the output could."""
+        digest = hashlib.sha256(NON_ALPHA_PATTERN.pattern.encode("utf-8"))
+        digest.update("\n".join(sorted(self.stop_words)).encode("utf-8"))
+        if self.lemma_table is not None:
+            digest.update(json.dumps(self.lemma_table, sort_keys=True).encode("utf-8"))
+        else:
+            import nltk
+            digest.update(f"nltk-{nltk.__version__}".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def __call__(self, text: str) -> str:
+        stop_words = self.stop_words
+        lemmatize = self._lemmatize
+        text = NON_ALPHA_PATTERN.sub(' ', text).lower()
+        return ' '.join([lemmatize(word) for word in text.split() if word not in stop_words])
+
+
+_text_preprocessor: Optional[TextPreprocessor] = None
+
+
+def get_text_preprocessor() -> TextPreprocessor:
+    """Return the process-wide preprocessor, creating it on first use."""
+    global _text_preprocessor
+    if _text_preprocessor is None:
+        _text_preprocessor = TextPreprocessor.load()
+    return _text_preprocessor
+
 
 def preprocess_text(text: str) -> str:
-    lemmatizer = WordNetLemmatizer()
+    return get_text_preprocessor()(text)
+
+
+def build_preprocessing_tables(path: str = PREPROCESSING_TABLES_PATH) -> int:
+    """Write the stopword list and every noun form WordNet would change.
+
+    Candidates are the WordNet noun exceptions plus each noun lemma run
+    backwards through the suffix rules; each is lemmatized with NLTK itself,
+    so the table reproduces ``WordNetLemmatizer.lemmatize`` exactly for the
+    lowercase alphabetic tokens ``preprocess_text`` produces.
+    """
+    from nltk.corpus import stopwords, wordnet
+    from nltk.stem import WordNetLemmatizer
+
     stop_words = set(stopwords.words('english'))
-    text = re.sub(r'[^a-zA-Z]', ' ', text).lower()
-    words = [lemmatizer.lemmatize(word) for word in text.split() if word not in stop_words]
-    return ' '.join(words)
+    lemmatizer = WordNetLemmatizer()
+
+    candidates = set(wordnet._exception_map[wordnet.NOUN])
+    for lemma in wordnet.all_lemma_names(pos=wordnet.NOUN):
+        for old, new in NOUN_SUBSTITUTIONS:
+            if lemma.endswith(new):
+                candidates.add(lemma[:len(lemma) - len(new)] + old)
+
+    lemmas = {}
+    for word in candidates:
+        if not word.isalpha() or not word.islower() or word in stop_words:
+            continue
+        lemma = lemmatizer.lemmatize(word)
+        if lemma != word:
+            lemmas[word] = lemma
+
+    tables = {
+        "version": PREPROCESSING_TABLES_VERSION,
+        "stopwords": sorted(stop_words),
+        "lemmas": dict(sorted(lemmas.items())),
+    }
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(tables, f, separators=(",", ":"))
+
+    logger.info(f"Wrote {len(lemmas)} lemma entries to {path}")
+    return len(lemmas)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build the prebuilt preprocessing tables artifact")
+    parser.add_argument("--output", default=PREPROCESSING_TABLES_PATH)
+    args = parser.parse_args()
+    build_preprocessing_tables(args.output)
@@ -1,15 +1,29 @@
-import joblib
-import os
+import logging
+from server.app.models.preprocessing import preprocess_text
+from server.app.models.model_loader import (  # noqa: F401
+    MODEL_FILES,
+    SENTIMENT_SCORER,
+    compute_model_version,
+    data_directory,
+    load_model_components,
+    score_batch,
+    score_windows,
+)
 
-# Define the correct path to the data directory
-data_directory = os.path.join(os.path.dirname(__file__), '../../data')
+logger = logging.getLogger(__name__)
 
 # Load the trained model, vectorizer, and label encoder from the 'data' directory
-model = joblib.load(os.path.join(data_directory, "mental_health_model.pkl"))
-vectorizer = joblib.load(os.path.join(data_directory, "vectorizer.pkl"))
-label_encoder = joblib.load(os.path.join(data_directory, "label_encoder.pkl"))
+_components = load_model_components()
+model = _components["model"]
+vectorizer = _components["vectorizer"]
+linear_scorer = _components["linear_scorer"]
+model_version = _components["model_version"]
+label_encoder = _components["label_encoder"]
 
 def predict_sentiment(processed_text: str):
+    if linear_scorer is not None:
+        return predict_sentiment_batch([processed_text])[0]
+
     # Transform the text into vector format
     input_vector = vectorizer.transform([processed_text])
 
@@ -21,3 +35,15 @@ def predict_sentiment(processed_text: str):
     sentiment = label_encoder.inverse_transform(prediction)[0]
 
     return sentiment, confidence_scores.tolist()[0]
+
+def predict_sentiment_batch(processed_texts: list[str]):
+    """Score many preprocessed statements with a single pass through the pipeline."""
+    return score_batch(processed_texts, model, vectorizer, linear_scorer, label_encoder)
+
+def predict_sentiment_windows(processed_windows: list[str], aggregate: str):
+    """Score the windows of one long statement as a single aggregated prediction."""
+    return score_windows(processed_windows, aggregate, model, vectorizer, linear_scorer, label_encoder)
+
+def score_statements(statements: list[str]):
+    """Preprocess and score raw statements; the unit of work for background inference workers."""
+    return predict_sentiment_batch([preprocess_text(statement) for statement in statements])
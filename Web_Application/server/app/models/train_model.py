@@ -0,0 +1,333 @@
+import os
+import gzip
+import json
+import time
+import shutil
+import hashlib
+import logging
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from server.app.models import model_loader
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Preprocessed corpora, keyed by the hash of the raw statements and the preprocessor
+TRAINING_CACHE_DIRECTORY = os.getenv(
+    "TRAINING_CACHE_DIRECTORY", os.path.join(model_loader.data_directory, "training_cache")
+)
+TRAINING_PREPROCESS_CHUNK_SIZE = int(os.getenv("TRAINING_PREPROCESS_CHUNK_SIZE", "2000"))
+TRAINING_REPORT_FILE = "training_report.json"
+
+IMBALANCE_MODES = ("class_weight", "oversample", "none")
+# The notebook's grid; liblinear is opt-in because recent scikit-learn
+# releases reject it for more than two classes
+DEFAULT_C_VALUES = (0.1, 1.0, 10.0)
+DEFAULT_SOLVERS = ("lbfgs",)
+
+
+class StageTimer:
+    """Wall-clock seconds per named training stage, in the order they ran."""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = time.perf_counter() - started_at
+            logger.info(f"Stage '{name}' took {self.seconds[name]:.2f}s")
+
+
+def load_training_set(path: str):
+    """Statements and labels from a ``Statement``/``Status`` CSV.
+
+    Missing statements become 'Missing Statement' as in the notebook; rows
+    without a status are dropped instead of being learned as a class.
+    """
+    import pandas as pd
+
+    frame = pd.read_csv(path, usecols=["Statement", "Status"])
+    dropped = int(frame["Status"].isna().sum())
+    if dropped:
+        logger.warning(f"Dropping {dropped} rows without a Status")
+        frame = frame[frame["Status"].notna()]
+    statements = frame["Statement"].fillna("Missing Statement").astype(str).tolist()
+    return statements, frame["Status"].astype(str).to_numpy()
+
+
+def corpus_cache_key(statements: Sequence[str], preprocessor_fingerprint: str) -> str:
+    """Content hash of the raw statements plus the preprocessor that will transform them."""
+    digest = hashlib.sha256(preprocessor_fingerprint.encode("utf-8"))
+    for statement in statements:
+        digest.update(statement.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:24]
+
+
+def _preprocess_chunk(statements: List[str]) -> List[str]:
+    from server.app.models.preprocessing import get_text_preprocessor
+
+    preprocess = get_text_preprocessor()
+    return [preprocess(statement) for statement in statements]
+
+
+def preprocess_corpus(
+        statements: List[str],
+        workers: int = os.cpu_count() or 1,
+        chunk_size: int = TRAINING_PREPROCESS_CHUNK_SIZE,
+) -> List[str]:
+    """Preprocess statements across ``workers`` processes (0 runs in this one), keeping order."""
+    chunks = [statements[i:i + chunk_size] for i in range(0, len(statements), chunk_size)]
+    if workers <= 0 or len(chunks) <= 1:
+        return [text for chunk in chunks for text in _preprocess_chunk(chunk)]
+
+    with ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)),
+            mp_context=multiprocessing.get_context("spawn"),
+    ) as pool:
+        return [text for chunk in pool.map(_preprocess_chunk, chunks) for text in chunk]
+
+
+def load_or_preprocess(
+        statements: List[str],
+        cache_directory: Optional[str] = TRAINING_CACHE_DIRECTORY,
+        workers: int = os.cpu_count() or 1,
+):
+    """Preprocessed statements from the on-disk cache, or computed and cached.
+
+    Returns the texts and whether they came from the cache. ``cache_directory``
+    of None disables caching.
+    """
+    from server.app.models.preprocessing import get_text_preprocessor
+
+    if cache_directory is None:
+        return preprocess_corpus(statements, workers), False
+
+    key = corpus_cache_key(statements, get_text_preprocessor().fingerprint())
+    path = os.path.join(cache_directory, f"corpus-{key}.json.gz")
+    if os.path.exists(path):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            texts = json.load(f)
+        if len(texts) == len(statements):
+            logger.info(f"Loaded preprocessed corpus from {path}")
+            return texts, True
+        logger.warning(f"Ignoring corpus cache {path} with {len(texts)} rows, expected {len(statements)}")
+
+    texts = preprocess_corpus(statements, workers)
+    os.makedirs(cache_directory, exist_ok=True)
+    with gzip.open(path + ".tmp", "wt", encoding="utf-8") as f:
+        json.dump(texts, f)
+    os.replace(path + ".tmp", path)
+    logger.info(f"Cached preprocessed corpus at {path}")
+    return texts, False
+
+
+def oversample_indices(labels: np.ndarray, seed: int = 42) -> np.ndarray:
+    """Row indices that repeat minority-class rows until every class matches the largest.
+
+    Indexing the sparse TF-IDF matrix with these only duplicates row pointers
+    into the same nonzeros, unlike SMOTE, which densifies synthetic rows. This
+    is the scripted counterpart of the notebook's SMOTE step
+    (data/chatbot_model.ipynb); the notebook keeps using imblearn.
+    """
+    rng = np.random.default_rng(seed)
+    classes, counts = np.unique(labels, return_counts=True)
+    target = counts.max()
+    indices = [np.arange(len(labels))]
+    for label, count in zip(classes, counts):
+        if count < target:
+            members = np.flatnonzero(labels == label)
+            indices.append(rng.choice(members, size=target - count, replace=True))
+    return np.concatenate(indices)
+
+
+def oversampled_splits(folds, labels: np.ndarray, seed: int = 42) -> list:
+    """Cross-validation splits whose fit rows are oversampled and whose validation rows are not.
+
+    Resampling inside each fold, after the split, keeps copies of a row from
+    landing on both sides of it, which would inflate the validation score and
+    bias the parameter search. The fit indices repeat rows, so no resampled
+    matrix is ever built.
+    """
+    return [
+        (fit_rows[oversample_indices(labels[fit_rows], seed)], validation_rows)
+        for fit_rows, validation_rows in folds.split(np.zeros(len(labels)), labels)
+    ]
+
+
+def write_model_files(model, vectorizer, label_encoder, output_directory: str, artifact: bool = True) -> str:
+    """Write the three pickles the server loads and, optionally, the model artifact.
+
+    Without ``artifact`` any existing artifact in the output directory is
+    removed, since the server would otherwise keep serving the old model.
+    Returns the new model version.
+    """
+    from server.app.models.linear_scorer import export_linear_model
+    from server.app.models.model_artifact import write_model_artifact
+
+    os.makedirs(output_directory, exist_ok=True)
+    for name, value in zip(model_loader.MODEL_FILES, (model, vectorizer, label_encoder)):
+        model_loader.dump_atomically(value, os.path.join(output_directory, name))
+    model_version = model_loader.compute_model_version(output_directory)
+
+    artifact_directory = os.path.join(output_directory, "model_artifact")
+    if artifact:
+        write_model_artifact(export_linear_model(vectorizer, model), artifact_directory, model_version)
+    elif os.path.isdir(artifact_directory):
+        logger.warning(f"Removing stale model artifact at {artifact_directory}")
+        shutil.rmtree(artifact_directory)
+
+    logger.info(f"Wrote model {model_version} to {output_directory}")
+    return model_version
+
+
+def train(
+        input_path: str,
+        output_directory: str = model_loader.data_directory,
+        imbalance: str = "class_weight",
+        c_values: Sequence[float] = DEFAULT_C_VALUES,
+        solvers: Sequence[str] = DEFAULT_SOLVERS,
+        cv: int = 5,
+        test_size: float = 0.2,
+        workers: int = os.cpu_count() or 1,
+        cache_directory: Optional[str] = TRAINING_CACHE_DIRECTORY,
+        artifact: bool = True,
+        seed: int = 42,
+) -> dict:
+    """Train the served sentiment model from a CSV and write it where the server loads it.
+
+    Stages: load, preprocess (cached, parallel), vectorize, cross-validated
+    grid search (parallel over folds and parameters), evaluate on a held-out
+    split, write. The split happens before any resampling, and oversampling is
+    redone inside each cross-validation fold, so neither test nor validation
+    rows leak into training. Returns (and writes next to the model) a report
+    with the best parameters, test metrics and seconds per stage.
+    """
+    from sklearn.base import clone
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import accuracy_score, classification_report, f1_score
+    from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
+    from sklearn.preprocessing import LabelEncoder
+
+    if imbalance not in IMBALANCE_MODES:
+        raise ValueError(f"Unknown imbalance mode '{imbalance}', expected one of {IMBALANCE_MODES}")
+
+    timer = StageTimer()
+    with timer.stage("load"):
+        statements, statuses = load_training_set(input_path)
+
+    with timer.stage("preprocess"):
+        texts, cache_hit = load_or_preprocess(statements, cache_directory, workers)
+
+    with timer.stage("vectorize"):
+        label_encoder = LabelEncoder().fit(statuses)
+        labels = label_encoder.transform(statuses)
+        train_texts, test_texts, y_train, y_test = train_test_split(
+            texts, labels, test_size=test_size, random_state=seed, stratify=labels
+        )
+        vectorizer = TfidfVectorizer(ngram_range=(1, 2))
+        X_train = vectorizer.fit_transform(train_texts)
+        X_test = vectorizer.transform(test_texts)
+
+    with timer.stage("grid_search"):
+        folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=seed)
+        oversample = imbalance == "oversample"
+        grid_search = GridSearchCV(
+            LogisticRegression(max_iter=1000, class_weight="balanced" if imbalance == "class_weight" else None),
+            {"C": list(c_values), "solver": list(solvers)},
+            cv=oversampled_splits(folds, y_train, seed) if oversample else folds,
+            scoring="accuracy",
+            n_jobs=workers if workers > 0 else None,
+            # The oversampled refit is done below
+            refit=not oversample,
+        )
+        grid_search.fit(X_train, y_train)
+        if oversample:
+            indices = oversample_indices(y_train, seed)
+            model = clone(grid_search.estimator).set_params(**grid_search.best_params_)
+            model.fit(X_train[indices], y_train[indices])
+        else:
+            model = grid_search.best_estimator_
+
+    with timer.stage("evaluate"):
+        predictions = model.predict(X_test)
+        class_names = [str(label) for label in label_encoder.classes_]
+        metrics = {
+            "accuracy": float(accuracy_score(y_test, predictions)),
+            "macro_f1": float(f1_score(y_test, predictions, average="macro")),
+            "per_class": classification_report(
+                y_test, predictions, labels=np.arange(len(class_names)), target_names=class_names,
+                output_dict=True, zero_division=0,
+            ),
+        }
+
+    with timer.stage("write"):
+        model_version = write_model_files(model, vectorizer, label_encoder, output_directory, artifact)
+
+    classes, counts = np.unique(statuses, return_counts=True)
+    report = {
+        "model_version": model_version,
+        "input": os.path.abspath(input_path),
+        "rows": len(statements),
+        "class_counts": {str(label): int(count) for label, count in zip(classes, counts)},
+        "imbalance": imbalance,
+        "best_params": grid_search.best_params_,
+        "cv_accuracy": float(grid_search.best_score_),
+        "features": len(vectorizer.vocabulary_),
+        "test": metrics,
+        "corpus_cache_hit": cache_hit,
+        "workers": workers,
+        "stage_seconds": timer.seconds,
+    }
+    with open(os.path.join(output_directory, TRAINING_REPORT_FILE), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Train the sentiment model served by /predict")
+    parser.add_argument("input", help="Statement/Status CSV, e.g. 'Mental Health Sentiments.csv'")
+    parser.add_argument(
+        "--output-dir", default=model_loader.data_directory,
+        help="Where to write the pickles; a data/models/<version> directory stages a registry candidate",
+    )
+    parser.add_argument("--imbalance", default="class_weight", choices=IMBALANCE_MODES)
+    parser.add_argument("--C", dest="c_values", type=float, nargs="+", default=list(DEFAULT_C_VALUES))
+    parser.add_argument("--solvers", nargs="+", default=list(DEFAULT_SOLVERS))
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="0 runs every stage in this process")
+    parser.add_argument("--cache-dir", default=TRAINING_CACHE_DIRECTORY)
+    parser.add_argument("--no-cache", action="store_true", help="Always preprocess from scratch")
+    parser.add_argument("--no-artifact", action="store_true", help="Skip (and remove) the model artifact")
+    args = parser.parse_args()
+
+    report = train(
+        args.input,
+        args.output_dir,
+        args.imbalance,
+        args.c_values,
+        args.solvers,
+        args.cv,
+        args.test_size,
+        args.workers,
+        None if args.no_cache else args.cache_dir,
+        not args.no_artifact,
+    )
+    print(f"Model {report['model_version']}: test accuracy {report['test']['accuracy']:.4f}, "
+          f"macro F1 {report['test']['macro_f1']:.4f}, best {report['best_params']}")
+    for name, seconds in report["stage_seconds"].items():
+        print(f"  {name:<12} {seconds:8.2f}s")
@@ -1,10 +1,11 @@
 import os
 import datetime
-from typing import Optional
+from typing import Optional, Tuple
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from server.app.models.user import UserIn, UserOut, Token
-from server.app.utils.database import users_collection
+from server.app.services.password_hasher import PASSWORD_HASH_RETRY_AFTER, PasswordHasher, PasswordHashingBusy
+from server.app.services.token_cache import RevocationCheck, TokenRevoked, VerifiedTokenCache
+from server.app.utils.database import get_async_database
 from fastapi import HTTPException, status
 import logging
 from dotenv import load_dotenv
@@ -30,17 +31,42 @@ if not SECRET_KEY:
     logger.error("JWT_SECRET/SECRET_KEY environment variable is not set!")
     raise ValueError("JWT_SECRET/SECRET_KEY environment variable is not set")
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt runs on its own bounded pool, not the thread pool sync endpoints share
+password_hasher = PasswordHasher()
+
+
+# Claims of already-verified tokens, so repeat requests skip the signature check
+token_cache = VerifiedTokenCache()
+
+
+def set_token_revocation_check(check: Optional[RevocationCheck]):
+    """Install the denylist consulted for every token, cached or not (None removes it)."""
+    token_cache.is_revoked = check
+
+
+def hashing_unavailable() -> HTTPException:
+    # Raised when the hashing queue is saturated so clients back off
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy, please retry",
+        headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER)},
+    )
 
 
 # Utility functions for password handling
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def hash_password(password: str) -> str:
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHashingBusy:
+        raise hashing_unavailable()
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Whether the password matches, and a replacement hash if the stored one needs an update."""
+    try:
+        return await password_hasher.verify_and_update(plain_password, hashed_password)
+    except PasswordHashingBusy:
+        raise hashing_unavailable()
 
 
 # JWT Token creation
@@ -59,11 +85,11 @@ def create_access_token(data: dict, expires_delta: Optional[datetime.timedelta]
 
 
 # Register new user
-def register_user(user: UserIn) -> UserOut:
+async def register_user(user: UserIn) -> UserOut:
     logger.info(f"Attempting to register user with email: {user.email}")
 
     # Check if user already exists
-    existing_user = users_collection.find_one({"email": user.email})
+    existing_user = await get_async_database()["users"].find_one({"email": user.email})
     if existing_user:
         logger.warning(f"Registration failed: Email already registered: {user.email}")
         raise HTTPException(
@@ -75,14 +101,14 @@ def register_user(user: UserIn) -> UserOut:
     user_data = {
         "username": user.username,
         "email": user.email,
-        "password": hash_password(user.password),
+        "password": await hash_password(user.password),
         "mobileNumber": user.mobileNumber,
         "emergencyContact": user.emergencyContact,
     }
 
     # Insert user into database
     try:
-        result = users_collection.insert_one(user_data)
+        result = await get_async_database()["users"].insert_one(user_data)
         logger.info(f"User registered successfully with ID: {result.inserted_id}")
 
         # Verify insertion
@@ -107,11 +133,11 @@ def register_user(user: UserIn) -> UserOut:
 
 
 # Authenticate user and create access token
-def login_user(email: str, password: str) -> Token:
+async def login_user(email: str, password: str) -> Token:
     logger.info(f"Login attempt for user: {email}")
 
     # Find user in database
-    user = users_collection.find_one({"email": email})
+    user = await get_async_database()["users"].find_one({"email": email})
 
     # Debug information
     if not user:
@@ -122,13 +148,22 @@ def login_user(email: str, password: str) -> Token:
         )
 
     # Verify password
-    if not verify_password(password, user["password"]):
+    valid, new_hash = await verify_password(password, user["password"])
+    if not valid:
         logger.warning(f"Login failed: Invalid password for user: {email}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid credentials",
         )
 
+    # Upgrade hashes made with another bcrypt cost; the login succeeds either way
+    if new_hash is not None:
+        try:
+            await get_async_database()["users"].update_one({"_id": user["_id"]}, {"$set": {"password": new_hash}})
+            logger.info(f"Rehashed password for user: {email}")
+        except Exception as e:
+            logger.warning(f"Rehashing password failed for user {email}: {str(e)}")
+
     # Create and return token
     access_token = create_access_token(
         data={"sub": email},
@@ -138,6 +173,11 @@ def login_user(email: str, password: str) -> Token:
     return Token(access_token=access_token, token_type="bearer")
 
 
+def decode_token(token: str) -> dict:
+    # Verifies the signature and exp; raises JWTError otherwise
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
 # Decode the token to get email
 def get_email_from_token(token: str) -> str:
     if not SECRET_KEY:
@@ -148,7 +188,7 @@ def get_email_from_token(token: str) -> str:
         )
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = token_cache.verify(token, decode_token)
         email = payload.get("sub")
         if not email:
             logger.warning("Token validation failed: Missing subject claim")
@@ -157,7 +197,7 @@ def get_email_from_token(token: str) -> str:
                 detail="Invalid token"
             )
         return email
-    except JWTError as e:
+    except (JWTError, TokenRevoked) as e:
         logger.warning(f"Token validation failed: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
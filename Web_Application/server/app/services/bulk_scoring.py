@@ -0,0 +1,221 @@
+import os
+import csv
+import json
+import asyncio
+import logging
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+from server.app.services.inference_executor import InferenceQueueFull
+from server.app.services.statement_limits import STATEMENT_MAX_CHARS, cap_statement
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Statements scored per executor call
+BULK_SCORING_CHUNK_SIZE = int(os.getenv("BULK_SCORING_CHUNK_SIZE", "256"))
+# Chunks scored concurrently per request; the request body is not read further
+# until one of them finishes and its results have been sent
+BULK_SCORING_MAX_IN_FLIGHT = int(os.getenv("BULK_SCORING_MAX_IN_FLIGHT", "2"))
+# Hard cap on rows per request; clients may ask for less
+BULK_SCORING_MAX_ROWS = int(os.getenv("BULK_SCORING_MAX_ROWS", "500000"))
+BULK_SCORING_MAX_LINE_BYTES = int(os.getenv("BULK_SCORING_MAX_LINE_BYTES", str(1 << 20)))
+# How long a chunk may wait for a free inference slot before the stream fails
+BULK_SCORING_QUEUE_TIMEOUT_SECONDS = float(os.getenv("BULK_SCORING_QUEUE_TIMEOUT_SECONDS", "30"))
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-lines")
+CSV_CONTENT_TYPES = ("text/csv", "application/csv")
+
+# (row number, client-supplied id, statement or None, parse error or None)
+Row = Tuple[int, Optional[object], Optional[str], Optional[str]]
+
+
+class BulkInputError(Exception):
+    """The request body cannot be read any further (e.g. a line is too long)."""
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = BULK_SCORING_MAX_LINE_BYTES):
+    """Decode a byte stream into lines without holding more than one line in memory."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8").rstrip("\r")
+        if len(buffer) > max_line_bytes:
+            raise BulkInputError(f"Line longer than {max_line_bytes} bytes")
+    if buffer:
+        yield buffer.decode("utf-8").rstrip("\r")
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[Row]:
+    """Rows from NDJSON: each line is a string or an object with a ``statement`` field."""
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            value = json.loads(line)
+        except ValueError:
+            yield row, None, None, "Invalid JSON"
+            continue
+        if isinstance(value, str):
+            yield row, None, value, None
+        elif isinstance(value, dict) and isinstance(value.get("statement", value.get("Statement")), str):
+            yield row, value.get("id"), value.get("statement", value.get("Statement")), None
+        else:
+            yield row, value.get("id") if isinstance(value, dict) else None, None, "Missing 'statement' string"
+
+
+async def iter_csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[Row]:
+    """Rows from CSV with a ``Statement`` column (and an optional ``id`` column).
+
+    Quoted fields may span lines; a record ends at the first newline where the
+    quotes seen so far are balanced.
+    """
+    header = None
+    statement_column = id_column = None
+    row = 0
+    record = []
+    quotes = 0
+    async for line in lines:
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        text = "\n".join(record)
+        record, quotes = [], 0
+        if not text.strip():
+            continue
+        fields = next(csv.reader([text]))
+
+        if header is None:
+            header = fields
+            columns = {name.strip(): i for i, name in enumerate(header)}
+            statement_column = columns.get("Statement", columns.get("statement"))
+            id_column = columns.get("id")
+            if statement_column is None:
+                raise BulkInputError("CSV header has no 'Statement' column")
+            continue
+
+        row += 1
+        row_id = fields[id_column] if id_column is not None and id_column < len(fields) else None
+        if statement_column >= len(fields):
+            yield row, row_id, None, "Missing 'Statement' value"
+        else:
+            yield row, row_id, fields[statement_column], None
+    if record:
+        raise BulkInputError("Unterminated quoted field at end of CSV")
+
+
+async def score_with_backpressure(
+        score_chunk: Callable[[List[str]], Awaitable[list]],
+        statements: List[str],
+        timeout: float = BULK_SCORING_QUEUE_TIMEOUT_SECONDS,
+) -> list:
+    """Score a chunk, waiting (with backoff) while the inference queue is full."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    delay = 0.01
+    while True:
+        try:
+            return await score_chunk(statements)
+        except InferenceQueueFull:
+            if loop.time() + delay > deadline:
+                raise
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+
+def _line(value: dict) -> bytes:
+    return (json.dumps(value) + "\n").encode("utf-8")
+
+
+async def stream_scores(
+        rows: AsyncIterator[Row],
+        score_chunk: Callable[[List[str]], Awaitable[list]],
+        model_version: str,
+        chunk_size: int = BULK_SCORING_CHUNK_SIZE,
+        max_in_flight: int = BULK_SCORING_MAX_IN_FLIGHT,
+        max_rows: int = BULK_SCORING_MAX_ROWS,
+        max_chars: int = STATEMENT_MAX_CHARS,
+) -> AsyncIterator[bytes]:
+    """Score rows in fixed-size chunks and yield one NDJSON result line per row.
+
+    Results keep the input order. At most ``max_in_flight`` chunks are being
+    scored at once; the input is only read further when the consumer has
+    taken the results of the oldest chunk, so memory stays bounded by
+    ``chunk_size * (max_in_flight + 1)`` rows. Statements are capped at
+    ``max_chars`` like on ``/predict/batch``. The last line is a summary;
+    problems after the response has started are reported there.
+    """
+    pending = deque()
+    scored = failed = 0
+    truncated = False
+    error = None
+
+    async def drain(chunk_rows, capped, task):
+        nonlocal scored, failed
+        results = iter(await task)
+        was_truncated = iter(capped)
+        lines = []
+        for row, row_id, statement, row_error in chunk_rows:
+            if row_error is not None:
+                failed += 1
+                lines.append(_line({"row": row, "id": row_id, "error": row_error}))
+                continue
+            sentiment, confidence_scores = next(results)
+            scored += 1
+            lines.append(_line({
+                "row": row,
+                "id": row_id,
+                "sentiment": sentiment,
+                "confidence": confidence_scores,
+                "truncated": next(was_truncated),
+                "model_version": model_version,
+            }))
+        return b"".join(lines)
+
+    def submit(chunk_rows):
+        capped = [cap_statement(statement, max_chars) for _, _, statement, row_error in chunk_rows if row_error is None]
+        statements = [statement for statement, _ in capped]
+        if statements:
+            task = asyncio.ensure_future(score_with_backpressure(score_chunk, statements))
+        else:
+            task = asyncio.get_running_loop().create_future()
+            task.set_result([])
+        pending.append((chunk_rows, [truncated for _, truncated in capped], task))
+
+    chunk = []
+    try:
+        async for row in rows:
+            if row[0] > max_rows:
+                truncated = True
+                break
+            chunk.append(row)
+            if len(chunk) < chunk_size:
+                continue
+            submit(chunk)
+            chunk = []
+            if len(pending) >= max_in_flight:
+                yield await drain(*pending.popleft())
+        if chunk:
+            submit(chunk)
+        while pending:
+            yield await drain(*pending.popleft())
+    except (BulkInputError, UnicodeDecodeError, InferenceQueueFull) as e:
+        error = str(e) or type(e).__name__
+    except Exception as e:
+        logger.error(f"Bulk scoring failed after {scored} rows: {str(e)}")
+        error = "Scoring failed"
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+    summary = {"rows": scored + failed, "scored": scored, "failed": failed, "truncated": truncated}
+    if truncated:
+        summary["error"] = f"Row limit of {max_rows} reached; remaining rows were not scored"
+    if error is not None:
+        summary["error"] = error
+    yield _line({"summary": summary})
@@ -0,0 +1,190 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from server.app.services.inference_executor import InferenceQueueFull
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Messages waiting to be tagged; further messages are dropped, never delayed
+CHAT_SENTIMENT_QUEUE_SIZE = int(os.getenv("CHAT_SENTIMENT_QUEUE_SIZE", "1000"))
+# Messages scored per inference call, and how long to wait to fill a batch
+CHAT_SENTIMENT_BATCH_SIZE = int(os.getenv("CHAT_SENTIMENT_BATCH_SIZE", "64"))
+CHAT_SENTIMENT_MAX_WAIT_MS = float(os.getenv("CHAT_SENTIMENT_MAX_WAIT_MS", "50"))
+# Recent tags kept per room, and rooms kept, for moderation dashboards
+CHAT_SENTIMENT_HISTORY = int(os.getenv("CHAT_SENTIMENT_HISTORY", "100"))
+CHAT_SENTIMENT_MAX_ROOMS = int(os.getenv("CHAT_SENTIMENT_MAX_ROOMS", "1000"))
+# "store" only keeps tags for the moderation endpoints; "room" also sends each
+# tag to the room as a follow-up event
+CHAT_SENTIMENT_PUBLISH = os.getenv("CHAT_SENTIMENT_PUBLISH", "store")
+# "database" also writes every tag (never the message text) to MongoDB in
+# batches; "none" keeps tags in memory only
+CHAT_SENTIMENT_PERSIST = os.getenv("CHAT_SENTIMENT_PERSIST", "database")
+CHAT_SENTIMENT_COLLECTION = "chat_sentiment"
+
+# Scores message texts; returns the model version and one (sentiment, confidence) per text
+ScoreBatch = Callable[[List[str]], Awaitable[Tuple[str, list]]]
+
+
+class ChatSentimentTagger:
+    """Tags chat messages with a sentiment label off the message delivery path.
+
+    ``submit`` never waits: messages go into a bounded queue and are dropped
+    (and counted) when it is full. A background task takes up to
+    ``batch_size`` messages at a time, waiting at most ``max_wait_ms`` for a
+    batch to fill, scores them with one ``score_batch`` call and hands each
+    tag to ``publish``. The last ``history`` tags per room are kept in memory;
+    ``record``, if given, gets a copy of each tag to persist and must not block
+    (e.g. a write-behind buffer's ``add``).
+    """
+
+    def __init__(
+            self,
+            score_batch: ScoreBatch,
+            publish: Optional[Callable[[str, dict], Awaitable[None]]] = None,
+            max_queue: int = CHAT_SENTIMENT_QUEUE_SIZE,
+            batch_size: int = CHAT_SENTIMENT_BATCH_SIZE,
+            max_wait_ms: float = CHAT_SENTIMENT_MAX_WAIT_MS,
+            history: int = CHAT_SENTIMENT_HISTORY,
+            max_rooms: int = CHAT_SENTIMENT_MAX_ROOMS,
+            record: Optional[Callable[[dict], object]] = None,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.score_batch = score_batch
+        self.publish = publish
+        self.record = record
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.history = history
+        self.max_rooms = max_rooms
+        self.recent: "OrderedDict[str, deque]" = OrderedDict()
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.tagged = 0
+        self.shed = 0
+        self.failed = 0
+        self.batches = 0
+        self.max_depth = 0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_worker(self):
+        # Bound to the loop that first uses it, like InferenceScheduler
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._worker = loop.create_task(self._run())
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(self, room_id: str, sequence: int, text: str) -> bool:
+        """Queue a message for tagging; returns False if it was dropped."""
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((room_id, sequence, text, time.time()))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    async def _collect(self) -> List[tuple]:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _remember(self, room_id: str, tag: dict):
+        tags = self.recent.get(room_id)
+        if tags is None:
+            tags = self.recent[room_id] = deque(maxlen=self.history)
+            while len(self.recent) > self.max_rooms:
+                self.recent.popitem(last=False)
+        self.recent.move_to_end(room_id)
+        tags.append(tag)
+
+    async def _tag(self, batch: List[tuple]):
+        try:
+            model_version, results = await self.score_batch([text for _, _, text, _ in batch])
+        except InferenceQueueFull:
+            # Real-time predictions win; tagging is best effort
+            self.shed += len(batch)
+            return
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Tagging {len(batch)} chat messages failed: {str(e)}")
+            return
+
+        self.batches += 1
+        for (room_id, sequence, _, sent_at), (sentiment, confidence_scores) in zip(batch, results):
+            tag = {
+                "type": "sentiment",
+                "room_id": room_id,
+                "sequence": sequence,
+                "sentiment": sentiment,
+                "confidence": max(confidence_scores),
+                "model_version": model_version,
+                "sent_at": sent_at,
+            }
+            self.tagged += 1
+            self._remember(room_id, tag)
+            if self.record is not None:
+                # A copy, since the driver adds an _id to what it inserts
+                self.record(dict(tag))
+            if self.publish is not None:
+                try:
+                    await self.publish(room_id, tag)
+                except Exception as e:
+                    logger.warning(f"Publishing chat sentiment to room {room_id} failed: {str(e)}")
+
+    async def _run(self):
+        while True:
+            await self._tag(await self._collect())
+
+    def room_tags(self, room_id: str) -> list:
+        return list(self.recent.get(room_id, ()))
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "capacity": self.max_queue,
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "tagged": self.tagged,
+            "shed": self.shed,
+            "failed": self.failed,
+            "batches": self.batches,
+            "mean_batch_size": self.tagged / self.batches if self.batches else None,
+            "rooms": len(self.recent),
+        }
+
+    async def close(self):
+        """Stop tagging; queued messages are discarded."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
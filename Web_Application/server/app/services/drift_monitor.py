@@ -0,0 +1,203 @@
+import os
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+# Length of the window compared against the one before it
+DRIFT_WINDOW_SECONDS = int(os.getenv("DRIFT_WINDOW_SECONDS", "3600"))
+# Time buckets per window; the window slides one bucket at a time
+DRIFT_BUCKETS = int(os.getenv("DRIFT_BUCKETS", "12"))
+DRIFT_CONFIDENCE_BINS = int(os.getenv("DRIFT_CONFIDENCE_BINS", "20"))
+# Unknown tokens tracked (Misra-Gries counters) and reported
+DRIFT_TOKEN_COUNTERS = int(os.getenv("DRIFT_TOKEN_COUNTERS", "256"))
+DRIFT_TOP_K = int(os.getenv("DRIFT_TOP_K", "20"))
+# Tokens inspected per prediction, and vocabulary lookups remembered
+DRIFT_MAX_TOKENS = int(os.getenv("DRIFT_MAX_TOKENS", "32"))
+DRIFT_MEMO_SIZE = int(os.getenv("DRIFT_MEMO_SIZE", "50000"))
+# Model versions monitored at once (e.g. active plus canary)
+DRIFT_MAX_VERSIONS = int(os.getenv("DRIFT_MAX_VERSIONS", "3"))
+
+
+class _Bucket:
+    """Label counts and confidence histogram for one time slice."""
+    __slots__ = ("epoch", "labels", "confidence")
+
+    def __init__(self, bins: int):
+        self.epoch = -1
+        self.labels: Dict[str, int] = {}
+        self.confidence = [0] * bins
+
+    def reset(self, epoch: int):
+        self.epoch = epoch
+        self.labels = {}
+        self.confidence = [0] * len(self.confidence)
+
+
+class TopKCounter:
+    """Misra-Gries heavy hitters: at most ``capacity`` counters, amortized O(1) per item.
+
+    Reported counts undercount by at most (items seen) / (capacity + 1).
+    """
+
+    def __init__(self, capacity: int = DRIFT_TOKEN_COUNTERS):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.total = 0
+
+    def add(self, item: str):
+        self.total += 1
+        counts = self.counts
+        if item in counts:
+            counts[item] += 1
+        elif len(counts) < self.capacity:
+            counts[item] = 1
+        else:
+            # Decrement every counter instead of adding the new item
+            for key in list(counts):
+                if counts[key] == 1:
+                    del counts[key]
+                else:
+                    counts[key] -= 1
+
+    def top(self, k: int) -> List[tuple]:
+        return sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+def population_stability_index(expected: Dict[str, int], actual: Dict[str, int], epsilon: float = 1e-4) -> Optional[float]:
+    """PSI between two label distributions; None if either has no predictions."""
+    expected_total, actual_total = sum(expected.values()), sum(actual.values())
+    if not expected_total or not actual_total:
+        return None
+    psi = 0.0
+    for label in set(expected) | set(actual):
+        e = max(expected.get(label, 0) / expected_total, epsilon)
+        a = max(actual.get(label, 0) / actual_total, epsilon)
+        psi += (a - e) * math.log(a / e)
+    return psi
+
+
+class DriftMonitor:
+    """Constant-memory picture of one model version's output distribution.
+
+    Predictions land in a ring of ``2 * buckets`` time buckets, so the latest
+    ``window_seconds`` can be compared with the window before it: label
+    counts, a fixed-bin histogram of the max-class confidence, and their PSI.
+    Tokens of the scored text that are not in the vocabulary feed a
+    Misra-Gries top-k counter; vocabulary membership is memoized because the
+    vocabulary never changes for a version.
+    """
+
+    def __init__(
+            self,
+            is_known: Callable[[str], bool],
+            window_seconds: float = DRIFT_WINDOW_SECONDS,
+            buckets: int = DRIFT_BUCKETS,
+            bins: int = DRIFT_CONFIDENCE_BINS,
+            token_counters: int = DRIFT_TOKEN_COUNTERS,
+            max_tokens: int = DRIFT_MAX_TOKENS,
+            memo_size: int = DRIFT_MEMO_SIZE,
+            clock: Callable[[], float] = time.time,
+    ):
+        self.is_known = is_known
+        self.buckets = buckets
+        self.bucket_seconds = window_seconds / buckets
+        self.bins = bins
+        self.max_tokens = max_tokens
+        self.memo_size = memo_size
+        self.clock = clock
+        self._ring = [_Bucket(bins) for _ in range(2 * buckets)]
+        self._known: Dict[str, bool] = {}
+        self.unknown_tokens = TopKCounter(token_counters)
+        self.tokens_seen = 0
+        self.predictions = 0
+        self.started_at = clock()
+
+    def _bucket(self) -> _Bucket:
+        epoch = int(self.clock() // self.bucket_seconds)
+        bucket = self._ring[epoch % len(self._ring)]
+        if bucket.epoch != epoch:
+            bucket.reset(epoch)
+        return bucket
+
+    def record(self, sentiment: str, confidence: float, processed_text: Optional[str] = None):
+        """Count one served prediction; ``processed_text`` is the preprocessed statement."""
+        bucket = self._bucket()
+        bucket.labels[sentiment] = bucket.labels.get(sentiment, 0) + 1
+        bucket.confidence[min(int(confidence * self.bins), self.bins - 1)] += 1
+        self.predictions += 1
+
+        if processed_text:
+            known = self._known
+            for token in processed_text.split()[:self.max_tokens]:
+                self.tokens_seen += 1
+                in_vocabulary = known.get(token)
+                if in_vocabulary is None:
+                    if len(known) >= self.memo_size:
+                        known.clear()
+                    in_vocabulary = known[token] = self.is_known(token)
+                if not in_vocabulary:
+                    self.unknown_tokens.add(token)
+
+    def _window(self, newest_epoch: int) -> dict:
+        labels: Dict[str, int] = {}
+        confidence = [0] * self.bins
+        for bucket in self._ring:
+            if newest_epoch - self.buckets < bucket.epoch <= newest_epoch:
+                for label, count in bucket.labels.items():
+                    labels[label] = labels.get(label, 0) + count
+                confidence = [total + count for total, count in zip(confidence, bucket.confidence)]
+
+        total = sum(labels.values())
+        mean_confidence = (
+            sum((i + 0.5) / self.bins * count for i, count in enumerate(confidence)) / total if total else None
+        )
+        return {
+            "predictions": total,
+            "labels": dict(sorted(labels.items())),
+            "label_share": {label: count / total for label, count in sorted(labels.items())} if total else {},
+            "confidence_histogram": confidence,
+            "mean_confidence": mean_confidence,
+        }
+
+    def snapshot(self, top_k: int = DRIFT_TOP_K) -> dict:
+        epoch = int(self.clock() // self.bucket_seconds)
+        current = self._window(epoch)
+        previous = self._window(epoch - self.buckets)
+        return {
+            "window_seconds": self.bucket_seconds * self.buckets,
+            "since": self.started_at,
+            "predictions": self.predictions,
+            "current": current,
+            "previous": previous,
+            "label_psi": population_stability_index(previous["labels"], current["labels"]),
+            "unknown_tokens": {
+                "top": [{"token": token, "count": count} for token, count in self.unknown_tokens.top(top_k)],
+                "unknown_rate": self.unknown_tokens.total / self.tokens_seen if self.tokens_seen else None,
+            },
+        }
+
+
+class DriftMonitors:
+    """One DriftMonitor per model version, keeping the most recently used ones."""
+
+    def __init__(self, max_versions: int = DRIFT_MAX_VERSIONS, **monitor_options):
+        self.max_versions = max_versions
+        self.monitor_options = monitor_options
+        self._monitors: "OrderedDict[str, DriftMonitor]" = OrderedDict()
+
+    def get(self, version: str, is_known: Callable[[], Callable[[str], bool]]) -> DriftMonitor:
+        """The monitor for ``version``; ``is_known`` builds its vocabulary check on first use."""
+        monitor = self._monitors.get(version)
+        if monitor is None:
+            monitor = self._monitors[version] = DriftMonitor(is_known(), **self.monitor_options)
+            while len(self._monitors) > self.max_versions:
+                self._monitors.popitem(last=False)
+        self._monitors.move_to_end(version)
+        return monitor
+
+    def snapshot(self, top_k: int = DRIFT_TOP_K) -> dict:
+        return {version: monitor.snapshot(top_k) for version, monitor in self._monitors.items()}
+
+    def reset(self):
+        self._monitors.clear()
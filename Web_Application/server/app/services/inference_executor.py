@@ -0,0 +1,156 @@
+import os
+import time
+import asyncio
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+import numpy as np
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Where CPU-bound inference runs: "inline" (on the event loop), "thread" or "process"
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "thread")
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(os.cpu_count() or 1)))
+# Submissions allowed to be queued or running before new ones are rejected
+INFERENCE_MAX_QUEUE_DEPTH = int(os.getenv("INFERENCE_MAX_QUEUE_DEPTH", "64"))
+
+BACKENDS = ("inline", "thread", "process")
+
+# Number of recent samples kept for queue-time percentiles
+_SAMPLE_WINDOW = 1000
+
+
+class InferenceQueueFull(Exception):
+    """Raised when the executor already holds ``max_queue_depth`` submissions."""
+
+
+def _initialize_worker():
+    # Load the model and preprocessor once per worker process, not per call
+    from server.app.models import sentiment_model  # noqa: F401
+    from server.app.models.preprocessing import get_text_preprocessor
+
+    get_text_preprocessor()
+
+
+def _timed_call(fn: Callable, *args):
+    # time.monotonic is system-wide on Linux, so it is comparable across processes
+    started_at = time.monotonic()
+    result = fn(*args)
+    return started_at, time.monotonic(), result
+
+
+class InferenceExecutor:
+    """Runs CPU-bound inference inline, on a thread pool, or on a process pool.
+
+    Every submission counts against ``max_queue_depth`` until it finishes;
+    beyond that ``run`` raises ``InferenceQueueFull`` so callers can shed load
+    instead of piling up work. The time each submission waited before a
+    worker picked it up is recorded as the queue time.
+    """
+
+    def __init__(
+            self,
+            backend: str = INFERENCE_BACKEND,
+            workers: int = INFERENCE_WORKERS,
+            max_queue_depth: int = INFERENCE_MAX_QUEUE_DEPTH,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.max_queue_depth = max_queue_depth
+        self._pool: Optional[Executor] = None
+        self.queue_depth = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._queue_times = deque(maxlen=_SAMPLE_WINDOW)
+        self._run_times = deque(maxlen=_SAMPLE_WINDOW)
+
+    def _get_pool(self) -> Optional[Executor]:
+        if self._pool is None and self.backend != "inline":
+            if self.backend == "process":
+                logger.info(f"Starting inference process pool with {self.workers} workers")
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_initialize_worker,
+                )
+            else:
+                logger.info(f"Starting inference thread pool with {self.workers} workers")
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        return self._pool
+
+    async def run(self, fn: Callable, *args):
+        """Run ``fn(*args)`` on the configured backend and return its result.
+
+        For the process backend ``fn`` and its arguments must be picklable,
+        i.e. module-level functions and plain data.
+        """
+        if self.queue_depth >= self.max_queue_depth:
+            self.rejected += 1
+            raise InferenceQueueFull(f"Inference queue is full ({self.queue_depth} pending)")
+
+        self.queue_depth += 1
+        self.submitted += 1
+        submitted_at = time.monotonic()
+        try:
+            pool = self._get_pool()
+            if pool is None:
+                started_at, finished_at, result = _timed_call(fn, *args)
+            else:
+                loop = asyncio.get_running_loop()
+                started_at, finished_at, result = await loop.run_in_executor(pool, _timed_call, fn, *args)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.queue_depth -= 1
+
+        self.completed += 1
+        self._queue_times.append(max(0.0, started_at - submitted_at))
+        self._run_times.append(finished_at - started_at)
+        return result
+
+    def warm_up(self):
+        """Start every worker now so the first requests do not pay for model loading."""
+        pool = self._get_pool()
+        if isinstance(pool, ProcessPoolExecutor):
+            futures = [pool.submit(_initialize_worker) for _ in range(self.workers)]
+            for future in futures:
+                future.result()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        queue_ms = np.asarray(self._queue_times) * 1000
+        run_ms = np.asarray(self._run_times) * 1000
+        queue_p50, queue_p95 = np.percentile(queue_ms, [50, 95]) if len(queue_ms) else (0.0, 0.0)
+        return {
+            "backend": self.backend,
+            "workers": self.workers if self.backend != "inline" else 0,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "queue_time_ms": {
+                "mean": float(queue_ms.mean()) if len(queue_ms) else 0.0,
+                "p50": float(queue_p50),
+                "p95": float(queue_p95),
+                "max": float(queue_ms.max()) if len(queue_ms) else 0.0,
+            },
+            "run_time_ms": {
+                "mean": float(run_ms.mean()) if len(run_ms) else 0.0,
+                "p95": float(np.percentile(run_ms, 95)) if len(run_ms) else 0.0,
+            },
+        }
@@ -0,0 +1,132 @@
+import os
+import asyncio
+import logging
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple
+from server.app.services.inference_executor import InferenceExecutor
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Flush a batch once it holds this many statements...
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "32"))
+# ...or once the oldest queued statement has waited this long
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "5"))
+
+
+class InferenceScheduler:
+    """Collects concurrent prediction requests and scores them as micro-batches.
+
+    Callers await ``submit`` with a single preprocessed statement. A background
+    task drains the queue, flushing to ``predict_batch`` when either
+    ``max_batch_size`` statements are waiting or ``max_wait_ms`` has elapsed
+    since the first one arrived, then resolves each caller's future. Batches
+    are handed to ``executor`` as soon as they are collected, so several can be
+    scored at once when the executor has more than one worker.
+
+    Statements submitted with a ``route`` (e.g. the model version that should
+    score them) are only batched with statements for the same route, and the
+    route is passed to ``predict_batch`` as a second argument.
+    """
+
+    def __init__(
+            self,
+            predict_batch: Callable[[List[str]], list],
+            max_batch_size: int = INFERENCE_MAX_BATCH_SIZE,
+            max_wait_ms: float = INFERENCE_MAX_WAIT_MS,
+            executor: Optional[InferenceExecutor] = None,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor or InferenceExecutor(backend="thread", workers=1)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    def _ensure_worker(self):
+        # The queue and worker are bound to the loop that first uses them; a new
+        # loop (e.g. a fresh TestClient) gets a fresh pair.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, processed_text: str, route: Optional[Hashable] = None) -> Tuple[str, list]:
+        """Queue one statement and wait for its (sentiment, confidence) result."""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((processed_text, route, future))
+        return await future
+
+    async def _collect(self) -> List[tuple]:
+        # Block for the first item, then gather more until the batch is full
+        # or the wait budget for the first item runs out
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Skip callers that gave up (e.g. client disconnected) while queued
+            routes: Dict[Hashable, List[tuple]] = {}
+            for text, route, future in batch:
+                if not future.done():
+                    routes.setdefault(route, []).append((text, future))
+
+            for route, routed in routes.items():
+                flush = self._loop.create_task(self._flush(routed, route))
+                self._flushes.add(flush)
+                flush.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: List[tuple], route: Optional[Hashable] = None):
+        texts = [text for text, _ in batch]
+        args = (texts,) if route is None else (texts, route)
+        try:
+            # Run the CPU-bound scoring off the event loop
+            results = await self.executor.run(self.predict_batch, *args)
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"Batch inference failed for {len(texts)} statements: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self):
+        """Stop the background worker, failing anything still queued."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        for flush in list(self._flushes):
+            flush.cancel()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.cancel()
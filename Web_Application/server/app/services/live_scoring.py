@@ -0,0 +1,141 @@
+import os
+import json
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from server.app.models.incremental_scorer import IncrementalDocument
+from server.app.services.statement_limits import STATEMENT_MAX_CHARS
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Score once typing has paused this long...
+LIVE_SCORING_DEBOUNCE_MS = int(os.getenv("LIVE_SCORING_DEBOUNCE_MS", "150"))
+# ...but never wait longer than this after the first unscored change
+LIVE_SCORING_MAX_WAIT_MS = int(os.getenv("LIVE_SCORING_MAX_WAIT_MS", "1000"))
+# Minimum gap between two updates sent on one connection
+LIVE_SCORING_MIN_INTERVAL_MS = int(os.getenv("LIVE_SCORING_MIN_INTERVAL_MS", "300"))
+# Text past this many characters is ignored, as on /predict/
+LIVE_SCORING_MAX_CHARS = int(os.getenv("LIVE_SCORING_MAX_CHARS", str(STATEMENT_MAX_CHARS)))
+
+
+def parse_message(message: str, text: str) -> str:
+    """The connection's new text after a client frame.
+
+    ``{"text": ...}`` (or a plain, non-JSON frame) replaces the text;
+    ``{"append": ...}`` adds to it.
+    """
+    try:
+        value = json.loads(message)
+    except ValueError:
+        return message
+    if isinstance(value, dict):
+        if isinstance(value.get("append"), str):
+            return text + value["append"]
+        if isinstance(value.get("text"), str):
+            return value["text"]
+        raise ValueError("Expected a 'text' or 'append' string")
+    if isinstance(value, str):
+        return value
+    return message
+
+
+class LiveScoringSession:
+    """As-you-type scoring for one WebSocket connection.
+
+    Frames only record the latest text; a single sender task scores it once
+    typing pauses for ``debounce`` seconds, or at the latest ``max_wait``
+    seconds after the first unscored change, and never sends two updates
+    less than ``min_interval`` seconds apart. Scoring reuses the
+    connection's IncrementalDocument, so appended text costs only its new
+    n-grams. ``get_model`` returns the version to score with (anything with
+    ``version``, ``linear_scorer`` and ``labels``).
+    """
+
+    def __init__(
+            self,
+            send: Callable[[dict], Awaitable[None]],
+            get_model: Callable[[], object],
+            preprocess: Callable[[str], str],
+            debounce: float = LIVE_SCORING_DEBOUNCE_MS / 1000,
+            max_wait: float = LIVE_SCORING_MAX_WAIT_MS / 1000,
+            min_interval: float = LIVE_SCORING_MIN_INTERVAL_MS / 1000,
+            max_chars: int = LIVE_SCORING_MAX_CHARS,
+    ):
+        self.send = send
+        self.get_model = get_model
+        self.preprocess = preprocess
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.min_interval = min_interval
+        self.max_chars = max_chars
+
+        self.text = ""
+        self.truncated = False
+        self.received = 0
+        self.sent = 0
+        self._model = None
+        self._document: Optional[IncrementalDocument] = None
+        self._changed = asyncio.Event()
+        self._first_change = None
+        self._last_change = None
+        self._last_sent = None
+
+    def receive(self, message: str):
+        """Record a client frame; scoring happens later on the sender task."""
+        text = parse_message(message, self.text)
+        self.truncated = len(text) > self.max_chars
+        self.text = text[:self.max_chars]
+        self.received += 1
+
+        now = asyncio.get_running_loop().time()
+        if self._first_change is None:
+            self._first_change = now
+        self._last_change = now
+        self._changed.set()
+
+    def score(self) -> dict:
+        """Bring the incremental features up to date with the text and score them."""
+        model = self.get_model()
+        if self._model is None or model.version != self._model.version:
+            # A new deployment rebuilds the features against its vocabulary
+            self._model = model
+            self._document = IncrementalDocument(model.linear_scorer, self.preprocess)
+        self._document.update(self.text)
+        probabilities = self._document.predict_proba()
+        return {
+            "sentiment": self._model.labels[int(probabilities.argmax())],
+            "confidence": probabilities.tolist(),
+            "model_version": self._model.version,
+            "length": len(self.text),
+            "truncated": self.truncated,
+        }
+
+    async def _wait_for_quiet(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            deadline = min(self._last_change + self.debounce, self._first_change + self.max_wait)
+            if self._last_sent is not None:
+                deadline = max(deadline, self._last_sent + self.min_interval)
+            delay = deadline - loop.time()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    async def run(self):
+        """Send debounced, throttled updates until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._changed.wait()
+            await self._wait_for_quiet()
+            self._changed.clear()
+            self._first_change = None
+            try:
+                update = self.score()
+            except Exception as e:
+                logger.error(f"Live scoring failed: {str(e)}")
+                update = {"error": "Scoring failed"}
+            await self.send(update)
+            self.sent += 1
+            self._last_sent = loop.time()
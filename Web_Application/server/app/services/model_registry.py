@@ -0,0 +1,390 @@
+import os
+import json
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import Callable, NamedTuple, Optional
+
+from server.app.models import sentiment_model
+from server.app.models.linear_scorer import LinearScorer
+from server.app.models.model_artifact import MODEL_ARTIFACT_DIRECTORY
+from server.app.models.preprocessing import preprocess_text
+from server.app.services.inference_executor import InferenceExecutor, InferenceQueueFull
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Each subdirectory holds one model version (the three pickles and, optionally,
+# a model_artifact/ directory); deployment.json says which ones are live
+MODEL_REGISTRY_DIRECTORY = os.getenv(
+    "MODEL_REGISTRY_DIRECTORY", os.path.join(sentiment_model.data_directory, "models")
+)
+DEPLOYMENT_FILE = "deployment.json"
+MODEL_REGISTRY_POLL_SECONDS = float(os.getenv("MODEL_REGISTRY_POLL_SECONDS", "10"))
+# Versions kept loaded per process, so in-flight requests can finish on a retired one
+MODEL_REGISTRY_MAX_LOADED = int(os.getenv("MODEL_REGISTRY_MAX_LOADED", "3"))
+
+SPLIT_MODES = ("canary", "shadow")
+
+# Scored once by every new version before it takes traffic
+WARM_UP_STATEMENTS = [
+    "I feel anxious and can't stop worrying about everything",
+    "Today was a good day, I went for a walk with friends",
+    "I have been feeling hopeless and empty for weeks",
+    "Work deadlines are piling up and I'm overwhelmed",
+]
+
+
+class ModelSource(NamedTuple):
+    """Picklable handle for a model version, so worker processes can load it too."""
+    version: str
+    directory: str
+    artifact_directory: Optional[str] = None
+
+
+class LoadedModel:
+    """A model version held in memory together with the source it came from."""
+
+    def __init__(
+            self,
+            source: ModelSource,
+            predict_batch: Callable[[list], list],
+            score_windows: Optional[Callable[[list, str], tuple]] = None,
+            components: Optional[dict] = None,
+    ):
+        self.source = source
+        self.predict_batch = predict_batch
+        self.score_windows = score_windows
+        self.components = components
+        self._linear_scorer = None
+
+    @property
+    def version(self) -> str:
+        return self.source.version
+
+    @property
+    def linear_scorer(self) -> LinearScorer:
+        """The version as a LinearScorer, extracted from the pickles if it has no artifact."""
+        if self._linear_scorer is None:
+            if self.components is None:
+                raise RuntimeError(f"Model {self.version} has no components to score with")
+            self._linear_scorer = self.components["linear_scorer"] or LinearScorer.from_pipeline(
+                self.components["vectorizer"], self.components["model"], self.version
+            )
+        return self._linear_scorer
+
+    @property
+    def vocabulary(self):
+        """The version's terms; the fitted vectorizer's when no scorer exists yet, so none is built."""
+        if self._linear_scorer is None and self.components is not None and self.components["linear_scorer"] is None:
+            return self.components["vectorizer"].vocabulary_
+        return self.linear_scorer.vocabulary
+
+    @property
+    def labels(self) -> list:
+        """Class names in the column order of the probabilities (the model is fit on every encoded class)."""
+        return [str(label) for label in self.components["label_encoder"].classes_]
+
+
+def default_model() -> LoadedModel:
+    """The version sentiment_model loaded at import time."""
+    source = ModelSource(sentiment_model.model_version, sentiment_model.data_directory, MODEL_ARTIFACT_DIRECTORY)
+    components = {
+        "model": sentiment_model.model,
+        "vectorizer": sentiment_model.vectorizer,
+        "linear_scorer": sentiment_model.linear_scorer,
+        "label_encoder": sentiment_model.label_encoder,
+    }
+    return LoadedModel(
+        source,
+        sentiment_model.predict_sentiment_batch,
+        sentiment_model.predict_sentiment_windows,
+        components,
+    )
+
+
+def load_model(directory: str) -> LoadedModel:
+    """Load the model version stored in ``directory``."""
+    artifact_directory = os.path.join(directory, "model_artifact")
+    components = sentiment_model.load_model_components(directory, artifact_directory)
+    version = components.pop("model_version") or os.path.basename(os.path.normpath(directory))
+    source = ModelSource(version, directory, artifact_directory)
+    return LoadedModel(
+        source,
+        partial(sentiment_model.score_batch, **components),
+        partial(sentiment_model.score_windows, **components),
+        components,
+    )
+
+
+# Versions loaded in this process, most recently used last
+_loaded_models: "OrderedDict[ModelSource, LoadedModel]" = OrderedDict()
+_loaded_models_lock = threading.Lock()
+
+
+def _remember(source: ModelSource, loaded: LoadedModel):
+    with _loaded_models_lock:
+        _loaded_models[source] = loaded
+        _loaded_models.move_to_end(source)
+        while len(_loaded_models) > MODEL_REGISTRY_MAX_LOADED:
+            _loaded_models.popitem(last=False)
+
+
+def get_loaded_model(source: ModelSource) -> LoadedModel:
+    """The in-memory model for ``source``, loading it on first use in this process."""
+    with _loaded_models_lock:
+        loaded = _loaded_models.get(source)
+    if loaded is None:
+        if source.version == sentiment_model.model_version:
+            loaded = default_model()
+        else:
+            loaded = load_model(source.directory)
+            if loaded.version != source.version:
+                raise RuntimeError(
+                    f"Model in {source.directory} is version {loaded.version}, expected {source.version}"
+                )
+    _remember(source, loaded)
+    return loaded
+
+
+def predict_with_model(processed_texts: list, source: ModelSource) -> list:
+    """Score preprocessed statements with a specific version; runs on inference workers."""
+    return get_loaded_model(source).predict_batch(processed_texts)
+
+
+def predict_windows_with_model(processed_windows: list, source: ModelSource, aggregate: str) -> tuple:
+    """Score the windows of one long statement with a specific version and aggregate them."""
+    loaded = get_loaded_model(source)
+    if loaded.score_windows is None:
+        raise RuntimeError(f"Model {source.version} cannot score windowed statements")
+    return loaded.score_windows(processed_windows, aggregate)
+
+
+def score_statements_with_model(statements: list, source: ModelSource) -> list:
+    """Preprocess and score raw statements with a specific version."""
+    return predict_with_model([preprocess_text(statement) for statement in statements], source)
+
+
+def _bucket(key: str) -> float:
+    # Stable across processes and restarts, unlike hash()
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") / 2 ** 64 * 100
+
+
+class Route(NamedTuple):
+    """Version that answers a request, plus the version that shadows it (if any)."""
+    serve: ModelSource
+    shadow: Optional[ModelSource] = None
+
+
+class ModelRegistry:
+    """Tracks the active model version and an optional canary or shadow candidate.
+
+    New versions are loaded off the event loop, warmed with a sample batch on
+    the caller and on the inference workers, and only then swapped in with a
+    single assignment, so requests already routed to the previous version
+    finish on it. In ``canary`` mode ``percent`` of statements are answered by
+    the candidate; in ``shadow`` mode they are answered by the active version
+    and also scored by the candidate for comparison.
+
+    The deployment is read from ``deployment.json`` in ``directory``, e.g.
+    ``{"active": "2024-06-01", "candidate": "2024-07-01", "mode": "canary",
+    "percent": 10}``, and re-read every ``poll_seconds`` so every worker picks
+    up a change without a restart.
+    """
+
+    def __init__(
+            self,
+            executor: InferenceExecutor,
+            directory: str = MODEL_REGISTRY_DIRECTORY,
+            poll_seconds: float = MODEL_REGISTRY_POLL_SECONDS,
+    ):
+        self.executor = executor
+        self.directory = directory
+        self.poll_seconds = poll_seconds
+        self.active = default_model()
+        self.candidate: Optional[LoadedModel] = None
+        self.mode: Optional[str] = None
+        self.percent = 0.0
+        self._remember_live()
+        self._deployment: Optional[dict] = None
+        self._watcher: Optional[asyncio.Task] = None
+        self._shadows = set()
+        self.last_error: Optional[str] = None
+        self.swaps = 0
+        self.served = {}
+        self.shadow_compared = 0
+        self.shadow_agreed = 0
+        self.shadow_failed = 0
+        self.shadow_dropped = 0
+
+    def _remember_live(self):
+        for loaded in (self.candidate, self.active):
+            if loaded is not None:
+                _remember(loaded.source, loaded)
+
+    @property
+    def generation(self) -> str:
+        """Identifies the current routing; cached predictions are only valid within one."""
+        if self.candidate is None:
+            return self.active.version
+        return f"{self.active.version}+{self.candidate.version}:{self.mode}:{self.percent:g}"
+
+    def route(self, key: str) -> Route:
+        """Pick the version for a statement; the same statement always gets the same one."""
+        active, candidate = self.active, self.candidate
+        if candidate is not None and _bucket(key) < self.percent:
+            if self.mode == "canary":
+                return self._count(Route(candidate.source))
+            return self._count(Route(active.source, candidate.source))
+        return self._count(Route(active.source))
+
+    def route_batch(self) -> ModelSource:
+        """Pick the version for a whole batch request."""
+        active, candidate = self.active, self.candidate
+        if candidate is not None and self.mode == "canary" and random.uniform(0, 100) < self.percent:
+            return self._count(Route(candidate.source)).serve
+        return self._count(Route(active.source)).serve
+
+    def _count(self, route: Route) -> Route:
+        self.served[route.serve.version] = self.served.get(route.serve.version, 0) + 1
+        return route
+
+    async def _load(self, name: str) -> LoadedModel:
+        directory = os.path.join(self.directory, name)
+        for loaded in (self.active, self.candidate):
+            if loaded is not None and os.path.normpath(loaded.source.directory) == os.path.normpath(directory):
+                return loaded
+
+        loaded = await asyncio.to_thread(load_model, directory)
+        # Warm the caller's copy and the workers' copies before any traffic sees it
+        sample = [preprocess_text(statement) for statement in WARM_UP_STATEMENTS]
+        await asyncio.to_thread(loaded.predict_batch, sample)
+        _remember(loaded.source, loaded)
+        if self.executor.backend == "process":
+            try:
+                await asyncio.gather(*(
+                    self.executor.run(predict_with_model, sample, loaded.source)
+                    for _ in range(self.executor.workers)
+                ))
+            except InferenceQueueFull:
+                # Busy workers load the version on their first request instead
+                logger.warning(f"Inference queue full while warming workers for {loaded.version}")
+        logger.info(f"Loaded and warmed model version {loaded.version} from {directory}")
+        return loaded
+
+    async def deploy(
+            self,
+            active: Optional[str] = None,
+            candidate: Optional[str] = None,
+            mode: str = "canary",
+            percent: float = 0.0,
+    ):
+        """Load the named versions and switch traffic to them in one step.
+
+        ``active`` and ``candidate`` are subdirectory names; ``active=None``
+        keeps the current active version.
+        """
+        if candidate is not None and mode not in SPLIT_MODES:
+            raise ValueError(f"Unknown split mode '{mode}', expected one of {SPLIT_MODES}")
+        if not 0 <= percent <= 100:
+            raise ValueError("percent must be between 0 and 100")
+
+        new_active = self.active if active is None else await self._load(active)
+        new_candidate = None if candidate is None else await self._load(candidate)
+
+        # Plain attribute assignments between awaits, so routing never sees a mix
+        previous = self.active.version
+        self.active, self.candidate = new_active, new_candidate
+        self.mode, self.percent = (mode, float(percent)) if new_candidate is not None else (None, 0.0)
+        self._remember_live()
+        if new_active.version != previous:
+            self.swaps += 1
+            logger.info(f"Active model version switched from {previous} to {new_active.version}")
+
+    async def reconcile(self):
+        """Apply deployment.json if it changed since the last successful read."""
+        path = os.path.join(self.directory, DEPLOYMENT_FILE)
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path) as f:
+                deployment = json.load(f)
+            if deployment == self._deployment:
+                return
+            await self.deploy(
+                deployment.get("active"),
+                deployment.get("candidate"),
+                deployment.get("mode", "canary"),
+                deployment.get("percent", 0.0),
+            )
+        except Exception as e:
+            if self.last_error != str(e):
+                logger.error(f"Failed to apply model deployment from {path}: {str(e)}")
+            self.last_error = str(e)
+            return
+        self._deployment = deployment
+        self.last_error = None
+
+    async def _watch(self):
+        while True:
+            await self.reconcile()
+            await asyncio.sleep(self.poll_seconds)
+
+    def start(self):
+        """Start polling deployment.json on the running event loop."""
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.get_running_loop().create_task(self._watch())
+
+    async def close(self):
+        tasks = list(self._shadows)
+        if self._watcher is not None:
+            tasks.append(self._watcher)
+            self._watcher = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def compare_in_background(self, score: Callable, processed_text: str, served_result: tuple, shadow: ModelSource):
+        """Score ``processed_text`` with the shadow version and record whether it agrees."""
+        async def run():
+            try:
+                shadow_result = await score(processed_text, shadow)
+            except InferenceQueueFull:
+                # Shadow traffic never competes with real requests for queue slots
+                self.shadow_dropped += 1
+                return
+            except Exception as e:
+                self.shadow_failed += 1
+                logger.warning(f"Shadow model {shadow.version} failed: {str(e)}")
+                return
+            self.shadow_compared += 1
+            if shadow_result[0] == served_result[0]:
+                self.shadow_agreed += 1
+
+        task = asyncio.ensure_future(run())
+        self._shadows.add(task)
+        task.add_done_callback(self._shadows.discard)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active.version,
+            "candidate": self.candidate.version if self.candidate is not None else None,
+            "mode": self.mode,
+            "percent": self.percent,
+            "generation": self.generation,
+            "swaps": self.swaps,
+            "served": dict(self.served),
+            "shadow": {
+                "compared": self.shadow_compared,
+                "agreement": self.shadow_agreed / self.shadow_compared if self.shadow_compared else None,
+                "failed": self.shadow_failed,
+                "dropped": self.shadow_dropped,
+                "in_flight": len(self._shadows),
+            },
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,249 @@
+import os
+import datetime
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from pymongo import ASCENDING
+
+from server.app.utils.write_behind import WriteBehindBuffer
+
+# Predictions are written once this many are buffered...
+MOOD_TIMELINE_BATCH_SIZE = int(os.getenv("MOOD_TIMELINE_BATCH_SIZE", "100"))
+# ...or at the latest this long after the previous flush
+MOOD_TIMELINE_FLUSH_SECONDS = float(os.getenv("MOOD_TIMELINE_FLUSH_SECONDS", "2"))
+# Predictions held while the database is slow; newer ones are dropped beyond this
+MOOD_TIMELINE_MAX_BUFFER = int(os.getenv("MOOD_TIMELINE_MAX_BUFFER", "10000"))
+
+PREDICTIONS_COLLECTION = "predictions"
+ROLLUPS_COLLECTION = "mood_rollups"
+# Rollup granularities; buckets start at UTC midnight (weeks on Monday)
+ROLLUP_PERIODS = ("day", "week")
+
+
+def period_start(timestamp: datetime.datetime, period: str) -> datetime.datetime:
+    """Start of the day or week containing ``timestamp``, in UTC (naive times are UTC)."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    start = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "week":
+        start -= datetime.timedelta(days=start.weekday())
+    elif period != "day":
+        raise ValueError(f"Unknown rollup period '{period}', expected one of {ROLLUP_PERIODS}")
+    return start
+
+
+def _field(label: str) -> str:
+    # Labels become field names; MongoDB reserves '.' and a leading '$'
+    return label.replace(".", "_").replace("$", "_")
+
+
+def period_end(start: datetime.datetime, period: str) -> datetime.datetime:
+    """Start of the bucket after the one beginning at ``start``."""
+    return start + datetime.timedelta(days=7 if period == "week" else 1)
+
+
+def rollup_increments(predictions: List[dict]) -> Dict[tuple, Dict[str, float]]:
+    """Per (user, period, bucket start), the dotted rollup fields the predictions add to."""
+    increments: Dict[tuple, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for prediction in predictions:
+        label = _field(prediction["sentiment"])
+        for period in ROLLUP_PERIODS:
+            inc = increments[(prediction["user"], period, period_start(prediction["created_at"], period))]
+            inc["count"] += 1
+            inc[f"labels.{label}.count"] += 1
+            inc[f"labels.{label}.confidence_sum"] += prediction["confidence"]
+            for class_label, confidence in prediction.get("confidence_scores", {}).items():
+                inc[f"confidence_sum.{_field(class_label)}"] += confidence
+    return increments
+
+
+def _typed(key: str, value: float):
+    return int(value) if key.endswith("count") else value
+
+
+def _increment(bucket: tuple, inc: Dict[str, float]) -> Tuple[dict, dict]:
+    user, period, start = bucket
+    increments = {key: _typed(key, value) for key, value in inc.items()}
+    return {"user": user, "period": period, "start": start}, {"$inc": increments}
+
+
+def rollup_updates(predictions: List[dict]) -> List[Tuple[dict, dict]]:
+    """One ``(filter, update)`` upsert per (user, period, bucket) incrementing its label counts and confidence sums.
+
+    ``labels.<label>`` sums the confidence of the predicted label only;
+    ``confidence_sum.<label>`` sums every class's probability, so dividing by
+    ``count`` gives the mean confidence per class over the bucket.
+    """
+    return [_increment(bucket, inc) for bucket, inc in rollup_increments(predictions).items()]
+
+
+def rollup_document(inc: Dict[str, float]) -> dict:
+    """The rollup fields of one bucket as nested documents, for replacing it outright."""
+    document: dict = {}
+    for key, value in inc.items():
+        *parents, name = key.split(".")
+        target = document
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[name] = _typed(key, value)
+    return document
+
+
+class MoodTimelineStore:
+    """Stores /predict/ results per user together with daily and weekly rollups.
+
+    ``record`` only hands the prediction to a WriteBehindBuffer, which writes
+    batches into ``predictions`` with unordered ``insert_many`` (retrying
+    transient failures). After each batch is written, one unordered
+    ``bulk_write`` of ``$inc`` upserts updates ``mood_rollups``, so a
+    timeline reads one document per day or week instead of every prediction.
+
+    ``$inc`` cannot be retried safely after a partial failure, so the buckets
+    of a batch whose rollup failed are marked stale and recomputed from
+    ``predictions`` with ``$set`` after the next written batch. Both run in
+    the buffer's write, one batch at a time.
+    """
+
+    def __init__(
+            self,
+            get_database: Optional[Callable[[], object]] = None,
+            batch_size: int = MOOD_TIMELINE_BATCH_SIZE,
+            flush_seconds: float = MOOD_TIMELINE_FLUSH_SECONDS,
+            max_buffer: int = MOOD_TIMELINE_MAX_BUFFER,
+            **buffer_options,
+    ):
+        self.get_database = get_database or _default_database
+        self._indexed = False
+        self.recorded = 0
+        self.rollups_recomputed = 0
+        self._stale: Set[tuple] = set()
+        self.buffer = WriteBehindBuffer(
+            self._predictions_collection,
+            PREDICTIONS_COLLECTION,
+            batch_size=batch_size,
+            flush_seconds=flush_seconds,
+            max_buffer=max_buffer,
+            on_written=self._roll_up,
+            **buffer_options,
+        )
+
+    def record(self, user: str, sentiment: str, confidence_scores: Dict[str, float], model_version: str,
+               created_at: Optional[datetime.datetime] = None):
+        """Buffer one prediction for ``user``, with the probability of each class; never waits for the database."""
+        accepted = self.buffer.add({
+            "user": user,
+            "sentiment": str(sentiment),
+            "confidence": float(max(confidence_scores.values())),
+            "confidence_scores": {str(label): float(confidence) for label, confidence in confidence_scores.items()},
+            "model_version": model_version,
+            "created_at": created_at or datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None),
+        })
+        if accepted:
+            self.recorded += 1
+
+    def _ensure_indexes(self, db):
+        if self._indexed:
+            return
+        db[PREDICTIONS_COLLECTION].create_index([("user", ASCENDING), ("created_at", ASCENDING)])
+        db[ROLLUPS_COLLECTION].create_index(
+            [("user", ASCENDING), ("period", ASCENDING), ("start", ASCENDING)], unique=True
+        )
+        self._indexed = True
+
+    def _predictions_collection(self):
+        db = self.get_database()
+        self._ensure_indexes(db)
+        return db[PREDICTIONS_COLLECTION]
+
+    def _roll_up(self, predictions: List[dict]):
+        from server.app.utils.database import upsert_many
+        increments = rollup_increments(predictions)
+        try:
+            db = self.get_database()
+            # Recomputed buckets already count this batch, which was written first
+            recomputed = self._recompute_stale(db)
+            updates = [_increment(bucket, inc) for bucket, inc in increments.items() if bucket not in recomputed]
+            if updates:
+                upsert_many(db[ROLLUPS_COLLECTION], updates)
+        except Exception:
+            self._stale.update(increments)
+            raise
+
+    def _recompute_stale(self, db) -> Set[tuple]:
+        recomputed = set()
+        for user, period, start in list(self._stale):
+            predictions = list(db[PREDICTIONS_COLLECTION].find(
+                {"user": user, "created_at": {"$gte": start, "$lt": period_end(start, period)}},
+                {"_id": 0},
+            ))
+            inc = rollup_increments(predictions).get((user, period, start), {})
+            db[ROLLUPS_COLLECTION].update_one(
+                {"user": user, "period": period, "start": start},
+                {"$set": {"count": 0, "labels": {}, "confidence_sum": {}, **rollup_document(inc)}},
+                upsert=True,
+            )
+            self._stale.discard((user, period, start))
+            recomputed.add((user, period, start))
+            self.rollups_recomputed += 1
+        return recomputed
+
+    async def flush(self):
+        """Write everything buffered so far."""
+        await self.buffer.flush()
+
+    def timeline(self, user: str, period: str = "day", since: Optional[datetime.datetime] = None) -> List[dict]:
+        """Rollups of ``user`` from ``since`` on, oldest first.
+
+        Each bucket has the mean confidence of every predicted label when it
+        was predicted, and the mean probability of every class over all of
+        the bucket's predictions.
+        """
+        if period not in ROLLUP_PERIODS:
+            raise ValueError(f"Unknown rollup period '{period}', expected one of {ROLLUP_PERIODS}")
+        query = {"user": user, "period": period}
+        if since is not None:
+            query["start"] = {"$gte": period_start(since, period)}
+
+        buckets = []
+        for rollup in self.get_database()[ROLLUPS_COLLECTION].find(query, {"_id": 0}).sort("start", ASCENDING):
+            labels = {
+                label: {"count": values["count"], "mean_confidence": values["confidence_sum"] / values["count"]}
+                for label, values in rollup.get("labels", {}).items()
+            }
+            mean_confidence = {
+                label: confidence_sum / rollup["count"]
+                for label, confidence_sum in rollup.get("confidence_sum", {}).items()
+            }
+            buckets.append({
+                "start": rollup["start"],
+                "count": rollup["count"],
+                "labels": labels,
+                "mean_confidence": mean_confidence,
+            })
+        return buckets
+
+    def stats(self) -> dict:
+        stats = self.buffer.stats()
+        return {
+            "buffered": stats["depth"],
+            "recorded": self.recorded,
+            "written": stats["written"],
+            "dropped": stats["dropped"],
+            "failed": stats["failed"],
+            "flushes": stats["flushes"],
+            "rollup_failures": stats["callback_failures"],
+            "stale_rollups": len(self._stale),
+            "rollups_recomputed": self.rollups_recomputed,
+            "retries": stats["retries"],
+            "flush_p95_ms": stats["flush_p95_ms"],
+        }
+
+    async def close(self):
+        """Write what is still buffered, letting an in-progress write finish first."""
+        await self.buffer.close()
+
+
+def _default_database():
+    # Imported on first write so the sentiment API does not need MongoDB to start
+    from server.app.utils.database import get_database
+    return get_database()
@@ -0,0 +1,173 @@
+import os
+import time
+import asyncio
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+from passlib.context import CryptContext
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# bcrypt cost factor for new hashes; stored hashes with another cost are
+# rehashed on the next successful login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL, so threads run in parallel; "process" isolates it fully
+PASSWORD_HASH_BACKEND = os.getenv("PASSWORD_HASH_BACKEND", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hash/verify calls allowed to be queued or running before new ones get a 503
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+# Seconds clients are told to wait before retrying a rejected login
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "1"))
+
+BACKENDS = ("thread", "process")
+OPERATIONS = ("hash", "verify")
+
+# Number of recent samples kept for latency percentiles
+_SAMPLE_WINDOW = 1000
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when ``max_queue`` hash/verify calls are already queued or running."""
+
+
+@lru_cache(maxsize=None)
+def password_context(rounds: int) -> CryptContext:
+    # Built per process, since CryptContext cannot be pickled to a worker
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+def _warm_up(rounds: int):
+    password_context(rounds)
+
+
+def _hash(rounds: int, password: str) -> Tuple[float, float, str]:
+    started_at = time.monotonic()
+    hashed = password_context(rounds).hash(password)
+    return started_at, time.monotonic(), hashed
+
+
+def _verify_and_update(rounds: int, password: str, hashed: str) -> Tuple[float, float, Tuple[bool, Optional[str]]]:
+    started_at = time.monotonic()
+    result = password_context(rounds).verify_and_update(password, hashed)
+    return started_at, time.monotonic(), result
+
+
+class PasswordHasher:
+    """bcrypt hashing and verification on a dedicated, bounded pool.
+
+    Keeps the ~100-300 ms bcrypt calls off the event loop and off the shared
+    thread pool that sync endpoints run on. At most ``max_queue`` calls may be
+    queued or running; beyond that ``hash`` and ``verify_and_update`` raise
+    ``PasswordHashingBusy`` at once, so a login storm is turned away with a
+    503 instead of piling up.
+    """
+
+    def __init__(
+            self,
+            rounds: int = BCRYPT_ROUNDS,
+            backend: str = PASSWORD_HASH_BACKEND,
+            workers: int = PASSWORD_HASH_WORKERS,
+            max_queue: int = PASSWORD_HASH_MAX_QUEUE,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown password hashing backend '{backend}', expected one of {BACKENDS}")
+        self.rounds = rounds
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self._pool: Optional[Executor] = None
+        self.queue_depth = 0
+        self.max_seen_depth = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.completed = {operation: 0 for operation in OPERATIONS}
+        self._queue_times = {operation: deque(maxlen=_SAMPLE_WINDOW) for operation in OPERATIONS}
+        self._run_times = {operation: deque(maxlen=_SAMPLE_WINDOW) for operation in OPERATIONS}
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            logger.info(f"Starting password hashing {self.backend} pool with {self.workers} workers")
+            if self.backend == "process":
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._pool
+
+    async def _run(self, operation: str, fn: Callable, *args):
+        if self.queue_depth >= self.max_queue:
+            self.rejected += 1
+            raise PasswordHashingBusy(f"Password hashing queue is full ({self.queue_depth} pending)")
+
+        self.queue_depth += 1
+        self.max_seen_depth = max(self.max_seen_depth, self.queue_depth)
+        submitted_at = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            started_at, finished_at, result = await loop.run_in_executor(self._get_pool(), fn, *args)
+        finally:
+            self.queue_depth -= 1
+
+        self.completed[operation] += 1
+        self._queue_times[operation].append(max(0.0, started_at - submitted_at))
+        self._run_times[operation].append(finished_at - started_at)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", _hash, self.rounds, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Whether ``password`` matches, and a new hash if the stored one uses an outdated cost."""
+        valid, new_hash = await self._run("verify", _verify_and_update, self.rounds, password, hashed)
+        if new_hash is not None:
+            self.rehashed += 1
+        return valid, new_hash
+
+    def warm_up(self):
+        """Start the workers now so the first logins do not pay for it."""
+        pool = self._get_pool()
+        futures = [pool.submit(_warm_up, self.rounds) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        operations = {}
+        for operation in OPERATIONS:
+            queue_ms = np.asarray(self._queue_times[operation]) * 1000
+            run_ms = np.asarray(self._run_times[operation]) * 1000
+            queue_p50, queue_p95 = np.percentile(queue_ms, [50, 95]) if len(queue_ms) else (0.0, 0.0)
+            operations[operation] = {
+                "completed": self.completed[operation],
+                "queue_time_ms": {
+                    "p50": float(queue_p50),
+                    "p95": float(queue_p95),
+                    "max": float(queue_ms.max()) if len(queue_ms) else 0.0,
+                },
+                "run_time_ms": {
+                    "mean": float(run_ms.mean()) if len(run_ms) else 0.0,
+                    "p95": float(np.percentile(run_ms, 95)) if len(run_ms) else 0.0,
+                },
+            }
+        return {
+            "backend": self.backend,
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "max_seen_depth": self.max_seen_depth,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+            "operations": operations,
+        }
@@ -0,0 +1,123 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "10000"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "300"))
+
+_MISSING = object()
+
+
+class PredictionCache:
+    """Bounded LRU + TTL cache of final predictions with in-flight coalescing.
+
+    Entries are keyed on the preprocessed statement and tagged with the model
+    version that produced them; seeing a new version drops every entry. When
+    several callers miss on the same key at once, only the first one computes
+    the prediction and the rest await its result.
+    """
+
+    def __init__(
+            self,
+            max_entries: int = PREDICTION_CACHE_MAX_ENTRIES,
+            ttl_seconds: float = PREDICTION_CACHE_TTL_SECONDS,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: str):
+        if version != self._version:
+            if self._entries:
+                logger.info(f"Model version changed to {version}; dropping {len(self._entries)} cached predictions")
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key: Hashable, version: str, default=None):
+        self._check_version(version)
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, version: str, value: Any):
+        self._check_version(version)
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (self.clock() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get_or_compute(self, key: Hashable, version: str, compute: Callable[[], Awaitable[Any]]):
+        """Return the cached value, or compute it once for all concurrent callers."""
+        value = self.get(key, version, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        flight_key = (version, key)
+        task = self._in_flight.get(flight_key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(compute())
+            self._in_flight[flight_key] = task
+
+            def _store_result(done: asyncio.Future):
+                self._in_flight.pop(flight_key, None)
+                if not done.cancelled() and done.exception() is None:
+                    self.set(key, version, done.result())
+
+            task.add_done_callback(_store_result)
+
+        # Shield so one caller giving up does not cancel the shared computation
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "model_version": self._version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "in_flight": len(self._in_flight),
+        }
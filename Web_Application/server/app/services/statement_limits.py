@@ -0,0 +1,108 @@
+import os
+import re
+from typing import Callable, NamedTuple, Tuple
+
+from server.app.models.model_loader import WINDOW_AGGREGATES
+from server.app.models.preprocessing import preprocess_text
+
+# Statements up to this many characters are always scored whole
+STATEMENT_MAX_CHARS = int(os.getenv("STATEMENT_MAX_CHARS", "5000"))
+# What happens to longer ones: "truncate" scores the first STATEMENT_MAX_CHARS
+# characters, "window" scores sentence windows and aggregates them
+LONG_STATEMENT_MODE = os.getenv("LONG_STATEMENT_MODE", "truncate")
+LONG_STATEMENT_AGGREGATE = os.getenv("LONG_STATEMENT_AGGREGATE", "mean")
+# Window mode bounds: characters read, tokens per window and windows scored
+STATEMENT_WINDOW_MAX_CHARS = int(os.getenv("STATEMENT_WINDOW_MAX_CHARS", "50000"))
+STATEMENT_WINDOW_TOKENS = int(os.getenv("STATEMENT_WINDOW_TOKENS", "128"))
+STATEMENT_MAX_WINDOWS = int(os.getenv("STATEMENT_MAX_WINDOWS", "16"))
+
+LONG_STATEMENT_MODES = ("truncate", "window")
+
+# Sentence ends: terminal punctuation followed by whitespace, or line breaks
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\n+')
+
+if LONG_STATEMENT_MODE not in LONG_STATEMENT_MODES:
+    raise ValueError(f"LONG_STATEMENT_MODE must be one of {LONG_STATEMENT_MODES}")
+if LONG_STATEMENT_AGGREGATE not in WINDOW_AGGREGATES:
+    raise ValueError(f"LONG_STATEMENT_AGGREGATE must be one of {WINDOW_AGGREGATES}")
+
+
+class PreparedStatement(NamedTuple):
+    """Preprocessed text(s) to score for one statement, and what was done to get them."""
+    windows: Tuple[str, ...]
+    truncated: bool
+
+    @property
+    def windowed(self) -> bool:
+        return len(self.windows) > 1
+
+
+def cap_statement(statement: str, max_chars: int = STATEMENT_MAX_CHARS) -> Tuple[str, bool]:
+    """Cut ``statement`` to at most ``max_chars`` characters without splitting a word."""
+    if len(statement) <= max_chars:
+        return statement, False
+    capped = statement[:max_chars]
+    if not statement[max_chars].isspace() and re.search(r'\s', capped):
+        capped = capped.rsplit(None, 1)[0]
+    return capped, True
+
+
+def split_windows(
+        statement: str,
+        preprocess: Callable[[str], str] = preprocess_text,
+        window_tokens: int = STATEMENT_WINDOW_TOKENS,
+        max_windows: int = STATEMENT_MAX_WINDOWS,
+) -> Tuple[Tuple[str, ...], bool]:
+    """Preprocess sentence by sentence and pack whole sentences into windows.
+
+    A window holds at most ``window_tokens`` preprocessed tokens; longer
+    sentences are split. Returns the windows and whether text past
+    ``max_windows`` windows was dropped.
+    """
+    windows = []
+    current = []
+    for sentence in SENTENCE_BOUNDARY.split(statement):
+        tokens = preprocess(sentence).split()
+        if current and len(current) + len(tokens) > window_tokens:
+            windows.append(" ".join(current))
+            current = []
+        current.extend(tokens)
+        while len(current) > window_tokens:
+            windows.append(" ".join(current[:window_tokens]))
+            current = current[window_tokens:]
+        if len(windows) > max_windows:
+            return tuple(windows[:max_windows]), True
+    if current or not windows:
+        windows.append(" ".join(current))
+    return tuple(windows[:max_windows]), len(windows) > max_windows
+
+
+def prepare_statement(
+        statement: str,
+        mode: str = LONG_STATEMENT_MODE,
+        preprocess: Callable[[str], str] = preprocess_text,
+        max_chars: int = STATEMENT_MAX_CHARS,
+        window_max_chars: int = STATEMENT_WINDOW_MAX_CHARS,
+        window_tokens: int = STATEMENT_WINDOW_TOKENS,
+        max_windows: int = STATEMENT_MAX_WINDOWS,
+) -> PreparedStatement:
+    """Bound the work needed to score ``statement``.
+
+    Short statements become a single preprocessed text exactly as before.
+    Longer ones are either cut to ``max_chars`` or, in window mode, read up
+    to ``window_max_chars`` and split into at most ``max_windows`` windows,
+    so preprocessing and vectorization cost has a fixed upper bound.
+    """
+    if mode not in LONG_STATEMENT_MODES:
+        raise ValueError(f"Unknown long statement mode '{mode}', expected one of {LONG_STATEMENT_MODES}")
+
+    if len(statement) <= max_chars:
+        return PreparedStatement((preprocess(statement),), False)
+
+    if mode == "truncate":
+        capped, _ = cap_statement(statement, max_chars)
+        return PreparedStatement((preprocess(capped),), True)
+
+    capped, truncated = cap_statement(statement, window_max_chars)
+    windows, dropped = split_windows(capped, preprocess, window_tokens, max_windows)
+    return PreparedStatement(windows, truncated or dropped)
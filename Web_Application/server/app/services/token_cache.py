@@ -0,0 +1,105 @@
+import os
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+# Verified tokens remembered at once; the least recently used are evicted
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+# Called with the token digest and its claims; True rejects the token
+RevocationCheck = Callable[[str, dict], bool]
+
+
+class TokenRevoked(Exception):
+    """Raised when the revocation hook rejects an otherwise valid token."""
+
+
+def token_digest(token: str) -> str:
+    # Keys never hold the bearer token itself
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class VerifiedTokenCache:
+    """Claims of already-verified JWTs, keyed on a digest of the token string.
+
+    A hit skips signature verification and claim parsing. Entries live until
+    the token's ``exp``; tokens without one are verified every time, since
+    nothing bounds how long they would be trusted. ``is_revoked`` is
+    consulted on every call, hit or miss, so revoking a token takes effect
+    immediately.
+    """
+
+    def __init__(
+            self,
+            max_entries: int = TOKEN_CACHE_SIZE,
+            is_revoked: Optional[RevocationCheck] = None,
+            clock: Callable[[], float] = time.time,
+    ):
+        self.max_entries = max_entries
+        self.is_revoked = is_revoked
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+        self.revoked = 0
+
+    def verify(self, token: str, decode: Callable[[str], dict]) -> dict:
+        """The token's claims, from the cache or from ``decode`` (which raises on invalid tokens)."""
+        key = token_digest(token)
+        claims = self._get(key)
+        if claims is None:
+            self.misses += 1
+            claims = decode(token)
+            self._put(key, claims)
+        else:
+            self.hits += 1
+
+        if self.is_revoked is not None and self.is_revoked(key, claims):
+            self.revoked += 1
+            self._entries.pop(key, None)
+            raise TokenRevoked("Token has been revoked")
+        return claims
+
+    def _get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        claims, expires_at = entry
+        if self.clock() >= expires_at:
+            self.expired += 1
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return claims
+
+    def _put(self, key: str, claims: dict):
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)) or self.clock() >= expires_at:
+            return
+        self._entries[key] = (claims, float(expires_at))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+
+    def invalidate(self, token: str):
+        self._entries.pop(token_digest(token), None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "revoked": self.revoked,
+        }
@@ -1,9 +1,14 @@
 import os
+import time
+import asyncio
 import logging
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, ConfigurationError, ServerSelectionTimeoutError
+from typing import List, Optional, Tuple
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import ConnectionFailure, ConfigurationError, OperationFailure, ServerSelectionTimeoutError
 from dotenv import load_dotenv
 
+from server.app.utils.write_behind import WriteBehindBuffer
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -11,46 +16,232 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# "mongo", or "memory" for an in-process stand-in (tests, benchmarks, local runs)
+DATABASE_BACKEND = os.getenv("DATABASE_BACKEND", "mongo")
+DATABASE_BACKENDS = ("mongo", "memory")
+
 # Get MongoDB connection string from environment variables
 # Note: Check both MONGO_URI (your code) and MONGODB_URI (from .env)
 MONGO_URI = os.getenv("MONGO_URI") or os.getenv("MONGODB_URI")
 DB_NAME = os.getenv("DB_NAME", "moodsync")
 
-if not MONGO_URI:
-    logger.error("MONGO_URI environment variable is not set!")
-    raise ValueError("MONGO_URI environment variable is not set")
+# Connection pool per client; requests beyond maxPoolSize wait up to
+# waitQueueTimeoutMS for a connection before failing
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+# Async connections opened on startup so the first requests do not pay for them
+MONGO_WARM_CONNECTIONS = int(os.getenv("MONGO_WARM_CONNECTIONS", str(max(1, MONGO_MIN_POOL_SIZE))))
+
+# Indexes the app relies on, created on startup if missing:
+# collection -> [(keys, options)]
+DECLARED_INDEXES = {
+    "users": [
+        ([("email", ASCENDING)], {"name": "email_1", "unique": True}),
+    ],
+    "professionals": [
+        ([("email", ASCENDING)], {"name": "email_1"}),
+        ([("specialty", ASCENDING), ("_id", ASCENDING)], {"name": "specialty_1__id_1"}),
+    ],
+}
+
+
+def client_options() -> dict:
+    """Pool and timeout settings shared by the sync and the async client."""
+    return {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    }
+
+
+class DatabaseNotReady(RuntimeError):
+    """Raised when the database is used before start_database() finished."""
+
+
+class DatabaseState:
+    """Clients and startup status; populated by start_database(), not at import."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.backend: Optional[str] = None
+        self.client = None
+        self.db = None
+        self.async_client = None
+        self.async_db = None
+        self.ready = False
+        self.error: Optional[str] = None
+        self.indexes: dict = {}
+        self.warm_connections = 0
+        self.startup_seconds: Optional[float] = None
+
+
+state = DatabaseState()
+
+
+def get_database():
+    """The synchronous database, for code running in worker threads."""
+    if state.db is None:
+        raise DatabaseNotReady("Database is not connected")
+    return state.db
+
+
+def get_async_database():
+    """The async (Motor) database, for request handlers."""
+    if state.async_db is None:
+        raise DatabaseNotReady("Database is not connected")
+    return state.async_db
+
+
+def upsert_many(collection, updates: List[Tuple[dict, dict]]):
+    """Apply ``(filter, update)`` upserts in one unordered bulk write."""
+    from server.app.utils.memory_database import MemoryCollection
+    if isinstance(collection, MemoryCollection):
+        # The in-memory backend takes the pairs as they are
+        return collection.upsert_many(updates)
+    return collection.bulk_write([UpdateOne(filter, update, upsert=True) for filter, update in updates], ordered=False)
+
+
+def reconcile_indexes(db, declared: dict = DECLARED_INDEXES) -> dict:
+    """Create declared indexes that are missing; report the ones that exist with other settings.
+
+    Differing indexes are left alone, since rebuilding one can lock a
+    collection; they show up in the readiness report instead.
+    """
+    report = {"created": [], "existing": [], "mismatched": []}
+    for collection_name, indexes in declared.items():
+        collection = db[collection_name]
+        existing = collection.index_information()
+        for keys, options in indexes:
+            name = options["name"]
+            label = f"{collection_name}.{name}"
+            current = existing.get(name)
+            if current is None:
+                collection.create_index(keys, **options)
+                report["created"].append(label)
+                logger.info(f"Created index {label}")
+            elif [tuple(key) for key in current["key"]] != [tuple(key) for key in keys] \
+                    or bool(current.get("unique")) != bool(options.get("unique")):
+                report["mismatched"].append(label)
+                logger.warning(f"Index {label} exists with different keys or options: {current}")
+            else:
+                report["existing"].append(label)
+    return report
 
-try:
-    # Connect to MongoDB with timeout
-    logger.info(f"Attempting to connect to MongoDB for database: {DB_NAME}...")
-    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
 
-    # Check connection by pinging
-    client.admin.command('ping')
+def _connect(backend: str):
+    if backend == "memory":
+        from server.app.utils.memory_database import AsyncMemoryDatabase, MemoryDatabase
+
+        db = MemoryDatabase(DB_NAME)
+        return None, db, None, AsyncMemoryDatabase(db)
+
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from pymongo import MongoClient
+
+    if not MONGO_URI:
+        logger.error("MONGO_URI environment variable is not set!")
+        raise ValueError("MONGO_URI environment variable is not set")
+
+    logger.info(f"Attempting to connect to MongoDB for database: {DB_NAME}...")
+    client = MongoClient(MONGO_URI, **client_options())
+    try:
+        # Check connection by pinging
+        client.admin.command('ping')
+    except Exception:
+        client.close()
+        raise
     logger.info(f"Successfully connected to MongoDB database: {DB_NAME}")
+    # Motor binds to the running event loop on first use
+    async_client = AsyncIOMotorClient(MONGO_URI, **client_options())
+    return client, client[DB_NAME], async_client, async_client[DB_NAME]
+
+
+async def start_database(backend: Optional[str] = None):
+    """Connect, reconcile the declared indexes and warm the async pool; called from the app lifespan.
+
+    Failures are logged and recorded for readiness instead of raised, so the
+    rest of the app (e.g. sentiment scoring) still starts.
+    """
+    backend = backend or DATABASE_BACKEND
+    if backend not in DATABASE_BACKENDS:
+        raise ValueError(f"Unknown database backend '{backend}', expected one of {DATABASE_BACKENDS}")
+
+    started_at = time.perf_counter()
+    state.backend = backend
+    state.ready = False
+    state.error = None
+    try:
+        # The sync driver blocks, so connect and build indexes off the event loop
+        state.client, state.db, state.async_client, state.async_db = await asyncio.to_thread(_connect, backend)
+        state.indexes = await asyncio.to_thread(reconcile_indexes, state.db)
+        warm = MONGO_WARM_CONNECTIONS if backend == "mongo" else 1
+        await asyncio.gather(*(state.async_db.command("ping") for _ in range(warm)))
+        state.warm_connections = warm
+        state.ready = True
+    except (ConnectionFailure, ServerSelectionTimeoutError, ConfigurationError, OperationFailure, ValueError) as e:
+        state.error = f"{type(e).__name__}: {str(e)}"
+        logger.error(f"Database startup failed: {state.error}")
+    state.startup_seconds = time.perf_counter() - started_at
+    if state.ready:
+        logger.info(f"Database setup complete ({backend}, {state.startup_seconds:.2f}s)")
+
+
+def readiness() -> dict:
+    return {
+        "ready": state.ready,
+        "backend": state.backend,
+        "database": DB_NAME,
+        "error": state.error,
+        "indexes": state.indexes,
+        "warm_connections": state.warm_connections,
+        "startup_seconds": state.startup_seconds,
+    }
+
+
+async def close_database():
+    """Flush the write-behind buffers, then close both clients."""
+    await close_write_behind_buffers()
+    if state.async_client is not None:
+        state.async_client.close()
+    if state.client is not None:
+        state.client.close()
+    state.reset()
+
+
+# Per-request events (predictions, chat sentiment tags, ...) are written in batches
+# through one buffer per collection instead of an insert_one per request
+write_behind_buffers = {}
+
+
+def register_write_behind_buffer(buffer: WriteBehindBuffer) -> WriteBehindBuffer:
+    """Add a buffer built elsewhere (e.g. with a post-write step) to the shared registry."""
+    existing = write_behind_buffers.get(buffer.name)
+    if existing is not None and existing is not buffer:
+        raise ValueError(f"A write-behind buffer for '{buffer.name}' is already registered")
+    write_behind_buffers[buffer.name] = buffer
+    return buffer
+
+
+def get_write_behind_buffer(collection_name: str, **options) -> WriteBehindBuffer:
+    """The shared write-behind buffer for a collection, created on first use with ``options``."""
+    buffer = write_behind_buffers.get(collection_name)
+    if buffer is None:
+        buffer = register_write_behind_buffer(WriteBehindBuffer(
+            lambda: get_database()[collection_name], collection_name, **options
+        ))
+    return buffer
+
+
+def write_behind_stats() -> list:
+    return [buffer.stats() for buffer in write_behind_buffers.values()]
+
 
-    # Get database and collections
-    db = client[DB_NAME]
-    users_collection = db["users"]
-
-    # Create indexes if they don't exist
-    if "email_1" not in users_collection.index_information():
-        users_collection.create_index("email", unique=True)
-        logger.info("Created unique index on email field")
-    else:
-        logger.info("Email index already exists")
-
-except ConnectionFailure as e:
-    logger.error(f"MongoDB Connection Error: {str(e)}")
-    raise
-except ServerSelectionTimeoutError as e:
-    logger.error(f"MongoDB Server Selection Timeout: {str(e)}")
-    raise
-except ConfigurationError as e:
-    logger.error(f"MongoDB Configuration Error: {str(e)}")
-    raise
-except Exception as e:
-    logger.error(f"Unexpected error when connecting to MongoDB: {str(e)}")
-    raise
-
-logger.info("Database setup complete")
\ No newline at end of file
+async def close_write_behind_buffers():
+    """Flush every write-behind buffer; called on shutdown."""
+    for buffer in write_behind_buffers.values():
+        await buffer.close()
@@ -0,0 +1,294 @@
+import re
+import copy
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.results import InsertManyResult, InsertOneResult, UpdateResult
+
+# Stand-in for MongoDB that keeps every collection in this process, so the
+# server, its tests and benchmarks run without a database server. It only
+# covers the calls the app makes (see the class docstrings); anything else
+# fails loudly instead of behaving differently from MongoDB. Data is lost on
+# restart.
+
+_MISSING = object()
+
+_COMPARISONS = {
+    "$gt": lambda a, b: a > b,
+    "$gte": lambda a, b: a >= b,
+    "$lt": lambda a, b: a < b,
+    "$lte": lambda a, b: a <= b,
+}
+
+
+def _get_path(document: dict, path: str):
+    value = document
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _matches_condition(value, condition) -> bool:
+    if not (isinstance(condition, dict) and any(key.startswith("$") for key in condition)):
+        # Equality; a scalar also matches any element of an array field
+        if isinstance(value, list) and not isinstance(condition, list):
+            return condition in value
+        return value == condition if value is not _MISSING else condition is None
+    for operator, argument in condition.items():
+        if operator in _COMPARISONS:
+            try:
+                if value is _MISSING or not _COMPARISONS[operator](value, argument):
+                    return False
+            except TypeError:
+                # MongoDB only compares values of the same type
+                return False
+        elif operator == "$regex":
+            flags = re.IGNORECASE if "i" in condition.get("$options", "") else 0
+            if not isinstance(value, str) or not re.search(argument, value, flags):
+                return False
+        elif operator != "$options":
+            raise NotImplementedError(f"Query operator {operator} is not supported by the in-memory database")
+    return True
+
+
+def matches(document: dict, query: Optional[dict]) -> bool:
+    """Whether ``document`` satisfies a query of equalities, $gt/$gte/$lt/$lte and $regex."""
+    return all(_matches_condition(_get_path(document, key), condition) for key, condition in (query or {}).items())
+
+
+def project(document: dict, projection: Optional[dict]) -> dict:
+    """Apply an inclusion projection of top-level fields, or ``{"_id": 0}``."""
+    if not projection:
+        return document
+    fields = [field for field, flag in projection.items() if field != "_id" and flag]
+    if len(fields) != len(projection) - ("_id" in projection):
+        raise NotImplementedError("Only inclusion projections are supported by the in-memory database")
+    projected = {field: document[field] for field in fields if field in document} if fields else dict(document)
+    projected.pop("_id", None)
+    if projection.get("_id", 1) and "_id" in document:
+        projected = {"_id": document["_id"], **projected}
+    return projected
+
+
+class MemoryCursor:
+    """Results of a find(): sorted on one field and limited on iteration; also async-iterable."""
+
+    def __init__(self, documents: List[dict], projection: Optional[dict] = None):
+        self._documents = documents
+        self._projection = projection
+        self._sort: Optional[Tuple[str, int]] = None
+        self._limit = 0
+
+    def sort(self, key: str, direction: int = 1) -> "MemoryCursor":
+        self._sort = (key, direction)
+        return self
+
+    def limit(self, count: int) -> "MemoryCursor":
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int) -> "MemoryCursor":
+        return self
+
+    def _results(self) -> List[dict]:
+        documents = list(self._documents)
+        if self._sort is not None:
+            key, direction = self._sort
+            documents.sort(key=lambda document: document[key], reverse=direction < 0)
+        if self._limit:
+            documents = documents[:self._limit]
+        return [project(document, self._projection) for document in documents]
+
+    def __iter__(self):
+        return iter(self._results())
+
+    def __aiter__(self):
+        return self._aiter()
+
+    async def _aiter(self):
+        for document in self._results():
+            yield document
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        results = self._results()
+        return results if length is None else results[:length]
+
+
+class MemoryCollection:
+    """A thread-safe, in-process collection.
+
+    Supports insert_one, insert_many, find, find_one, update_one with $set
+    and $inc (optionally upserting), upsert_many, create_index (unique
+    indexes are enforced) and index_information.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._documents: List[dict] = []
+        self._indexes = {"_id_": {"key": [("_id", 1)], "unique": True}}
+        self._lock = threading.RLock()
+
+    def _check_unique(self, document: dict, ignore: Optional[dict] = None):
+        for name, index in self._indexes.items():
+            if not index.get("unique"):
+                continue
+            fields = [field for field, _ in index["key"]]
+            key = tuple(_get_path(document, field) for field in fields)
+            if any(
+                    existing is not ignore and tuple(_get_path(existing, field) for field in fields) == key
+                    for existing in self._documents
+            ):
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {name}")
+
+    def _insert(self, document: dict):
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+        stored = copy.deepcopy(document)
+        self._check_unique(stored)
+        self._documents.append(stored)
+        return document["_id"]
+
+    def insert_one(self, document: dict) -> InsertOneResult:
+        with self._lock:
+            return InsertOneResult(self._insert(document), True)
+
+    def insert_many(self, documents: Iterable[dict], ordered: bool = True) -> InsertManyResult:
+        documents = list(documents)
+        inserted, errors = [], []
+        with self._lock:
+            for index, document in enumerate(documents):
+                try:
+                    inserted.append(self._insert(document))
+                except DuplicateKeyError as e:
+                    errors.append({"index": index, "code": 11000, "errmsg": str(e)})
+                    if ordered:
+                        break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(inserted)})
+        return InsertManyResult(inserted, True)
+
+    def find(self, filter: Optional[dict] = None, projection: Optional[dict] = None) -> MemoryCursor:
+        with self._lock:
+            found = [copy.deepcopy(document) for document in self._documents if matches(document, filter)]
+        return MemoryCursor(found, projection)
+
+    def find_one(self, filter: Optional[dict] = None, projection: Optional[dict] = None) -> Optional[dict]:
+        for document in self.find(filter, projection).limit(1):
+            return document
+        return None
+
+    @staticmethod
+    def _apply_update(document: dict, update: dict):
+        for operator, fields in update.items():
+            if operator not in ("$set", "$inc"):
+                raise NotImplementedError(f"Update operator {operator} is not supported by the in-memory database")
+            for path, value in fields.items():
+                *parents, name = path.split(".")
+                target = document
+                for parent in parents:
+                    target = target.setdefault(parent, {})
+                if operator == "$set":
+                    target[name] = copy.deepcopy(value)
+                else:
+                    target[name] = target.get(name, 0) + value
+
+    def update_one(self, filter: dict, update: dict, upsert: bool = False) -> UpdateResult:
+        with self._lock:
+            for document in self._documents:
+                if matches(document, filter):
+                    updated = copy.deepcopy(document)
+                    self._apply_update(updated, update)
+                    self._check_unique(updated, ignore=document)
+                    document.clear()
+                    document.update(updated)
+                    return UpdateResult({"n": 1, "nModified": 1}, True)
+            if not upsert:
+                return UpdateResult({"n": 0, "nModified": 0}, True)
+            # Upserts start from the equality part of the filter, as MongoDB does
+            document = {key: value for key, value in filter.items() if not isinstance(value, dict)}
+            self._apply_update(document, update)
+            return UpdateResult({"n": 1, "nModified": 0, "upserted": self._insert(document)}, True)
+
+    def upsert_many(self, updates: List[Tuple[dict, dict]]):
+        """Apply ``(filter, update)`` upserts; what ``bulk_write`` of UpdateOnes does on MongoDB."""
+        with self._lock:
+            for filter, update in updates:
+                self.update_one(filter, update, upsert=True)
+
+    def create_index(self, keys, unique: bool = False, name: Optional[str] = None) -> str:
+        keys = [(keys, 1)] if isinstance(keys, str) else [tuple(key) for key in keys]
+        name = name or "_".join(f"{field}_{direction}" for field, direction in keys)
+        index = {"key": keys, "unique": True} if unique else {"key": keys}
+        with self._lock:
+            previous = self._indexes.get(name)
+            self._indexes[name] = index
+            try:
+                for document in self._documents:
+                    self._check_unique(document, ignore=document)
+            except DuplicateKeyError:
+                if previous is None:
+                    del self._indexes[name]
+                else:
+                    self._indexes[name] = previous
+                raise
+        return name
+
+    def index_information(self) -> dict:
+        with self._lock:
+            return copy.deepcopy(self._indexes)
+
+
+class AsyncMemoryCollection:
+    """Motor-style awaitable view of a MemoryCollection; calls complete immediately."""
+
+    def __init__(self, collection: MemoryCollection):
+        self.collection = collection
+        self.name = collection.name
+
+    def find(self, *args, **kwargs) -> MemoryCursor:
+        return self.collection.find(*args, **kwargs)
+
+    async def find_one(self, *args, **kwargs) -> Optional[dict]:
+        return self.collection.find_one(*args, **kwargs)
+
+    async def insert_one(self, document: dict) -> InsertOneResult:
+        return self.collection.insert_one(document)
+
+    async def update_one(self, *args, **kwargs) -> UpdateResult:
+        return self.collection.update_one(*args, **kwargs)
+
+
+class MemoryDatabase:
+    def __init__(self, name: str):
+        self.name = name
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = MemoryCollection(name)
+            return self._collections[name]
+
+    def command(self, name: str) -> dict:
+        if name != "ping":
+            raise NotImplementedError(f"Command {name} is not supported by the in-memory database")
+        return {"ok": 1.0}
+
+
+class AsyncMemoryDatabase:
+    """Motor-style view of a MemoryDatabase sharing its collections."""
+
+    def __init__(self, database: MemoryDatabase):
+        self.database = database
+        self.name = database.name
+
+    def __getitem__(self, name: str) -> AsyncMemoryCollection:
+        return AsyncMemoryCollection(self.database[name])
+
+    async def command(self, name: str) -> dict:
+        return self.database.command(name)
@@ -0,0 +1,235 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Callable, List, Optional
+
+import numpy as np
+from pymongo.errors import BulkWriteError, ConnectionFailure, ExecutionTimeout, PyMongoError
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Documents per insert_many...
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "100"))
+# ...and the longest a buffered document waits for one
+WRITE_BEHIND_FLUSH_SECONDS = float(os.getenv("WRITE_BEHIND_FLUSH_SECONDS", "2"))
+# Documents held while the database is slow or down; newer ones are dropped beyond this
+WRITE_BEHIND_MAX_BUFFER = int(os.getenv("WRITE_BEHIND_MAX_BUFFER", "10000"))
+# Attempts after a transient failure, waiting backoff, 2 * backoff, ... between them
+WRITE_BEHIND_MAX_RETRIES = int(os.getenv("WRITE_BEHIND_MAX_RETRIES", "3"))
+WRITE_BEHIND_RETRY_BACKOFF_MS = float(os.getenv("WRITE_BEHIND_RETRY_BACKOFF_MS", "100"))
+
+DUPLICATE_KEY = 11000
+# Flush durations kept for the latency percentiles
+FLUSH_LATENCY_SAMPLES = 256
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether a failed write may succeed if tried again."""
+    if isinstance(error, (ConnectionFailure, ExecutionTimeout)):
+        return True
+    return isinstance(error, PyMongoError) and error.has_error_label("RetryableWriteError")
+
+
+class WriteBehindBuffer:
+    """Buffers documents for one collection and writes them in batches.
+
+    ``add`` only appends to memory and never waits for the database. A
+    background task writes up to ``batch_size`` documents per unordered
+    ``insert_many`` once a batch is full or ``flush_seconds`` after the last
+    flush, in a thread because the driver is synchronous. Transient failures
+    are retried with exponential backoff; documents that still could not be
+    written go back to the front of the buffer for the next flush.
+    ``insert_many`` gives every document an ``_id`` on the first attempt, so
+    duplicate-key errors on a retry mean the earlier attempt got through.
+    ``on_written``, if given, is called in the same thread with the
+    documents that were written.
+    """
+
+    def __init__(
+            self,
+            get_collection: Callable[[], object],
+            name: str = "documents",
+            batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+            flush_seconds: float = WRITE_BEHIND_FLUSH_SECONDS,
+            max_buffer: int = WRITE_BEHIND_MAX_BUFFER,
+            max_retries: int = WRITE_BEHIND_MAX_RETRIES,
+            retry_backoff_ms: float = WRITE_BEHIND_RETRY_BACKOFF_MS,
+            on_written: Optional[Callable[[List[dict]], None]] = None,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.get_collection = get_collection
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_buffer = max_buffer
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff_ms / 1000.0
+        self.on_written = on_written
+        self._buffer: List[dict] = []
+        self._closing = False
+
+        self.accepted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.retries = 0
+        self.requeued = 0
+        self.flushes = 0
+        self.callback_failures = 0
+        self.max_depth = 0
+        self.flush_latencies = deque(maxlen=FLUSH_LATENCY_SAMPLES)
+
+        self._wake: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._wake = asyncio.Event()
+            self._lock = asyncio.Lock()
+            self._worker = loop.create_task(self._run())
+
+    @property
+    def depth(self) -> int:
+        return len(self._buffer)
+
+    def add(self, document: dict) -> bool:
+        """Buffer a document; returns False if it was dropped because the buffer is full."""
+        self._ensure_worker()
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            return False
+        self._buffer.append(document)
+        self.accepted += 1
+        self.max_depth = max(self.max_depth, len(self._buffer))
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    def _insert(self, documents: List[dict]) -> int:
+        # Returns how many documents failed permanently
+        try:
+            self.get_collection().insert_many(documents, ordered=False)
+            failed = set()
+        except BulkWriteError as e:
+            failed = {
+                error["index"] for error in e.details.get("writeErrors", []) if error.get("code") != DUPLICATE_KEY
+            }
+            if failed:
+                logger.error(f"{len(failed)} of {len(documents)} documents were rejected by '{self.name}': "
+                             f"{e.details['writeErrors'][0].get('errmsg')}")
+
+        written = [document for index, document in enumerate(documents) if index not in failed]
+        if self.on_written is not None and written:
+            try:
+                self.on_written(written)
+            except Exception as e:
+                self.callback_failures += 1
+                logger.error(f"Post-write step for '{self.name}' failed: {str(e)}")
+        self.written += len(written)
+        return len(failed)
+
+    async def _write_batch(self, documents: List[dict]) -> bool:
+        """Write one batch with retries; False if it had to be put back."""
+        started_at = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.failed += await asyncio.to_thread(self._insert, documents)
+                break
+            except Exception as e:
+                if not is_transient(e):
+                    self.failed += len(documents)
+                    logger.error(f"Writing {len(documents)} documents to '{self.name}' failed: {str(e)}")
+                    break
+                if attempt == self.max_retries:
+                    self._requeue(documents)
+                    logger.warning(f"Writing {len(documents)} documents to '{self.name}' still failing "
+                                   f"after {attempt} retries: {str(e)}")
+                    return False
+                self.retries += 1
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+        self.flush_latencies.append(time.perf_counter() - started_at)
+        self.flushes += 1
+        return True
+
+    def _requeue(self, documents: List[dict]):
+        room = max(0, self.max_buffer - len(self._buffer))
+        if self._closing:
+            room = 0
+        self._buffer[:0] = documents[:room]
+        self.requeued += min(room, len(documents))
+        self.dropped += max(0, len(documents) - room)
+
+    async def flush(self) -> bool:
+        """Write everything buffered so far, one batch at a time; False if the database stayed unavailable."""
+        if self._lock is None:
+            self._ensure_worker()
+        async with self._lock:
+            while self._buffer:
+                documents = self._buffer[:self.batch_size]
+                del self._buffer[:self.batch_size]
+                if not await self._write_batch(documents):
+                    return False
+        return True
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if not await self.flush() and not self._closing:
+                # Let the database recover instead of retrying on every new batch
+                await asyncio.sleep(self.flush_seconds)
+            if self._closing:
+                return
+
+    def stats(self) -> dict:
+        latencies = np.asarray(self.flush_latencies) * 1000
+        p50, p95 = np.percentile(latencies, [50, 95]) if len(latencies) else (None, None)
+        return {
+            "collection": self.name,
+            "depth": self.depth,
+            "capacity": self.max_buffer,
+            "max_depth": self.max_depth,
+            "accepted": self.accepted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "retries": self.retries,
+            "requeued": self.requeued,
+            "flushes": self.flushes,
+            "callback_failures": self.callback_failures,
+            "flush_p50_ms": None if p50 is None else float(p50),
+            "flush_p95_ms": None if p95 is None else float(p95),
+            "flush_max_ms": float(latencies.max()) if len(latencies) else None,
+        }
+
+    async def close(self):
+        """Write what is still buffered, letting an in-progress write finish first.
+
+        Documents that cannot be written by then are dropped and counted.
+        """
+        self._closing = True
+        try:
+            if self._worker is not None and not self._worker.done():
+                self._wake.set()
+                await self._worker
+            if self._buffer:
+                await self.flush()
+        finally:
+            if self._buffer:
+                logger.error(f"Dropping {len(self._buffer)} unwritten documents for '{self.name}' on shutdown")
+                self.dropped += len(self._buffer)
+                self._buffer = []
+            self._worker = None
+            self._closing = False
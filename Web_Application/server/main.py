@@ -1,14 +1,56 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 import os
 from server.app.api.auth import router as auth_router
+from server.app.services.auth_service import password_hasher
 from server.app.api.protected import router as protected_router
-from server.app.api.sentiment import router as sentiment_router
-from server.app.api.chat_socket import router as chat_socket_router
+from server.app.api.sentiment import (
+    router as sentiment_router,
+    inference_executor,
+    inference_scheduler,
+    model_registry,
+)
+from server.app.api.chat_socket import router as chat_socket_router, chat_sentiment_tagger
+from server.app.api.live_sentiment_socket import router as live_sentiment_socket_router
 from server.app.api.professionals import router as professionals_router
+from server.app.utils.database import (
+    DatabaseNotReady,
+    close_database,
+    readiness,
+    start_database,
+    write_behind_stats,
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Connect, reconcile indexes and warm the pool here rather than at import
+    await start_database()
+    # Spawn process-pool workers (and load the model in each) before traffic arrives
+    inference_executor.warm_up()
+    password_hasher.warm_up()
+    # Apply the model deployment and keep watching it for new versions
+    model_registry.start()
+    yield
+    await chat_sentiment_tagger.close()
+    await model_registry.close()
+    await inference_scheduler.close()
+    inference_executor.shutdown()
+    password_hasher.shutdown()
+    # Flushes every write-behind buffer (predictions, chat sentiment) before closing
+    await close_database()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+@app.exception_handler(DatabaseNotReady)
+async def database_not_ready_handler(request: Request, exc: DatabaseNotReady):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database is unavailable, please retry"},
+        headers={"Retry-After": "5"},
+    )
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,6 +58,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the frontend follow paginated listings
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Create upload directories
@@ -29,6 +73,8 @@ app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 app.include_router(auth_router, tags=["auth"])
 app.include_router(protected_router, tags=["protected"])
 app.include_router(sentiment_router)
+# Before the chat router, whose /ws/{room_id} would otherwise match /ws/sentiment
+app.include_router(live_sentiment_socket_router, tags=["live-sentiment"])
 app.include_router(chat_socket_router, tags=["chat-socket"])
 app.include_router(professionals_router, prefix="/api/professionals", tags=["professionals"])
 
@@ -38,4 +84,15 @@ def root():
 
 @app.get("/health")
 async def health_check():
-    return {"message": "API is up and running!"}
\ No newline at end of file
+    return {"message": "API is up and running!"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    # 503 until the database is connected and its indexes are reconciled
+    report = readiness()
+    return JSONResponse(report, status_code=status.HTTP_200_OK if report["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+@app.get("/health/write-behind")
+async def write_behind_health():
+    # Buffer depth, flush latency and dropped documents of every batched writer
+    return write_behind_stats()
\ No newline at end of file
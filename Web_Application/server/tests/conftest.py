@@ -0,0 +1,53 @@
+import os
+import joblib
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+
+TEXTS = [
+    "sad hopeless crying", "feel empty lonely tired", "panic attack heart racing",
+    "nervous worry presentation", "nice weather weekend", "shopping store day",
+] * 5
+LABELS = [0, 0, 1, 1, 2, 2] * 5
+
+
+def fit_tiny_pipeline(texts=TEXTS, labels=LABELS, model_options=None, **vectorizer_options):
+    """Fit a small TF-IDF + logistic regression pipeline; bigrams unless ``ngram_range`` is given."""
+    vectorizer_options.setdefault("ngram_range", (1, 2))
+    vectorizer = TfidfVectorizer(**vectorizer_options)
+    model = LogisticRegression(**{"max_iter": 1000, **(model_options or {})})
+    model.fit(vectorizer.fit_transform(texts), labels)
+    return vectorizer, model
+
+
+def write_tiny_model(directory, texts, statuses, flip=False):
+    """Write the three pickles of a tiny model; ``flip`` swaps two labels so models disagree."""
+    os.makedirs(directory, exist_ok=True)
+    label_encoder = LabelEncoder().fit(statuses)
+    labels = label_encoder.transform(statuses)
+    if flip:
+        labels = 1 - labels
+    vectorizer, model = fit_tiny_pipeline(texts, labels)
+    joblib.dump(model, os.path.join(directory, "mental_health_model.pkl"))
+    joblib.dump(vectorizer, os.path.join(directory, "vectorizer.pkl"))
+    joblib.dump(label_encoder, os.path.join(directory, "label_encoder.pkl"))
+    return str(directory)
+
+
+@pytest.fixture
+def fit_pipeline():
+    """Factory for small fitted pipelines on a test's own corpus."""
+    return fit_tiny_pipeline
+
+
+@pytest.fixture
+def pipeline():
+    """A small fitted bigram TF-IDF + logistic regression pipeline over three classes."""
+    return fit_tiny_pipeline()
+
+
+@pytest.fixture
+def write_model():
+    """Factory writing a tiny model's pickles to a directory."""
+    return write_tiny_model
@@ -0,0 +1,52 @@
+import os
+import joblib
+import numpy as np
+import pytest
+from server.app.models.sentiment_model import data_directory
+from server.app.models.linear_scorer import LinearScorer
+
+
+@pytest.fixture(scope="module")
+def model_files_exist():
+    """Check if model files exist before running tests."""
+    data_directory = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
+
+    model_path = os.path.join(data_directory, "mental_health_model.pkl")
+    vectorizer_path = os.path.join(data_directory, "vectorizer.pkl")
+
+    # Skip tests if files don't exist
+    if not all([os.path.exists(p) for p in [model_path, vectorizer_path]]):
+        pytest.skip("Model files not found. Skipping integration tests.")
+
+
+PARITY_CORPUS = [
+    "",
+    "feel deeply depressed hopeless today",
+    "stop crying everything feel overwhelming",
+    "panic attack presentation tomorrow",
+    "regular day today",
+    "appointment tomorrow pm",
+    "weather cloudy outside",
+    "see point living anymore",
+    "feel worthless like burden everyone",
+    "mood swing manic week crash",
+    "qwertyuiop zxcvbnm",
+    "feel " * 500 + "depressed",
+]
+
+
+class TestLinearScorerIntegration:
+    """Parity of the NumPy linear scorer with the served sklearn pipeline."""
+
+    def test_probabilities_match_served_model(self, model_files_exist):
+        """Test that exported-array scoring reproduces model.predict_proba."""
+        # Load the pickles directly; the served module may be using an artifact
+        model = joblib.load(os.path.join(data_directory, "mental_health_model.pkl"))
+        vectorizer = joblib.load(os.path.join(data_directory, "vectorizer.pkl"))
+        scorer = LinearScorer.from_pipeline(vectorizer, model)
+
+        expected = model.predict_proba(vectorizer.transform(PARITY_CORPUS))
+        actual = scorer.predict_proba(PARITY_CORPUS)
+
+        np.testing.assert_allclose(actual, expected, rtol=1e-7, atol=1e-10)
+        assert (actual.argmax(axis=1) == expected.argmax(axis=1)).all()
@@ -0,0 +1,290 @@
+"""Inference benchmark: per-stage latency and throughput across batch sizes.
+
+Run from the Web_Application directory:
+
+    python -m server.tests.performance.benchmark_inference --output results.json
+    python -m server.tests.performance.benchmark_inference --baseline results.json
+
+The model is loaded explicitly (and timed) rather than at import, every
+measurement is preceded by untimed warm-up calls, and timings use
+``time.perf_counter_ns``. Results are written as JSON together with the
+environment they were measured in; ``--baseline`` compares a new run against
+a stored one and exits non-zero on regressions.
+"""
+import os
+import sys
+import json
+import time
+import random
+import platform
+import subprocess
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+BENCHMARK_FORMAT_VERSION = 1
+BATCH_SIZES = tuple(2 ** i for i in range(11))  # 1 .. 1024
+STAGES = ("preprocess", "vectorize", "predict", "end_to_end")
+
+# Statements the corpus is generated from when no CSV is given
+SAMPLE_STATEMENTS = [
+    "I feel very depressed today and I can't stop crying",
+    "I'm having anxiety about my presentation tomorrow, my heart is racing",
+    "Today was a normal day at work, nothing special happened",
+    "The weather is nice outside so we went for a walk",
+    "I feel worthless and hopeless, nothing ever gets better",
+    "Deadlines keep piling up and I am completely overwhelmed",
+    "I'm excited about the weekend and seeing my friends",
+    "My mood swings from extremely high to very low within days",
+    "I don't trust anyone and I feel people are always judging me",
+    "Just went grocery shopping and cooked dinner",
+]
+
+
+def build_corpus(size: int, csv_path: Optional[str] = None, seed: int = 0) -> List[str]:
+    """A deterministic list of ``size`` raw statements."""
+    rng = random.Random(seed)
+    if csv_path is not None:
+        import pandas as pd
+
+        statements = pd.read_csv(csv_path)["Statement"].dropna().astype(str).tolist()
+        rng.shuffle(statements)
+        return (statements * (size // max(1, len(statements)) + 1))[:size]
+
+    # Mix the samples into statements of varying length so batches are not identical
+    corpus = []
+    for _ in range(size):
+        parts = rng.sample(SAMPLE_STATEMENTS, rng.randint(1, 3))
+        corpus.append(". ".join(parts))
+    return corpus
+
+
+def summarize(samples_ns: Sequence[int], batch_size: int) -> dict:
+    """Latency percentiles (ms per batch) and throughput (statements per second)."""
+    samples = np.asarray(samples_ns, dtype=np.float64) / 1e6
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "iterations": int(len(samples)),
+        "mean_ms": float(samples.mean()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "throughput_per_s": float(batch_size / (p50 / 1000)) if p50 > 0 else float("inf"),
+    }
+
+
+def measure(
+        fn: Callable[[], object],
+        warmup: int,
+        min_iterations: int,
+        min_seconds: float,
+        max_iterations: int,
+) -> List[int]:
+    """Call ``fn`` ``warmup`` times untimed, then time it until both minimums are met."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    deadline = time.perf_counter_ns() + int(min_seconds * 1e9)
+    while len(samples) < max_iterations and (len(samples) < min_iterations or time.perf_counter_ns() < deadline):
+        start = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_metadata() -> dict:
+    import sklearn
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": _git_commit(),
+    }
+
+
+def run_benchmark(
+        components: dict,
+        preprocess: Callable[[str], str],
+        batch_sizes: Sequence[int] = BATCH_SIZES,
+        corpus: Optional[List[str]] = None,
+        warmup: int = 3,
+        min_iterations: int = 10,
+        min_seconds: float = 0.5,
+        max_iterations: int = 1000,
+) -> Dict[str, Dict[str, dict]]:
+    """Time each stage at each batch size; returns ``{stage: {batch_size: stats}}``.
+
+    ``components`` is the dict returned by ``load_model_components``. With a
+    LinearScorer, vectorization and prediction happen in one call, so that
+    time is reported under ``predict`` and ``vectorize`` is left out.
+    """
+    from server.app.models.model_loader import score_batch
+
+    corpus = corpus or build_corpus(max(batch_sizes))
+    model, vectorizer = components["model"], components["vectorizer"]
+    linear_scorer, label_encoder = components["linear_scorer"], components["label_encoder"]
+    timing = dict(warmup=warmup, min_iterations=min_iterations, min_seconds=min_seconds, max_iterations=max_iterations)
+
+    results = {stage: {} for stage in STAGES}
+    for batch_size in batch_sizes:
+        statements = corpus[:batch_size]
+        processed = [preprocess(statement) for statement in statements]
+
+        def run_predict():
+            if linear_scorer is not None:
+                return score_batch(processed, None, None, linear_scorer, label_encoder)
+            confidence_scores = model.predict_proba(matrix)
+            return label_encoder.inverse_transform(model.classes_[confidence_scores.argmax(axis=1)])
+
+        stages = {"preprocess": lambda: [preprocess(statement) for statement in statements]}
+        if linear_scorer is None:
+            matrix = vectorizer.transform(processed)
+            stages["vectorize"] = lambda: vectorizer.transform(processed)
+        stages["predict"] = run_predict
+        stages["end_to_end"] = lambda: score_batch(
+            [preprocess(statement) for statement in statements], model, vectorizer, linear_scorer, label_encoder
+        )
+
+        for stage, fn in stages.items():
+            results[stage][str(batch_size)] = summarize(measure(fn, **timing), batch_size)
+    return {stage: by_size for stage, by_size in results.items() if by_size}
+
+
+def compare_to_baseline(
+        results: Dict[str, Dict[str, dict]],
+        baseline: Dict[str, Dict[str, dict]],
+        tolerance: float = 0.15,
+        metric: str = "p50_ms",
+) -> List[dict]:
+    """Stage/batch-size pairs whose ``metric`` grew by more than ``tolerance``."""
+    regressions = []
+    for stage, by_size in results.items():
+        for batch_size, stats in by_size.items():
+            reference = baseline.get(stage, {}).get(batch_size)
+            if reference is None or reference[metric] <= 0:
+                continue
+            change = stats[metric] / reference[metric] - 1
+            if change > tolerance:
+                regressions.append({
+                    "stage": stage,
+                    "batch_size": int(batch_size),
+                    "metric": metric,
+                    "baseline": reference[metric],
+                    "current": stats[metric],
+                    "change": change,
+                })
+    return regressions
+
+
+def format_results(results: Dict[str, Dict[str, dict]]) -> str:
+    lines = [f"{'stage':<11} {'batch':>5} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'stmts/s':>12}"]
+    for stage, by_size in results.items():
+        for batch_size, stats in by_size.items():
+            lines.append(
+                f"{stage:<11} {batch_size:>5} {stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f} "
+                f"{stats['p99_ms']:>10.3f} {stats['throughput_per_s']:>12,.0f}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark sentiment inference stages across batch sizes")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=list(BATCH_SIZES))
+    parser.add_argument("--scorer", default=os.getenv("SENTIMENT_SCORER", "auto"), choices=("auto", "sklearn", "linear"))
+    parser.add_argument("--model-dir", help="Directory holding the pickles (defaults to server/data)")
+    parser.add_argument("--corpus", help="CSV with a Statement column; defaults to generated statements")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--min-iterations", type=int, default=10)
+    parser.add_argument("--min-seconds", type=float, default=0.5)
+    parser.add_argument("--max-iterations", type=int, default=1000)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against this results file and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative slowdown")
+    parser.add_argument("--metric", default="p50_ms", choices=("p50_ms", "p95_ms", "p99_ms", "mean_ms"))
+    args = parser.parse_args(argv)
+
+    # model_loader has no import-time side effects, so nothing is loaded before the timer starts
+    from server.app.models import model_artifact, model_loader
+    from server.app.models.preprocessing import get_text_preprocessor
+
+    model_dir = args.model_dir or model_loader.data_directory
+    artifact_dir = os.path.join(model_dir, "model_artifact") if args.model_dir else model_artifact.MODEL_ARTIFACT_DIRECTORY
+
+    start = time.perf_counter_ns()
+    components = model_loader.load_model_components(model_dir, artifact_dir, args.scorer)
+    load_ms = (time.perf_counter_ns() - start) / 1e6
+    start = time.perf_counter_ns()
+    preprocess = get_text_preprocessor()
+    preprocessor_load_ms = (time.perf_counter_ns() - start) / 1e6
+
+    results = run_benchmark(
+        components,
+        preprocess,
+        args.batch_sizes,
+        build_corpus(max(args.batch_sizes), args.corpus),
+        args.warmup,
+        args.min_iterations,
+        args.min_seconds,
+        args.max_iterations,
+    )
+    report = {
+        "format_version": BENCHMARK_FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment_metadata(),
+        "model": {
+            "version": components["model_version"],
+            "scorer": "linear" if components["linear_scorer"] is not None else "sklearn",
+            "load_ms": load_ms,
+            "preprocessor_load_ms": preprocessor_load_ms,
+        },
+        "settings": {
+            "corpus": args.corpus or "generated",
+            "warmup": args.warmup,
+            "min_iterations": args.min_iterations,
+            "min_seconds": args.min_seconds,
+        },
+        "results": results,
+    }
+
+    print(format_results(results))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("model", {}).get("version") != report["model"]["version"]:
+            print(f"Note: baseline was measured on model {baseline.get('model', {}).get('version')}")
+        regressions = compare_to_baseline(results, baseline["results"], args.tolerance, args.metric)
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['stage']} batch={regression['batch_size']}: "
+                f"{regression['metric']} {regression['baseline']:.3f} -> {regression['current']:.3f} "
+                f"({regression['change']:+.1%})"
+            )
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} on {args.metric}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
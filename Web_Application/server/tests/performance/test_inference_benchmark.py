@@ -0,0 +1,99 @@
+import json
+import joblib
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from server.app.models.linear_scorer import LinearScorer
+from server.tests.performance.benchmark_inference import (
+    build_corpus,
+    compare_to_baseline,
+    main,
+    run_benchmark,
+)
+
+STATUSES = ["Depression", "Anxiety", "Normal"]
+TIMING = dict(warmup=1, min_iterations=3, min_seconds=0, max_iterations=3)
+
+
+@pytest.fixture
+def components(fit_pipeline):
+    """Model components trained on the generated benchmark corpus."""
+    texts = build_corpus(60)
+    label_encoder = LabelEncoder().fit(STATUSES)
+    labels = [i % len(STATUSES) for i in range(len(texts))]
+    vectorizer, model = fit_pipeline(texts, labels)
+    return {
+        "model": model,
+        "vectorizer": vectorizer,
+        "linear_scorer": None,
+        "label_encoder": label_encoder,
+        "model_version": "test",
+    }
+
+
+class TestInferenceBenchmark:
+    """Tests for the benchmark harness itself (not for the model's speed)."""
+
+    def test_reports_every_stage_and_batch_size(self, components):
+        """Test that each stage reports percentiles and throughput per batch size."""
+        results = run_benchmark(components, str.lower, [1, 4], **TIMING)
+
+        assert set(results) == {"preprocess", "vectorize", "predict", "end_to_end"}
+        for by_size in results.values():
+            assert set(by_size) == {"1", "4"}
+            for stats in by_size.values():
+                assert stats["iterations"] == 3
+                assert 0 < stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+                assert stats["throughput_per_s"] > 0
+
+    def test_linear_scorer_has_no_separate_vectorize_stage(self, components):
+        """Test that the fused LinearScorer path is reported under predict only."""
+        components["linear_scorer"] = LinearScorer.from_pipeline(components["vectorizer"], components["model"])
+
+        results = run_benchmark(components, str.lower, [2], **TIMING)
+
+        assert set(results) == {"preprocess", "predict", "end_to_end"}
+
+    def test_corpus_is_deterministic(self):
+        """Test that the generated corpus is identical across runs."""
+        assert build_corpus(50) == build_corpus(50)
+        assert len(build_corpus(1024)) == 1024
+
+    def test_regressions_beyond_tolerance_are_reported(self):
+        """Test that only slowdowns larger than the tolerance count as regressions."""
+        baseline = {"predict": {"1": {"p50_ms": 1.0}, "8": {"p50_ms": 2.0}}}
+        results = {"predict": {"1": {"p50_ms": 1.1}, "8": {"p50_ms": 3.0}, "16": {"p50_ms": 9.0}}}
+
+        regressions = compare_to_baseline(results, baseline, tolerance=0.15)
+
+        assert [(r["stage"], r["batch_size"]) for r in regressions] == [("predict", 8)]
+        assert regressions[0]["change"] == pytest.approx(0.5)
+
+    def test_cli_saves_results_and_checks_baseline(self, tmp_path, components):
+        """Test the JSON output and the regression-check exit code."""
+        model_dir = tmp_path / "model"
+        model_dir.mkdir()
+        joblib.dump(components["model"], model_dir / "mental_health_model.pkl")
+        joblib.dump(components["vectorizer"], model_dir / "vectorizer.pkl")
+        joblib.dump(components["label_encoder"], model_dir / "label_encoder.pkl")
+        output = str(tmp_path / "results.json")
+        args = [
+            "--model-dir", str(model_dir), "--scorer", "sklearn", "--batch-sizes", "1", "8",
+            "--warmup", "1", "--min-iterations", "3", "--min-seconds", "0", "--max-iterations", "3",
+        ]
+
+        assert main(args + ["--output", output]) == 0
+        with open(output) as f:
+            report = json.load(f)
+        assert report["model"]["scorer"] == "sklearn"
+        assert set(report["results"]["end_to_end"]) == {"1", "8"}
+        assert "python" in report["environment"]
+
+        # A baseline that was ten times faster must fail the check
+        for by_size in report["results"].values():
+            for stats in by_size.values():
+                stats["p50_ms"] /= 10
+        baseline = str(tmp_path / "baseline.json")
+        with open(baseline, "w") as f:
+            json.dump(report, f)
+        assert main(args + ["--baseline", baseline]) == 1
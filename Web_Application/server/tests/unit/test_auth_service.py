@@ -0,0 +1,90 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from server.app.models.user import UserIn
+from server.app.services.password_hasher import PasswordHasher, password_context
+
+USER = UserIn(
+    username="sam", email="sam@example.com", password="s3cret",
+    mobileNumber="0700000000", emergencyContact="0711111111",
+)
+
+
+@pytest.fixture
+def users():
+    """A mocked Motor users collection with no users in it."""
+    users = MagicMock()
+    users.find_one = AsyncMock(return_value=None)
+    users.insert_one = AsyncMock(return_value=MagicMock(inserted_id=ObjectId(), acknowledged=True))
+    users.update_one = AsyncMock()
+    return users
+
+
+@pytest.fixture
+def auth_service(monkeypatch, users):
+    """auth_service with a cheap password hasher, reading and writing ``users``."""
+    monkeypatch.setenv("JWT_SECRET", "test-secret")
+    from server.app.services import auth_service
+
+    hasher = PasswordHasher(rounds=4, workers=1)
+    monkeypatch.setattr(auth_service, "get_async_database", lambda: {"users": users})
+    monkeypatch.setattr(auth_service, "password_hasher", hasher)
+    yield auth_service
+    hasher.shutdown()
+
+
+class TestAsyncAuthService:
+    """Unit tests for registration and login on the async (Motor) client."""
+
+    def test_register_awaits_the_collection_and_stores_a_hash(self, auth_service, users):
+        """Test that registration checks for the email, then inserts a bcrypt hash, never the password."""
+        user = asyncio.run(auth_service.register_user(USER))
+
+        assert user.email == USER.email
+        users.find_one.assert_awaited_once_with({"email": USER.email})
+        stored = users.insert_one.await_args.args[0]
+        assert stored["password"] != USER.password
+        assert password_context(4).verify(USER.password, stored["password"])
+
+    def test_register_rejects_a_known_email(self, auth_service, users):
+        """Test that an existing email is a 400 and nothing is inserted."""
+        users.find_one.return_value = {"email": USER.email}
+
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(auth_service.register_user(USER))
+
+        assert error.value.status_code == 400
+        users.insert_one.assert_not_awaited()
+
+    def test_login_issues_a_token_and_upgrades_outdated_hashes(self, auth_service, users):
+        """Test that a valid login returns a token for the user and rehashes a hash with another cost."""
+        user_id = ObjectId()
+        users.find_one.return_value = {
+            "_id": user_id, "email": USER.email, "password": password_context(5).hash(USER.password),
+        }
+
+        token = asyncio.run(auth_service.login_user(USER.email, USER.password))
+
+        assert auth_service.get_email_from_token(token.access_token) == USER.email
+        query, update = users.update_one.await_args.args
+        assert query == {"_id": user_id}
+        assert password_context(4).verify(USER.password, update["$set"]["password"])
+
+    def test_login_rejects_unknown_users_and_wrong_passwords(self, auth_service, users):
+        """Test that both failures are the same 400."""
+        with pytest.raises(HTTPException) as unknown:
+            asyncio.run(auth_service.login_user(USER.email, USER.password))
+
+        users.find_one.return_value = {
+            "_id": ObjectId(), "email": USER.email, "password": password_context(4).hash("other"),
+        }
+        with pytest.raises(HTTPException) as wrong:
+            asyncio.run(auth_service.login_user(USER.email, USER.password))
+
+        assert unknown.value.status_code == wrong.value.status_code == 400
+        assert unknown.value.detail == wrong.value.detail
+        users.update_one.assert_not_awaited()
@@ -0,0 +1,71 @@
+import pytest
+import pandas as pd
+
+from server.app.models.batch_score import score_csv
+from server.app.models.model_loader import load_model_components, score_batch
+from server.app.models.preprocessing import preprocess_text
+
+STATEMENTS = ["sad hopeless crying", "feel empty lonely", "nice weather weekend", "shopping store day"]
+STATUSES = ["Depression", "Depression", "Normal", "Normal"]
+
+
+@pytest.fixture
+def model_dir(tmp_path, write_model):
+    """A directory with the three pickles of a tiny model."""
+    return write_model(str(tmp_path / "model"), [preprocess_text(s) for s in STATEMENTS], STATUSES)
+
+
+@pytest.fixture
+def input_csv(tmp_path):
+    """A Statement/Status CSV with a missing statement in it."""
+    path = tmp_path / "statements.csv"
+    statements = (STATEMENTS * 6)[:23] + [None]
+    pd.DataFrame({"Statement": statements, "Status": "Normal"}).to_csv(path, index=False)
+    return str(path)
+
+
+class TestBatchScore:
+    """Unit tests for the offline CSV scoring CLI."""
+
+    def expected(self, model_dir, statements):
+        components = load_model_components(model_dir, None, "sklearn")
+        components.pop("model_version")
+        return score_batch([preprocess_text(s) for s in statements], **components)
+
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_scores_every_row_in_order(self, tmp_path, model_dir, input_csv, workers):
+        """Test that output rows match the input order and the served model's predictions."""
+        output = str(tmp_path / "scored.csv")
+
+        summary = score_csv(
+            input_csv, output, chunk_size=5, workers=workers, probabilities=True,
+            model_dir=model_dir, artifact_dir=None, scorer="sklearn",
+        )
+
+        scored = pd.read_csv(output, keep_default_na=False)
+        statements = pd.read_csv(input_csv)["Statement"].fillna("").tolist()
+        expected = self.expected(model_dir, statements)
+        assert summary["rows"] == len(statements) == len(scored)
+        assert summary["rows_per_sec"] > 0
+        assert scored["Statement"].tolist() == statements
+        assert scored["sentiment"].tolist() == [sentiment for sentiment, _ in expected]
+        assert scored["confidence"].tolist() == pytest.approx([max(confidence) for _, confidence in expected])
+        assert {"p_Depression", "p_Normal"} <= set(scored.columns)
+
+    def test_missing_statement_column(self, tmp_path, model_dir):
+        """Test that an input without the statement column is rejected."""
+        path = tmp_path / "bad.csv"
+        pd.DataFrame({"text": ["hello"]}).to_csv(path, index=False)
+
+        with pytest.raises(ValueError):
+            score_csv(str(path), str(tmp_path / "out.csv"), workers=0, model_dir=model_dir, artifact_dir=None)
+
+    def test_parquet_output(self, tmp_path, model_dir, input_csv):
+        """Test that a .parquet output path writes Parquet."""
+        pytest.importorskip("pyarrow")
+        output = str(tmp_path / "scored.parquet")
+
+        summary = score_csv(input_csv, output, chunk_size=10, workers=0, model_dir=model_dir, artifact_dir=None)
+
+        assert summary["format"] == "parquet"
+        assert len(pd.read_parquet(output)) == summary["rows"]
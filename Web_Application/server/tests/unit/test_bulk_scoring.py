@@ -0,0 +1,163 @@
+import json
+import asyncio
+import pytest
+
+from server.app.services.bulk_scoring import (
+    BulkInputError,
+    iter_csv_rows,
+    iter_lines,
+    iter_ndjson_rows,
+    stream_scores,
+)
+from server.app.services.inference_executor import InferenceQueueFull
+
+
+async def byte_stream(data: bytes, chunk_size: int = 7):
+    """Yield ``data`` in small chunks that split lines at arbitrary points."""
+    for i in range(0, len(data), chunk_size):
+        yield data[i:i + chunk_size]
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+def parse_rows(parser, data: bytes):
+    return asyncio.run(collect(parser(iter_lines(byte_stream(data)))))
+
+
+def run_stream(rows, score_chunk, **kwargs):
+    async def run():
+        async def row_source():
+            for row in rows:
+                yield row
+        output = b"".join(await collect(stream_scores(row_source(), score_chunk, "v1", **kwargs)))
+        return [json.loads(line) for line in output.decode().splitlines()]
+    return asyncio.run(run())
+
+
+async def fake_score(statements):
+    return [(statement.upper(), [1.0]) for statement in statements]
+
+
+class TestBulkInputParsing:
+    """Unit tests for incremental NDJSON and CSV parsing."""
+
+    def test_ndjson_rows(self):
+        """Test strings, objects with ids, and per-row errors."""
+        data = b'"first"\n{"id": 9, "statement": "second"}\n\nnot json\n{"other": 1}\n"last"'
+
+        rows = parse_rows(iter_ndjson_rows, data)
+
+        assert rows == [
+            (1, None, "first", None),
+            (2, 9, "second", None),
+            (3, None, None, "Invalid JSON"),
+            (4, None, None, "Missing 'statement' string"),
+            (5, None, "last", None),
+        ]
+
+    def test_csv_rows_with_quoted_newlines(self):
+        """Test that quoted fields may contain commas, quotes and newlines."""
+        data = b'id,Statement,Status\r\n1,"one, ""two""\nthree",Normal\r\n2,plain,Stress\r\n'
+
+        rows = parse_rows(iter_csv_rows, data)
+
+        assert rows == [(1, "1", 'one, "two"\nthree', None), (2, "2", "plain", None)]
+
+    def test_csv_without_statement_column(self):
+        """Test that a CSV without a Statement column is rejected."""
+        with pytest.raises(BulkInputError):
+            parse_rows(iter_csv_rows, b"text,Status\nhello,Normal\n")
+
+    def test_line_length_is_bounded(self):
+        """Test that an endless line does not grow the buffer without limit."""
+        async def run():
+            return await collect(iter_lines(byte_stream(b"x" * 100), max_line_bytes=10))
+
+        with pytest.raises(BulkInputError):
+            asyncio.run(run())
+
+
+class TestStreamScores:
+    """Unit tests for chunked, ordered, bounded scoring."""
+
+    def test_results_keep_input_order(self):
+        """Test that every row gets one result line, in order, followed by a summary."""
+        rows = [(i, None, f"s{i}", None) for i in range(1, 8)]
+        rows[2] = (3, None, None, "Invalid JSON")
+
+        lines = run_stream(rows, fake_score, chunk_size=3)
+
+        assert [line.get("row") for line in lines[:-1]] == list(range(1, 8))
+        assert lines[0] == {"row": 1, "id": None, "sentiment": "S1", "confidence": [1.0], "truncated": False,
+                            "model_version": "v1"}
+        assert lines[2] == {"row": 3, "id": None, "error": "Invalid JSON"}
+        assert lines[-1] == {"summary": {"rows": 7, "scored": 6, "failed": 1, "truncated": False}}
+
+    def test_in_flight_chunks_are_bounded(self):
+        """Test that no more than max_in_flight chunks are scored at once."""
+        active = []
+        peak = []
+
+        async def slow_score(statements):
+            active.append(1)
+            peak.append(len(active))
+            await asyncio.sleep(0.01)
+            active.pop()
+            return await fake_score(statements)
+
+        rows = [(i, None, f"s{i}", None) for i in range(1, 41)]
+        lines = run_stream(rows, slow_score, chunk_size=4, max_in_flight=2)
+
+        assert max(peak) == 2
+        assert lines[-1]["summary"]["scored"] == 40
+
+    def test_long_statements_are_capped(self):
+        """Test that each row is capped before scoring and flagged as truncated."""
+        scored = []
+
+        async def recording_score(statements):
+            scored.extend(statements)
+            return await fake_score(statements)
+
+        rows = [(1, None, "short", None), (2, None, "word " * 100, None)]
+
+        lines = run_stream(rows, recording_score, max_chars=20)
+
+        assert scored[0] == "short" and len(scored[1]) <= 20
+        assert [line["truncated"] for line in lines[:-1]] == [False, True]
+
+    def test_row_limit_truncates(self):
+        """Test that rows past the limit are not scored and the summary says so."""
+        rows = [(i, None, f"s{i}", None) for i in range(1, 11)]
+
+        lines = run_stream(rows, fake_score, chunk_size=3, max_rows=5)
+
+        assert len(lines) == 6
+        assert lines[-1]["summary"]["truncated"] is True
+        assert lines[-1]["summary"]["scored"] == 5
+
+    def test_waits_while_inference_queue_is_full(self):
+        """Test that a full inference queue delays a chunk instead of failing it."""
+        attempts = []
+
+        async def busy_then_free(statements):
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise InferenceQueueFull("busy")
+            return await fake_score(statements)
+
+        lines = run_stream([(1, None, "s1", None)], busy_then_free)
+
+        assert len(attempts) == 3
+        assert lines[0]["sentiment"] == "S1"
+
+    def test_scoring_failure_ends_stream_with_error(self):
+        """Test that a failure after streaming started is reported in the summary."""
+        async def fail(statements):
+            raise RuntimeError("Model error")
+
+        lines = run_stream([(1, None, "s1", None)], fail)
+
+        assert lines == [{"summary": {"rows": 0, "scored": 0, "failed": 0, "truncated": False, "error": "Scoring failed"}}]
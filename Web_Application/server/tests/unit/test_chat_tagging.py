@@ -0,0 +1,159 @@
+import json
+import asyncio
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from server.app.api import chat_socket
+from server.app.api.dependencies import get_current_user_email
+from server.app.services.chat_tagging import ChatSentimentTagger
+from server.app.services.inference_executor import InferenceQueueFull
+
+
+def make_scorer(calls, delay=0.0):
+    async def score(texts):
+        calls.append(list(texts))
+        await asyncio.sleep(delay)
+        return "v1", [("Anxiety" if "worry" in text else "Normal", [0.2, 0.8]) for text in texts]
+    return score
+
+
+class TestChatSentimentTagger:
+    """Unit tests for the bounded, batched chat tagging pipeline."""
+
+    def test_tags_are_handed_to_record_as_copies(self):
+        """Test that every tag is passed on for persistence without the message text."""
+        recorded = []
+
+        async def run():
+            tagger = ChatSentimentTagger(make_scorer([]), max_wait_ms=0, record=recorded.append)
+            tagger.submit("room-1", 1, "I worry")
+            await asyncio.sleep(0.05)
+            await tagger.close()
+            return tagger
+
+        tagger = asyncio.run(run())
+
+        assert [tag["sequence"] for tag in recorded] == [1]
+        assert "I worry" not in recorded[0].values()
+        recorded[0]["_id"] = "added by the driver"
+        assert "_id" not in tagger.room_tags("room-1")[0]
+
+    def test_messages_are_tagged_in_batches(self):
+        """Test that queued messages are scored together and published with their room and sequence."""
+        calls, published = [], []
+
+        async def publish(room_id, tag):
+            published.append((room_id, tag))
+
+        async def run():
+            tagger = ChatSentimentTagger(make_scorer(calls), publish, batch_size=4, max_wait_ms=20)
+            for sequence in range(1, 7):
+                assert tagger.submit("room-1", sequence, "I worry" if sequence % 2 else "hello")
+            await asyncio.sleep(0.1)
+            await tagger.close()
+            return tagger
+
+        tagger = asyncio.run(run())
+
+        assert [len(batch) for batch in calls] == [4, 2]
+        assert [tag["sequence"] for _, tag in published] == [1, 2, 3, 4, 5, 6]
+        assert published[0] == ("room-1", {
+            "type": "sentiment", "room_id": "room-1", "sequence": 1, "sentiment": "Anxiety",
+            "confidence": 0.8, "model_version": "v1", "sent_at": published[0][1]["sent_at"],
+        })
+        assert [tag["sequence"] for tag in tagger.room_tags("room-1")] == [1, 2, 3, 4, 5, 6]
+        assert tagger.stats()["tagged"] == 6
+        assert tagger.stats()["batches"] == 2
+
+    def test_full_queue_drops_without_waiting(self):
+        """Test that submit never blocks and counts messages it had to drop."""
+        async def run():
+            tagger = ChatSentimentTagger(make_scorer([], delay=0.05), max_queue=3, batch_size=1, max_wait_ms=0)
+            started_at = time.perf_counter()
+            accepted = [tagger.submit("room", sequence, "hi") for sequence in range(10)]
+            elapsed = time.perf_counter() - started_at
+            stats = tagger.stats()
+            await tagger.close()
+            return accepted, elapsed, stats
+
+        accepted, elapsed, stats = asyncio.run(run())
+
+        assert accepted.count(True) == 3
+        assert elapsed < 0.05
+        assert stats["dropped"] == 7
+        assert stats["depth"] == 3
+        assert stats["max_depth"] == 3
+
+    def test_busy_inference_sheds_batch(self):
+        """Test that a saturated inference queue sheds tagging instead of retrying."""
+        async def busy(texts):
+            raise InferenceQueueFull("busy")
+
+        async def run():
+            tagger = ChatSentimentTagger(busy, max_wait_ms=0)
+            tagger.submit("room", 1, "hi")
+            await asyncio.sleep(0.02)
+            await tagger.close()
+            return tagger.stats()
+
+        stats = asyncio.run(run())
+
+        assert stats["shed"] == 1
+        assert stats["tagged"] == 0
+
+    def test_history_is_bounded(self):
+        """Test that only the latest tags per room and the most recent rooms are kept."""
+        async def run():
+            tagger = ChatSentimentTagger(make_scorer([]), history=2, max_rooms=2, max_wait_ms=0)
+            for room in ("a", "b", "c"):
+                for sequence in range(1, 4):
+                    tagger.submit(room, sequence, "hi")
+            await asyncio.sleep(0.05)
+            await tagger.close()
+            return tagger
+
+        tagger = asyncio.run(run())
+
+        assert list(tagger.recent) == ["b", "c"]
+        assert [tag["sequence"] for tag in tagger.room_tags("c")] == [2, 3]
+
+
+class TestChatSocketTagging:
+    """Unit tests for tagging relayed chat messages."""
+
+    def test_relay_then_follow_up_event(self, monkeypatch):
+        """Test that messages are relayed as-is and tagged afterwards as a room event."""
+        tagger = ChatSentimentTagger(make_scorer([]), chat_socket.publish_sentiment, max_wait_ms=0)
+        monkeypatch.setattr(chat_socket, "chat_sentiment_tagger", tagger)
+        app = FastAPI()
+        app.include_router(chat_socket.router)
+        app.dependency_overrides[get_current_user_email] = lambda: "sam@example.com"
+
+        with TestClient(app) as client:
+            with client.websocket_connect("/ws/room-9") as sender, client.websocket_connect("/ws/room-9") as receiver:
+                sender.send_text("I worry a lot")
+
+                assert receiver.receive_text() == "I worry a lot"
+                tag = json.loads(receiver.receive_text())
+                assert json.loads(sender.receive_text()) == tag
+                assert (tag["type"], tag["sequence"], tag["sentiment"]) == ("sentiment", 1, "Anxiety")
+
+            stats = client.get("/chat/sentiment/stats").json()
+            assert stats["tagged"] == 1 and stats["dropped"] == 0
+            assert client.get("/chat/sentiment/room-9").json()["tags"] == [tag]
+
+    def test_sentiment_endpoints_require_a_signed_in_user(self, monkeypatch):
+        """Test that anonymous callers cannot read room sentiment or tagger stats."""
+        tagger = ChatSentimentTagger(make_scorer([]), max_wait_ms=0)
+        monkeypatch.setattr(chat_socket, "chat_sentiment_tagger", tagger)
+        app = FastAPI()
+        app.include_router(chat_socket.router)
+        client = TestClient(app)
+
+        assert client.get("/chat/sentiment/stats").status_code == 401
+        assert client.get("/chat/sentiment/room-9").status_code == 401
+
+        app.dependency_overrides[get_current_user_email] = lambda: "sam@example.com"
+        assert client.get("/chat/sentiment/room-9").json() == {"room_id": "room-9", "tags": []}
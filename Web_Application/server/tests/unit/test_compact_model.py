@@ -0,0 +1,189 @@
+import os
+import joblib
+import numpy as np
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from server.app.models.compact_model import (
+    build_pipeline,
+    compare_operating_points,
+    dequantized_coef,
+    feature_importance,
+    prune_arrays,
+    quantize_arrays,
+    write_compacted_model,
+)
+from server.app.models.linear_scorer import LinearScorer, export_linear_model
+from server.app.models.model_loader import compute_model_version
+from server.app.models.model_artifact import load_model_artifact, read_manifest, write_model_artifact
+
+TEXTS = [
+    "sad hopeless crying today", "feel empty lonely tired today", "panic attack heart racing today",
+    "nervous worry presentation today", "nice weather weekend today", "shopping store day today",
+] * 5
+LABELS = [0, 0, 1, 1, 2, 2] * 5
+
+QUERIES = ["", "sad crying weekend", "heart racing panic panic", "unknown words here", "nice day today"]
+
+
+@pytest.fixture
+def pipeline(fit_pipeline):
+    """A small fitted pipeline whose shared "today" term carries near-zero weight."""
+    return fit_pipeline(TEXTS, LABELS)
+
+
+class TestPruning:
+    """Unit tests for dropping low-weight features."""
+
+    def test_threshold_drops_small_features(self, pipeline):
+        """Test that only features at or above the threshold are kept."""
+        vectorizer, model = pipeline
+        arrays = export_linear_model(vectorizer, model)
+        threshold = float(np.median(feature_importance(arrays["coef"])))
+
+        pruned = prune_arrays(arrays, threshold)
+
+        assert 0 < len(pruned["terms"]) < len(arrays["terms"])
+        assert feature_importance(pruned["coef"]).min() >= threshold
+        assert pruned["coef"].shape == (arrays["coef"].shape[0], len(pruned["terms"]))
+        assert len(pruned["idf"]) == len(pruned["terms"])
+
+    def test_zero_threshold_keeps_everything(self, pipeline):
+        """Test that a zero threshold leaves the model unchanged."""
+        vectorizer, model = pipeline
+        arrays = export_linear_model(vectorizer, model)
+
+        assert prune_arrays(arrays, 0.0)["terms"] == arrays["terms"]
+
+    def test_reduced_pipeline_matches_linear_scorer(self, pipeline):
+        """Test that the rebuilt sklearn pipeline scores like the pruned export."""
+        vectorizer, model = pipeline
+        arrays = prune_arrays(export_linear_model(vectorizer, model), 0.2)
+
+        reduced_vectorizer, reduced_model = build_pipeline(vectorizer, model, arrays)
+
+        assert len(reduced_vectorizer.vocabulary_) == len(arrays["terms"])
+        np.testing.assert_allclose(
+            reduced_model.predict_proba(reduced_vectorizer.transform(QUERIES)),
+            LinearScorer.from_arrays(arrays).predict_proba(QUERIES),
+            rtol=1e-9, atol=1e-12,
+        )
+        # The original pipeline is left untouched
+        assert len(vectorizer.vocabulary_) > len(arrays["terms"])
+
+
+class TestQuantization:
+    """Unit tests for storing coefficients in smaller types."""
+
+    @pytest.mark.parametrize("mode,atol", [("float32", 1e-6), ("float16", 1e-2), ("int8", 2e-2)])
+    def test_quantized_scores_stay_close(self, pipeline, mode, atol):
+        """Test that quantized coefficients give nearly the same probabilities."""
+        vectorizer, model = pipeline
+        arrays = export_linear_model(vectorizer, model)
+
+        quantized = quantize_arrays(arrays, mode)
+
+        assert quantized["coef"].dtype == np.dtype(mode)
+        np.testing.assert_allclose(
+            LinearScorer.from_arrays(quantized).predict_proba(QUERIES),
+            LinearScorer.from_arrays(arrays).predict_proba(QUERIES),
+            atol=atol,
+        )
+
+    def test_int8_round_trips_through_artifact(self, tmp_path, pipeline):
+        """Test that an int8 artifact keeps its scale and matches the dequantized pipeline."""
+        vectorizer, model = pipeline
+        arrays = quantize_arrays(export_linear_model(vectorizer, model), "int8")
+        directory = str(tmp_path / "model_artifact")
+
+        write_model_artifact(arrays, directory)
+        scorer = load_model_artifact(directory)
+        reduced_vectorizer, reduced_model = build_pipeline(vectorizer, model, arrays)
+
+        manifest = read_manifest(directory)
+        assert manifest["coef_dtype"] == "int8"
+        assert manifest["coef_scale"] is True
+        np.testing.assert_allclose(dequantized_coef(arrays), reduced_model.coef_)
+        np.testing.assert_allclose(
+            scorer.predict_proba(QUERIES),
+            reduced_model.predict_proba(reduced_vectorizer.transform(QUERIES)),
+            rtol=1e-9, atol=1e-12,
+        )
+
+    def test_unknown_mode(self, pipeline):
+        """Test that unsupported storage types are rejected."""
+        vectorizer, model = pipeline
+        with pytest.raises(ValueError):
+            quantize_arrays(export_linear_model(vectorizer, model), "int4")
+
+
+class TestOperatingPoints:
+    """Unit tests for the compaction report."""
+
+    def test_report_includes_baseline_and_deltas(self, pipeline):
+        """Test that every row reports size, latency and accuracy against the baseline."""
+        vectorizer, model = pipeline
+
+        rows = compare_operating_points(
+            vectorizer, model, TEXTS, np.array(LABELS),
+            thresholds=[0.0, 0.2], quantizations=["float64", "int8"], repeats=1,
+        )
+
+        assert [(row["threshold"], row["quantization"]) for row in rows] == [
+            (0.0, "float64"), (0.0, "int8"), (0.2, "float64"), (0.2, "int8"),
+        ]
+        baseline = rows[0]
+        assert baseline["agreement"] == 1.0
+        assert baseline["memory_delta"] == 0.0
+        assert baseline["accuracy_delta"] == 0.0
+        for row in rows[1:]:
+            assert row["artifact_bytes"] < baseline["artifact_bytes"]
+            assert row["memory_delta"] < 0
+            assert {"linear_ms", "sklearn_ms", "latency_delta", "accuracy", "max_proba_delta"} <= set(row)
+
+    def test_empty_evaluation_set(self, pipeline):
+        """Test that an empty evaluation set is rejected."""
+        vectorizer, model = pipeline
+        with pytest.raises(ValueError):
+            compare_operating_points(vectorizer, model, [])
+
+
+class TestWriteCompactedModel:
+    """Unit tests for replacing the served model with a compacted one."""
+
+    def test_write_replaces_or_removes_the_artifact(self, tmp_path, pipeline):
+        """Test that --write re-exports the artifact when asked and otherwise removes the unpruned one."""
+        vectorizer, model = pipeline
+        joblib.dump(LabelEncoder().fit([0, 1, 2]), tmp_path / "label_encoder.pkl")
+        joblib.dump(model, tmp_path / "mental_health_model.pkl")
+        joblib.dump(vectorizer, tmp_path / "vectorizer.pkl")
+        artifact_dir = str(tmp_path / "model_artifact")
+        write_model_artifact(export_linear_model(vectorizer, model), artifact_dir, model_version="unpruned")
+        arrays = prune_arrays(export_linear_model(vectorizer, model), 0.2)
+
+        write_compacted_model(vectorizer, model, arrays, str(tmp_path), artifact=True)
+
+        manifest = read_manifest(artifact_dir)
+        assert manifest["model_version"] == compute_model_version(str(tmp_path))
+        assert manifest["n_features"] == len(arrays["terms"])
+
+        write_compacted_model(vectorizer, model, arrays, str(tmp_path))
+
+        assert not os.path.exists(artifact_dir)
+        assert len(joblib.load(tmp_path / "vectorizer.pkl").vocabulary_) == len(arrays["terms"])
+
+    def test_write_backs_up_the_original_pickles(self, tmp_path, pipeline):
+        """Test that the served pickles are kept under their model version and replaced without leftovers."""
+        vectorizer, model = pipeline
+        joblib.dump(LabelEncoder().fit([0, 1, 2]), tmp_path / "label_encoder.pkl")
+        joblib.dump(model, tmp_path / "mental_health_model.pkl")
+        joblib.dump(vectorizer, tmp_path / "vectorizer.pkl")
+        original_version = compute_model_version(str(tmp_path))
+        arrays = prune_arrays(export_linear_model(vectorizer, model), 0.2)
+
+        backup_dir = write_compacted_model(vectorizer, model, arrays, str(tmp_path))
+
+        assert backup_dir == str(tmp_path / "model_backups" / original_version)
+        assert compute_model_version(backup_dir) == original_version
+        assert compute_model_version(str(tmp_path)) != original_version
+        assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server.app.utils import database
+from server.app.utils.memory_database import MemoryDatabase
+
+
+class TestDatabaseLifecycle:
+    """Unit tests for lifespan-managed database startup."""
+
+    def test_nothing_connects_at_import(self):
+        """Test that importing the module leaves the database unconnected until startup."""
+        if database.state.db is None:
+            with pytest.raises(database.DatabaseNotReady):
+                database.get_async_database()
+        assert database.readiness()["ready"] == (database.state.db is not None)
+
+    def test_memory_backend_startup_and_shutdown(self):
+        """Test that startup reconciles the declared indexes, reports readiness and closes cleanly."""
+        async def run():
+            await database.start_database("memory")
+            report = database.readiness()
+            users = database.get_database()["users"]
+            await database.close_database()
+            return report, users
+
+        report, users = asyncio.run(run())
+
+        assert report["ready"] and report["backend"] == "memory" and report["error"] is None
+        assert sorted(report["indexes"]["created"]) == [
+            "professionals.email_1", "professionals.specialty_1__id_1", "users.email_1",
+        ]
+        assert users.index_information()["email_1"]["unique"]
+        assert not database.readiness()["ready"]
+
+    def test_failed_connection_is_reported_not_raised(self, monkeypatch):
+        """Test that a missing MongoDB URI leaves the app up but not ready."""
+        monkeypatch.setattr(database, "MONGO_URI", None)
+
+        asyncio.run(database.start_database("mongo"))
+
+        report = database.readiness()
+        assert not report["ready"]
+        assert "MONGO_URI" in report["error"]
+        asyncio.run(database.close_database())
+
+    def test_reconcile_reports_mismatched_indexes(self):
+        """Test that an existing index with other options is reported and left alone."""
+        db = MemoryDatabase("test")
+        db["users"].create_index("email", name="email_1")
+
+        report = database.reconcile_indexes(db)
+
+        assert "users.email_1" in report["mismatched"]
+        assert not db["users"].index_information()["email_1"].get("unique")
+
+
+class TestAppWithoutMongo:
+    """The app starts, serves auth and reports readiness on the in-memory backend."""
+
+    def test_register_login_and_validate(self, monkeypatch):
+        """Test the auth flow end to end through the lifespan-managed stand-in database."""
+        monkeypatch.setenv("JWT_SECRET", "test-secret")
+        monkeypatch.setattr(database, "DATABASE_BACKEND", "memory")
+        from server.main import app
+
+        user = {
+            "username": "sam", "email": "sam@example.com", "password": "s3cret",
+            "mobileNumber": "0700000000", "emergencyContact": "0711111111",
+        }
+        with TestClient(app) as client:
+            assert client.get("/health/ready").json()["ready"]
+            assert client.post("/register", json=user).status_code == 200
+            assert client.post("/register", json=user).status_code == 400
+            token = client.post("/login", json={"email": user["email"], "password": "s3cret"}).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            assert client.get("/auth/validate", headers=headers).json() == {"valid": True, "email": user["email"]}
+            assert client.get("/protected", headers=headers).status_code == 200
+            assert client.get("/api/professionals/").json() == []
+
+        assert not database.readiness()["ready"]
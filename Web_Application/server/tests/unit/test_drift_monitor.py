@@ -0,0 +1,162 @@
+import asyncio
+import time
+import pytest
+
+from server.app.api import sentiment as sentiment_api
+from server.app.services.drift_monitor import (
+    DriftMonitor,
+    DriftMonitors,
+    TopKCounter,
+    population_stability_index,
+)
+
+VOCABULARY = {"sad", "happy", "work", "sleep"}
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_monitor(clock, **options):
+    options.setdefault("window_seconds", 60)
+    options.setdefault("buckets", 6)
+    options.setdefault("bins", 10)
+    return DriftMonitor(VOCABULARY.__contains__, clock=clock, **options)
+
+
+class TestDriftMonitor:
+    """Unit tests for sliding-window label counts, confidence histograms and unknown tokens."""
+
+    def test_window_counts_and_histogram(self):
+        """Test that the current window holds label counts and binned max-class confidence."""
+        monitor = make_monitor(FakeClock())
+        monitor.record("Normal", 0.95)
+        monitor.record("Normal", 1.0)
+        monitor.record("Stress", 0.42)
+
+        current = monitor.snapshot()["current"]
+
+        assert current["labels"] == {"Normal": 2, "Stress": 1}
+        assert current["label_share"]["Normal"] == pytest.approx(2 / 3)
+        assert current["confidence_histogram"] == [0, 0, 0, 0, 1, 0, 0, 0, 0, 2]
+        assert current["mean_confidence"] == pytest.approx((0.45 + 0.95 * 2) / 3)
+
+    def test_window_slides_and_psi_compares_windows(self):
+        """Test that old buckets move to the previous window, then expire."""
+        clock = FakeClock()
+        monitor = make_monitor(clock)
+        for _ in range(10):
+            monitor.record("Normal", 0.9)
+
+        clock.now += 60
+        for _ in range(10):
+            monitor.record("Depression", 0.9)
+        snapshot = monitor.snapshot()
+
+        assert snapshot["previous"]["labels"] == {"Normal": 10}
+        assert snapshot["current"]["labels"] == {"Depression": 10}
+        assert snapshot["label_psi"] > 1
+
+        clock.now += 120
+        snapshot = monitor.snapshot()
+        assert snapshot["current"]["predictions"] == snapshot["previous"]["predictions"] == 0
+        assert snapshot["label_psi"] is None
+        assert snapshot["predictions"] == 20
+
+    def test_unknown_tokens(self):
+        """Test that out-of-vocabulary tokens are counted and vocabulary lookups are memoized."""
+        lookups = []
+
+        def is_known(token):
+            lookups.append(token)
+            return token in VOCABULARY
+
+        monitor = DriftMonitor(is_known, clock=FakeClock(), max_tokens=3)
+        monitor.record("Stress", 0.5, "sad doomscrolling work")
+        monitor.record("Stress", 0.5, "doomscrolling burnout sad ignored")
+
+        unknown = monitor.snapshot()["unknown_tokens"]
+        assert unknown["top"] == [{"token": "doomscrolling", "count": 2}, {"token": "burnout", "count": 1}]
+        assert unknown["unknown_rate"] == pytest.approx(3 / 6)
+        assert sorted(lookups) == ["burnout", "doomscrolling", "sad", "work"]
+
+    def test_record_costs_microseconds(self):
+        """Test that recording stays cheap enough to leave on for every prediction."""
+        monitor = DriftMonitor(VOCABULARY.__contains__)
+        text = "feel sad work sleep deadline overwhelmed tired anxious"
+        for _ in range(100):
+            monitor.record("Stress", 0.7, text)
+
+        started_at = time.perf_counter()
+        for _ in range(10000):
+            monitor.record("Stress", 0.7, text)
+        per_call = (time.perf_counter() - started_at) / 10000
+
+        assert per_call < 50e-6
+
+
+class TestTopKCounter:
+    """Unit tests for the Misra-Gries heavy-hitter counter."""
+
+    def test_memory_is_bounded_and_heavy_hitters_survive(self):
+        """Test that frequent items are kept while the counter never grows past its capacity."""
+        counter = TopKCounter(capacity=5)
+        for i in range(1000):
+            counter.add("frequent" if i % 3 == 0 else f"rare{i}")
+            assert len(counter.counts) <= 5
+
+        assert counter.top(1)[0][0] == "frequent"
+        assert counter.top(1)[0][1] >= 334 - 1000 // 6
+
+
+class TestDriftMonitors:
+    """Unit tests for per-version monitors and the admin endpoint."""
+
+    def test_population_stability_index(self):
+        """Test that identical distributions have zero PSI and empty ones have none."""
+        assert population_stability_index({"a": 5, "b": 5}, {"a": 1, "b": 1}) == pytest.approx(0)
+        assert population_stability_index({}, {"a": 1}) is None
+
+    def test_versions_are_bounded(self):
+        """Test that only the most recently used versions are kept."""
+        monitors = DriftMonitors(max_versions=2)
+        for version in ("v1", "v2", "v3"):
+            monitors.get(version, lambda: VOCABULARY.__contains__).record("Normal", 0.9)
+
+        assert list(monitors.snapshot()) == ["v2", "v3"]
+
+    def test_predict_feeds_the_admin_endpoint(self, monkeypatch):
+        """Test that /predict/ results show up in the drift snapshot for the served version."""
+        monkeypatch.setattr(sentiment_api, "drift_monitors", DriftMonitors())
+        request = sentiment_api.StatementRequest(statement="Grinding through burnout and doomscrolling")
+
+        response = asyncio.run(sentiment_api.predict_sentiment_endpoint(request, None))
+        snapshot = asyncio.run(sentiment_api.sentiment_drift(top_k=5))
+
+        version = snapshot[response["model_version"]]
+        assert version["current"]["labels"] == {response["sentiment"]: 1}
+        assert version["unknown_tokens"]["unknown_rate"] is not None
+
+    def test_admin_endpoints_require_a_signed_in_user(self, monkeypatch):
+        """Test that anonymous callers can neither read nor reset the drift baselines."""
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from server.app.api.dependencies import get_current_user_email
+
+        monitors = DriftMonitors()
+        monitors.get("v1", lambda: VOCABULARY.__contains__).record("Normal", 0.9)
+        monkeypatch.setattr(sentiment_api, "drift_monitors", monitors)
+        app = FastAPI()
+        app.include_router(sentiment_api.router)
+        client = TestClient(app)
+
+        assert client.get("/admin/sentiment/drift").status_code == 401
+        assert client.post("/admin/sentiment/drift/reset").status_code == 401
+        assert list(monitors.snapshot()) == ["v1"]
+
+        app.dependency_overrides[get_current_user_email] = lambda: "admin@example.com"
+        assert client.post("/admin/sentiment/drift/reset").status_code == 200
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from server.app.models.evaluate_models import (
+    DEFAULT_VARIANTS,
+    build_variant,
+    compare_variants,
+    format_comparison,
+    parse_variant,
+)
+
+WORDS = {
+    "Depression": ["sad", "hopeless", "crying", "empty", "worthless"],
+    "Anxiety": ["worried", "panic", "nervous", "restless", "fear"],
+    "Normal": ["weather", "lunch", "weekend", "movie", "shopping"],
+}
+
+
+@pytest.fixture
+def evaluation_csv(tmp_path):
+    """A small, separable three-class Statement/Status CSV."""
+    rng = np.random.default_rng(0)
+    rows = []
+    for status, count in (("Depression", 30), ("Anxiety", 20), ("Normal", 40)):
+        for _ in range(count):
+            rows.append((" ".join(rng.choice(WORDS[status], size=4)), status))
+    path = tmp_path / "eval.csv"
+    pd.DataFrame(rows, columns=["Statement", "Status"]).to_csv(path, index=False)
+    return str(path)
+
+
+class TestEvaluateModels:
+    """Unit tests for the offline model comparison."""
+
+    def test_parse_variant(self):
+        """Test that variant names map to their settings and bad names are rejected."""
+        assert parse_variant("hashing-unigram-sgd") == {
+            "features": "hashing", "ngram_range": (1, 1), "classifier": "sgd",
+        }
+        with pytest.raises(ValueError):
+            parse_variant("tfidf-bigram-svm")
+
+    def test_liblinear_is_wrapped_for_multiclass(self):
+        """Test that liblinear becomes one-vs-rest only when there are more than two classes."""
+        _, binary = build_variant("tfidf-bigram-liblinear", 2)
+        _, multiclass = build_variant("tfidf-bigram-liblinear", 3)
+
+        assert type(binary).__name__ == "LogisticRegression"
+        assert type(multiclass).__name__ == "OneVsRestClassifier"
+
+    def test_compares_every_variant_on_one_split(self, tmp_path, evaluation_csv):
+        """Test that each default variant gets accuracy, latency, size and confusion matrix on the same rows."""
+        report = compare_variants(
+            evaluation_csv, DEFAULT_VARIANTS, str(tmp_path / "variants"), batch_size=16, single_items=5,
+            repeats=1, memory=False, workers=0, cache_directory=None,
+        )
+
+        assert report["test_rows"] == 18
+        assert [row["variant"] for row in report["variants"]] == list(DEFAULT_VARIANTS)
+        for row in report["variants"]:
+            assert row["accuracy"] > 0.9
+            assert np.asarray(row["confusion_matrix"]).sum() == 18
+            assert row["single_p95_ms"] >= row["single_p50_ms"] > 0
+            assert row["pickle_bytes"] > 0
+            assert row["rss_bytes"] is None
+
+        by_name = {row["variant"]: row for row in report["variants"]}
+        assert by_name["tfidf-unigram-lbfgs"]["features"] < by_name["tfidf-bigram-lbfgs"]["features"]
+        assert by_name["tfidf-bigram-lbfgs"]["artifact_bytes"] > 0
+        assert by_name["hashing-bigram-lbfgs"]["artifact_bytes"] is None
+
+        table = format_comparison(report["variants"]).splitlines()
+        assert len(table) == len(DEFAULT_VARIANTS) + 1
+        assert table[0].split()[0] == "variant"
+
+    def test_measures_resident_memory_in_a_fresh_process(self, tmp_path, evaluation_csv):
+        """Test that the serving footprint is measured where /proc is available."""
+        report = compare_variants(
+            evaluation_csv, ["tfidf-unigram-lbfgs"], batch_size=8, single_items=2, repeats=1, workers=0,
+            cache_directory=None,
+        )
+
+        rss_bytes = report["variants"][0]["rss_bytes"]
+        assert rss_bytes is None or rss_bytes >= 0
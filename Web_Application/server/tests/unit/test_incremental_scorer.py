@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from server.app.models.incremental_scorer import IncrementalDocument
+from server.app.models.linear_scorer import LinearScorer
+from server.app.models.preprocessing import TextPreprocessor
+
+TEXTS = [
+    "sad hopeless crying alone", "feel empty lonely tired", "nice weather weekend walk",
+    "shopping store lunch day", "panic worry nervous heart", "restless fear worry night",
+] * 3
+LABELS = [0, 0, 1, 1, 2, 2] * 3
+TYPED = "I feel SO hopeless and sad... the weather is nice, but worry & panic keep me up at night"
+
+
+@pytest.fixture
+def make_scorer(fit_pipeline):
+    """Factory for a LinearScorer over the typing corpus."""
+    return lambda **vectorizer_options: LinearScorer.from_pipeline(*fit_pipeline(TEXTS, LABELS, **vectorizer_options))
+
+
+@pytest.fixture
+def preprocess():
+    return TextPreprocessor(["i", "and", "the", "is", "but", "so", "me", "at"], lemma_table={"worries": "worry"})
+
+
+class TestIncrementalDocument:
+    """Unit tests for updating tf-idf features as text is appended."""
+
+    @pytest.mark.parametrize("options", [
+        {}, {"sublinear_tf": True}, {"binary": True}, {"norm": "l1"}, {"norm": None},
+    ])
+    def test_matches_full_rescoring_while_typing(self, preprocess, make_scorer, options):
+        """Test that every keystroke scores the same as scoring the whole text."""
+        scorer = make_scorer(**options)
+        document = IncrementalDocument(scorer, preprocess)
+
+        for end in range(1, len(TYPED) + 1):
+            document.update(TYPED[:end])
+            expected = scorer.predict_proba([preprocess(TYPED[:end])])[0]
+            np.testing.assert_allclose(document.predict_proba(), expected, atol=1e-10)
+
+        assert document.rebuilds == 0
+
+    def test_unfinished_word_is_not_committed(self, preprocess, make_scorer):
+        """Test that a word being typed is scored but dropped when it changes."""
+        scorer = make_scorer()
+        document = IncrementalDocument(scorer, preprocess)
+
+        document.update("feel pan")
+        assert document.tail == "pan"
+        document.update("feel panic")
+
+        np.testing.assert_allclose(document.predict_proba(), scorer.predict_proba(["feel panic"])[0], atol=1e-10)
+        assert document.token_count == 1
+        assert document.rebuilds == 0
+
+    def test_edit_rebuilds(self, preprocess, make_scorer):
+        """Test that deleting committed text rebuilds the features from scratch."""
+        scorer = make_scorer()
+        document = IncrementalDocument(scorer, preprocess)
+        document.update("sad hopeless crying ")
+
+        document.update("nice weather ")
+
+        np.testing.assert_allclose(document.predict_proba(), scorer.predict_proba(["nice weather"])[0], atol=1e-10)
+        assert document.rebuilds == 1
+
+    def test_empty_text_scores_intercept_only(self, preprocess, make_scorer):
+        """Test that no text (or no known n-grams) gives the intercept-only prediction."""
+        scorer = make_scorer()
+        document = IncrementalDocument(scorer, preprocess)
+
+        document.update("zzz qqq ")
+
+        np.testing.assert_allclose(document.predict_proba(), scorer.predict_proba([""])[0], atol=1e-12)
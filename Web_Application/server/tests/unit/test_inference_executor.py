@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import pytest
+
+from server.app.services.inference_executor import InferenceExecutor, InferenceQueueFull
+
+
+class TestInferenceExecutor:
+    """Unit tests for the inline and thread inference backends."""
+
+    def test_inline_backend_runs_on_event_loop_thread(self):
+        """Test that the inline backend calls the function directly."""
+        executor = InferenceExecutor(backend="inline", max_queue_depth=4)
+
+        async def run():
+            return await executor.run(lambda: threading.current_thread().name)
+
+        assert asyncio.run(run()) == threading.current_thread().name
+        assert executor.stats()["completed"] == 1
+
+    def test_thread_backend_runs_off_event_loop(self):
+        """Test that the thread backend keeps the loop thread free."""
+        executor = InferenceExecutor(backend="thread", workers=2, max_queue_depth=4)
+
+        async def run():
+            return await executor.run(lambda: threading.current_thread().name)
+
+        try:
+            assert asyncio.run(run()).startswith("inference")
+        finally:
+            executor.shutdown()
+
+    def test_queue_depth_is_bounded(self):
+        """Test that submissions beyond max_queue_depth are rejected."""
+        executor = InferenceExecutor(backend="thread", workers=1, max_queue_depth=2)
+        release = threading.Event()
+
+        async def run():
+            pending = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+            await asyncio.sleep(0)
+            with pytest.raises(InferenceQueueFull):
+                await executor.run(release.wait)
+            release.set()
+            await asyncio.gather(*pending)
+
+        try:
+            asyncio.run(run())
+        finally:
+            executor.shutdown()
+
+        stats = executor.stats()
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 2
+        assert stats["queue_depth"] == 0
+
+    def test_queue_time_is_recorded(self):
+        """Test that waiting behind a busy worker shows up as queue time."""
+        executor = InferenceExecutor(backend="thread", workers=1, max_queue_depth=4)
+
+        async def run():
+            await asyncio.gather(
+                executor.run(lambda: threading.Event().wait(0.05)),
+                executor.run(lambda: None),
+            )
+
+        try:
+            asyncio.run(run())
+        finally:
+            executor.shutdown()
+
+        queue_time = executor.stats()["queue_time_ms"]
+        assert queue_time["max"] >= 40
+        # Interpolated percentiles: the median of two samples is their mean
+        assert queue_time["p50"] == pytest.approx(queue_time["mean"])
+        assert queue_time["p50"] <= queue_time["p95"] <= queue_time["max"]
+
+    def test_stats_before_any_work(self):
+        """Test that latency stats are zero until something has run."""
+        stats = InferenceExecutor(backend="inline").stats()
+
+        assert stats["queue_time_ms"] == {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        assert stats["run_time_ms"] == {"mean": 0.0, "p95": 0.0}
+
+    def test_errors_are_counted_and_raised(self):
+        """Test that failures propagate and release their queue slot."""
+        executor = InferenceExecutor(backend="inline", max_queue_depth=1)
+
+        def fail():
+            raise RuntimeError("Model error")
+
+        async def run():
+            with pytest.raises(RuntimeError):
+                await executor.run(fail)
+
+        asyncio.run(run())
+
+        assert executor.stats()["failed"] == 1
+        assert executor.stats()["queue_depth"] == 0
+
+    def test_unknown_backend(self):
+        """Test that an unsupported backend name is rejected."""
+        with pytest.raises(ValueError):
+            InferenceExecutor(backend="gpu")
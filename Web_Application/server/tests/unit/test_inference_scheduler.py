@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+
+from server.app.services.inference_scheduler import InferenceScheduler
+
+
+class TestInferenceScheduler:
+    """Unit tests for the micro-batching inference scheduler."""
+
+    def make_predictor(self, calls):
+        """Build a fake batch predictor that records each batch it receives."""
+        def predict_batch(texts):
+            calls.append(list(texts))
+            return [(text.upper(), [1.0]) for text in texts]
+        return predict_batch
+
+    def test_concurrent_requests_share_a_batch(self):
+        """Test that requests arriving together are flushed as one batch."""
+        calls = []
+        scheduler = InferenceScheduler(self.make_predictor(calls), max_batch_size=8, max_wait_ms=50)
+
+        async def run():
+            results = await asyncio.gather(*(scheduler.submit(f"text {i}") for i in range(5)))
+            await scheduler.close()
+            return results
+
+        results = asyncio.run(run())
+
+        assert [sentiment for sentiment, _ in results] == [f"TEXT {i}" for i in range(5)]
+        assert calls == [[f"text {i}" for i in range(5)]]
+
+    def test_max_batch_size_splits_batches(self):
+        """Test that a full batch is flushed without waiting for the timer."""
+        calls = []
+        scheduler = InferenceScheduler(self.make_predictor(calls), max_batch_size=2, max_wait_ms=1000)
+
+        async def run():
+            results = await asyncio.wait_for(
+                asyncio.gather(*(scheduler.submit(str(i)) for i in range(4))), timeout=0.5
+            )
+            await scheduler.close()
+            return results
+
+        results = asyncio.run(run())
+
+        assert len(results) == 4
+        assert [len(batch) for batch in calls] == [2, 2]
+
+    def test_errors_propagate_to_every_caller(self):
+        """Test that a failing batch raises in each waiting request."""
+        def failing_batch(texts):
+            raise RuntimeError("Model error")
+
+        scheduler = InferenceScheduler(failing_batch, max_batch_size=4, max_wait_ms=10)
+
+        async def run():
+            results = await asyncio.gather(
+                scheduler.submit("a"), scheduler.submit("b"), return_exceptions=True
+            )
+            await scheduler.close()
+            return results
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    def test_invalid_batch_size(self):
+        """Test that a non-positive batch size is rejected."""
+        with pytest.raises(ValueError):
+            InferenceScheduler(lambda texts: [], max_batch_size=0)
+
+    def test_routes_are_batched_separately(self):
+        """Test that statements for different routes never share a batch."""
+        calls = []
+
+        def predict_batch(texts, route):
+            calls.append((route, list(texts)))
+            return [(f"{route}:{text}", [1.0]) for text in texts]
+
+        scheduler = InferenceScheduler(predict_batch, max_batch_size=8, max_wait_ms=50)
+
+        async def run():
+            results = await asyncio.gather(
+                scheduler.submit("a", "v1"), scheduler.submit("b", "v2"), scheduler.submit("c", "v1"),
+            )
+            await scheduler.close()
+            return results
+
+        results = asyncio.run(run())
+
+        assert [sentiment for sentiment, _ in results] == ["v1:a", "v2:b", "v1:c"]
+        assert sorted(calls) == [("v1", ["a", "c"]), ("v2", ["b"])]
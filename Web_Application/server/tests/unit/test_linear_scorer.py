@@ -0,0 +1,70 @@
+import random
+import numpy as np
+import pytest
+
+from server.app.models.linear_scorer import LinearScorer, export_linear_model
+
+CLASS_WORDS = [
+    "anxious nervous panic worry edge presentation heart racing",
+    "depressed sad hopeless crying empty tired lonely",
+    "weather store work day weekend shopping meeting nice",
+    "stress deadline pressure overwhelmed busy exam",
+]
+
+
+def make_corpus(n_classes, per_class=40, seed=0):
+    """Synthetic statements whose vocabulary depends on the class."""
+    rng = random.Random(seed)
+    texts, labels = [], []
+    for label, words in enumerate(CLASS_WORDS[:n_classes]):
+        words = words.split()
+        for _ in range(per_class):
+            texts.append(" ".join(rng.choice(words) for _ in range(rng.randint(1, 12))))
+            labels.append(label)
+    return texts, labels
+
+
+PARITY_CORPUS = [
+    "",
+    "unseen words only",
+    "sad sad sad hopeless",
+    "panic attack before the presentation, heart racing!!",
+    "Weekend SHOPPING with a nice day at work",
+    "deadline deadline deadline exam exam stress",
+    "a",
+    "crying " * 200,
+]
+
+
+class TestLinearScorerParity:
+    """Parity tests between LinearScorer and the sklearn pipeline."""
+
+    @pytest.mark.parametrize("vectorizer_kwargs,model_kwargs,n_classes", [
+        ({"ngram_range": (1, 2)}, {"solver": "lbfgs"}, 4),
+        ({"ngram_range": (1, 2)}, {"solver": "liblinear"}, 2),
+        ({"ngram_range": (1, 1), "sublinear_tf": True}, {"solver": "lbfgs"}, 4),
+        ({"ngram_range": (2, 3), "norm": "l1"}, {"solver": "lbfgs"}, 4),
+        ({"ngram_range": (1, 2), "stop_words": ["the", "a", "at"]}, {"solver": "lbfgs"}, 3),
+        ({"ngram_range": (1, 2), "binary": True}, {"solver": "lbfgs"}, 2),
+    ])
+    def test_probabilities_match_sklearn(self, fit_pipeline, vectorizer_kwargs, model_kwargs, n_classes):
+        """Test that probabilities match model.predict_proba within tolerance."""
+        texts, labels = make_corpus(n_classes)
+        vectorizer, model = fit_pipeline(texts, labels, model_kwargs, **vectorizer_kwargs)
+
+        scorer = LinearScorer.from_pipeline(vectorizer, model)
+        corpus = PARITY_CORPUS + texts[::7]
+
+        expected = model.predict_proba(vectorizer.transform(corpus))
+        actual = scorer.predict_proba(corpus)
+
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-12)
+        assert scorer.predict(corpus).tolist() == model.predict(vectorizer.transform(corpus)).tolist()
+
+    def test_unsupported_analyzer(self, fit_pipeline):
+        """Test that character analyzers are rejected at export time."""
+        texts, labels = make_corpus(2)
+        vectorizer, model = fit_pipeline(texts, labels, analyzer="char", ngram_range=(1, 1))
+
+        with pytest.raises(ValueError):
+            export_linear_model(vectorizer, model)
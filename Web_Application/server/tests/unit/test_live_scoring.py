@@ -0,0 +1,116 @@
+import asyncio
+import numpy as np
+import pytest
+
+from server.app.models.linear_scorer import LinearScorer
+from server.app.services.live_scoring import LiveScoringSession, parse_message
+
+TEXTS = ["sad hopeless crying", "feel empty lonely", "nice weather weekend", "shopping store day"] * 3
+LABELS = [0, 0, 1, 1] * 3
+
+
+class FakeModel:
+    """Stand-in for a registry LoadedModel."""
+
+    def __init__(self, version, vectorizer, model):
+        self.version = version
+        self.linear_scorer = LinearScorer.from_pipeline(vectorizer, model)
+        self.labels = ["Depression", "Normal"]
+
+
+@pytest.fixture
+def fake_model(fit_pipeline):
+    """A fake loaded model over the two-class corpus."""
+    return FakeModel("v1", *fit_pipeline(TEXTS, LABELS))
+
+
+def run_session(model, frames, **timing):
+    """Feed ``(delay, frame)`` pairs to a session and return the updates it sent."""
+    async def run():
+        sent = []
+
+        async def send(update):
+            sent.append((asyncio.get_running_loop().time(), update))
+
+        session = LiveScoringSession(send, lambda: model, str.lower, **timing)
+        task = asyncio.ensure_future(session.run())
+        started_at = asyncio.get_running_loop().time()
+        for delay, frame in frames:
+            await asyncio.sleep(delay)
+            session.receive(frame)
+        await asyncio.sleep(timing.get("debounce", 0) + timing.get("min_interval", 0) + 0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return session, [(at - started_at, update) for at, update in sent]
+
+    return asyncio.run(run())
+
+
+class TestLiveScoringSession:
+    """Unit tests for debounced, throttled as-you-type scoring."""
+
+    def test_parse_message(self):
+        """Test full-text, append and plain frames."""
+        assert parse_message('{"text": "hello"}', "old") == "hello"
+        assert parse_message('{"append": " there"}', "hi") == "hi there"
+        assert parse_message("plain words", "old") == "plain words"
+        with pytest.raises(ValueError):
+            parse_message('{"other": 1}', "old")
+
+    def test_burst_is_debounced_into_one_update(self, fake_model):
+        """Test that a fast burst of keystrokes produces a single update for the final text."""
+        frames = [(0.005, text) for text in ("s", "sa", "sad", "sad ", "sad hope", "sad hopeless")]
+
+        session, sent = run_session(fake_model, frames, debounce=0.05, max_wait=1.0, min_interval=0.0)
+
+        assert len(sent) == 1
+        assert sent[0][1]["sentiment"] == "Depression"
+        assert sent[0][1]["length"] == len("sad hopeless")
+        assert session.received == 6
+
+    def test_continuous_typing_still_gets_updates(self, fake_model):
+        """Test that max_wait forces updates while the user never pauses, at most one per min_interval."""
+        frames = [(0.01, '{"append": "a"}')] * 30
+
+        _, sent = run_session(fake_model, frames, debounce=0.05, max_wait=0.08, min_interval=0.06)
+
+        times = [at for at, _ in sent]
+        assert len(sent) >= 3
+        assert all(later - earlier >= 0.06 - 0.005 for earlier, later in zip(times, times[1:]))
+        assert sent[-1][1]["length"] == 30
+
+    def test_scores_match_full_text_and_length_is_capped(self, fake_model):
+        """Test that updates equal scoring the whole (capped) text."""
+        session, sent = run_session(fake_model, [(0, "nice weather weekend and more")], debounce=0.01, max_chars=20)
+
+        scorer = fake_model.linear_scorer
+        expected = scorer.predict_proba(["nice weather weekend"])[0]
+        np.testing.assert_allclose(sent[-1][1]["confidence"], expected, atol=1e-10)
+        assert sent[-1][1]["truncated"] is True
+
+
+class TestLiveSentimentSocket:
+    """The live scoring socket as mounted on the application."""
+
+    def test_not_shadowed_by_chat_rooms(self, monkeypatch):
+        """Test that /ws/sentiment reaches the live scorer rather than the /ws/{room_id} chat relay."""
+        from fastapi.testclient import TestClient
+        from starlette.routing import Match
+        from server.app.api.sentiment import model_registry
+        from server.app.utils import database
+
+        monkeypatch.setenv("JWT_SECRET", "test-secret")
+        monkeypatch.setattr(database, "DATABASE_BACKEND", "memory")
+        from server.main import app
+
+        scope = {"type": "websocket", "path": "/ws/sentiment", "root_path": "", "path_params": {}}
+        first_match = next(route for route in app.routes if route.matches(scope)[0] == Match.FULL)
+        assert first_match.url_path_for("live_sentiment_endpoint") == "/ws/sentiment"
+        with TestClient(app) as client:
+            with client.websocket_connect("/ws/sentiment") as websocket:
+                websocket.send_text('{"text": "I feel hopeless and sad"}')
+                update = websocket.receive_json()
+
+        assert update["model_version"] == model_registry.active.version
+        assert update["sentiment"] in model_registry.active.labels
+        assert update["length"] == len("I feel hopeless and sad")
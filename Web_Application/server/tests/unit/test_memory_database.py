@@ -0,0 +1,101 @@
+import asyncio
+import datetime
+
+import pytest
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from server.app.api.professionals import PROJECTIONS
+from server.app.utils.database import upsert_many
+from server.app.utils.memory_database import AsyncMemoryDatabase, MemoryDatabase
+
+
+@pytest.fixture
+def collection():
+    """A collection with a few professionals."""
+    collection = MemoryDatabase("test")["professionals"]
+    collection.insert_many([
+        {"name": "Ana", "specialty": "Psychiatry", "languages": ["English", "Sinhala"], "license": "a.pdf"},
+        {"name": "Ben", "specialty": "Psychology", "languages": ["English"], "license": "b.pdf"},
+        {"name": "Cara", "specialty": "Psychiatry", "languages": ["Tamil"], "license": "c.pdf"},
+    ])
+    return collection
+
+
+class TestMemoryDatabase:
+    """Unit tests for the in-process MongoDB stand-in, limited to the calls the app makes."""
+
+    def test_professional_listing_queries(self, collection):
+        """Test the listing's equality, array, case-insensitive regex and keyset filters with a card projection."""
+        ids = [d["_id"] for d in collection.find({}).sort("_id", 1)]
+        by_name = {"name": {"$regex": "^c", "$options": "i"}}
+
+        assert ids == sorted(ids)
+        assert [d["name"] for d in collection.find({"specialty": "Psychiatry"})] == ["Ana", "Cara"]
+        assert [d["name"] for d in collection.find({"languages": "English"})] == ["Ana", "Ben"]
+        assert [d["name"] for d in collection.find(by_name)] == ["Cara"]
+        page = list(collection.find({"_id": {"$gt": ids[0]}}, PROJECTIONS["card"]).sort("_id", 1).limit(1))
+        assert page == [{"_id": ids[1], "name": "Ben", "specialty": "Psychology", "languages": ["English"]}]
+
+    def test_unique_indexes(self):
+        """Test that unique indexes reject duplicates on insert, update and index creation."""
+        users = MemoryDatabase("test")["users"]
+        users.create_index([("email", 1)], name="email_1", unique=True)
+        users.insert_one({"email": "a@example.com"})
+        users.insert_one({"email": "b@example.com"})
+
+        with pytest.raises(DuplicateKeyError):
+            users.insert_one({"email": "a@example.com"})
+        with pytest.raises(DuplicateKeyError):
+            users.update_one({"email": "b@example.com"}, {"$set": {"email": "a@example.com"}})
+        with pytest.raises(BulkWriteError) as error:
+            users.insert_many([{"email": "a@example.com"}, {"email": "c@example.com"}], ordered=False)
+        assert error.value.details["writeErrors"][0]["code"] == 11000
+        assert len(list(users.find({}))) == 3
+        assert users.index_information()["email_1"] == {"key": [("email", 1)], "unique": True}
+
+    def test_rollup_upserts_and_range_reads(self):
+        """Test $inc and $set upserts through upsert_many, and the timeline's range query."""
+        rollups = MemoryDatabase("test")["rollups"]
+        monday = datetime.datetime(2024, 6, 3)
+        update = ({"user": "a", "period": "day", "start": monday}, {"$inc": {"count": 1, "labels.Stress.count": 2}})
+
+        upsert_many(rollups, [update])
+        upsert_many(rollups, [update])
+        rollups.update_one(
+            {"user": "a", "period": "week", "start": monday}, {"$set": {"count": 5, "labels": {}}}, upsert=True
+        )
+
+        in_range = {"user": "a", "start": {"$gte": monday, "$lt": monday + datetime.timedelta(days=1)}}
+        assert list(rollups.find(in_range, {"_id": 0}).sort("period", 1)) == [
+            {"user": "a", "period": "day", "start": monday, "count": 2, "labels": {"Stress": {"count": 4}}},
+            {"user": "a", "period": "week", "start": monday, "count": 5, "labels": {}},
+        ]
+
+    def test_async_view_shares_data(self):
+        """Test that the Motor-style view awaits the same collections and iterates cursors."""
+        database = MemoryDatabase("test")
+        async_database = AsyncMemoryDatabase(database)
+
+        async def run():
+            users = async_database["users"]
+            result = await users.insert_one({"email": "a@example.com", "password": "old"})
+            await users.update_one({"_id": result.inserted_id}, {"$set": {"password": "new"}})
+            found = await users.find_one({"email": "a@example.com"})
+            streamed = [d async for d in users.find({})]
+            return found, streamed, await async_database.command("ping")
+
+        found, streamed, ping = asyncio.run(run())
+
+        assert found["password"] == "new"
+        assert database["users"].find_one({"email": "a@example.com"}) == found == streamed[0]
+        assert ping == {"ok": 1.0}
+
+    @pytest.mark.parametrize("call", [
+        lambda collection: list(collection.find({"name": {"$ne": "Ana"}})),
+        lambda collection: list(collection.find({}, {"license": 0})),
+        lambda collection: collection.update_one({"name": "Ana"}, {"$unset": {"license": ""}}),
+    ])
+    def test_unsupported_calls_fail_loudly(self, collection, call):
+        """Test that queries, projections and updates the app does not make raise instead of misbehaving."""
+        with pytest.raises(NotImplementedError):
+            call(collection)
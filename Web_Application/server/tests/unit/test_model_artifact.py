@@ -0,0 +1,94 @@
+import os
+import hashlib
+import numpy as np
+import pytest
+
+from server.app.models.linear_scorer import LinearScorer, export_linear_model
+from server.app.models.model_artifact import (
+    HashedVocabulary,
+    load_model_artifact,
+    read_manifest,
+    term_hash,
+    write_model_artifact,
+)
+
+QUERIES = ["", "sad crying weekend", "heart racing panic panic", "unknown words here", "nice day"]
+
+
+class TestModelArtifact:
+    """Unit tests for the memory-mapped model artifact format."""
+
+    def test_round_trip_matches_pipeline(self, tmp_path, pipeline):
+        """Test that a loaded artifact scores exactly like the sklearn pipeline."""
+        vectorizer, model = pipeline
+        directory = str(tmp_path / "model_artifact")
+        write_model_artifact(export_linear_model(vectorizer, model), directory, model_version="abc123")
+
+        scorer = load_model_artifact(directory)
+
+        np.testing.assert_allclose(
+            scorer.predict_proba(QUERIES),
+            model.predict_proba(vectorizer.transform(QUERIES)),
+            rtol=1e-9, atol=1e-12,
+        )
+        assert scorer.model_version == "abc123"
+        assert isinstance(scorer.coef_by_feature, np.memmap)
+        assert len(scorer.vocabulary) == len(vectorizer.vocabulary_)
+
+    def test_manifest_describes_artifact(self, tmp_path, pipeline):
+        """Test that the manifest records the format and model metadata."""
+        vectorizer, model = pipeline
+        directory = str(tmp_path / "model_artifact")
+        write_model_artifact(export_linear_model(vectorizer, model), directory, model_version="abc123")
+
+        manifest = read_manifest(directory)
+        assert manifest["format_version"] == 1
+        assert manifest["n_features"] == len(vectorizer.vocabulary_)
+        assert manifest["n_classes"] == 3
+        assert manifest["settings"]["ngram_range"] == [1, 2]
+
+    def test_rewrite_replaces_previous_artifact(self, tmp_path, pipeline):
+        """Test that writing over an existing artifact swaps it completely."""
+        vectorizer, model = pipeline
+        directory = str(tmp_path / "model_artifact")
+        arrays = export_linear_model(vectorizer, model)
+        write_model_artifact(arrays, directory, model_version="v1")
+        write_model_artifact(arrays, directory, model_version="v2")
+
+        assert read_manifest(directory)["model_version"] == "v2"
+        assert sorted(os.listdir(tmp_path)) == ["model_artifact"]
+
+    def test_unsupported_format_version(self, tmp_path, pipeline):
+        """Test that artifacts from an unknown format version are rejected."""
+        vectorizer, model = pipeline
+        directory = str(tmp_path / "model_artifact")
+        write_model_artifact(export_linear_model(vectorizer, model), directory)
+        with open(os.path.join(directory, "manifest.json"), "w") as f:
+            f.write('{"format_version": 99}')
+
+        with pytest.raises(ValueError):
+            load_model_artifact(directory)
+
+
+class TestHashedVocabulary:
+    """Unit tests for hash-based vocabulary lookups."""
+
+    def test_hash_collisions_are_resolved_exactly(self):
+        """Test that terms sharing a hash are told apart by their bytes."""
+        shared = term_hash("alpha")
+        # "gamma" is stored under alpha's hash to simulate a collision
+        vocabulary = HashedVocabulary(
+            hashes=np.array([shared, shared], dtype=np.uint64),
+            columns=np.array([7, 3], dtype=np.int32),
+            offsets=np.array([0, 5, 10], dtype=np.uint64),
+            terms_blob=b"gammaalpha",
+        )
+
+        assert vocabulary.lookup(["alpha", "alpha"]).tolist() == [3, 3]
+        assert vocabulary.lookup(["gamma"]).tolist() == []
+        assert "alpha" in vocabulary
+
+    def test_terms_hash_stably(self):
+        """Test that term hashes do not depend on the process hash seed."""
+        expected = int.from_bytes(hashlib.blake2b(b"feel sad", digest_size=8).digest(), "little")
+        assert term_hash("feel sad") == expected
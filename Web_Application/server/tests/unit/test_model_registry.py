@@ -0,0 +1,146 @@
+import os
+import json
+import asyncio
+import pytest
+
+from server.app.models import sentiment_model
+from server.app.services.inference_executor import InferenceExecutor
+from server.app.services.model_registry import DEPLOYMENT_FILE, ModelRegistry, load_model, predict_with_model
+
+TEXTS = ["sad hopeless crying", "feel empty lonely", "nice weather weekend", "shopping store day"] * 5
+STATUSES = ["Depression", "Depression", "Normal", "Normal"] * 5
+
+
+@pytest.fixture
+def registry_directory(tmp_path, write_model):
+    """A registry directory holding two model versions that disagree."""
+    write_model(str(tmp_path / "v1"), TEXTS, STATUSES)
+    write_model(str(tmp_path / "v2"), TEXTS, STATUSES, flip=True)
+    return str(tmp_path)
+
+
+def make_registry(directory):
+    return ModelRegistry(InferenceExecutor(backend="inline"), directory=directory, poll_seconds=0.01)
+
+
+class TestModelRegistry:
+    """Unit tests for loading, switching and splitting model versions."""
+
+    def test_starts_on_the_import_time_model(self, registry_directory):
+        """Test that the registry serves sentiment_model's version until told otherwise."""
+        registry = make_registry(registry_directory)
+
+        assert registry.route("sad").serve.version == sentiment_model.model_version
+        assert registry.generation == sentiment_model.model_version
+
+    def test_deploy_switches_active_version(self, registry_directory):
+        """Test that a deployed version answers new requests while the old one stays usable."""
+        registry = make_registry(registry_directory)
+        previous = registry.route("sad hopeless").serve
+
+        asyncio.run(registry.deploy(active="v1"))
+        current = registry.route("sad hopeless").serve
+
+        assert current.version != previous.version
+        assert registry.generation == current.version
+        assert registry.stats()["swaps"] == 1
+        assert predict_with_model(["sad hopeless"], current)[0][0] == "Depression"
+        # A request routed before the swap can still be scored by its version
+        assert len(predict_with_model(["sad hopeless"], previous)) == 1
+
+    def test_canary_split_is_stable_per_statement(self, registry_directory):
+        """Test that roughly ``percent`` of statements go to the candidate, always the same ones."""
+        registry = make_registry(registry_directory)
+        asyncio.run(registry.deploy(active="v1", candidate="v2", mode="canary", percent=25))
+        candidate = registry.candidate.version
+
+        keys = [f"statement {i}" for i in range(2000)]
+        routed = [registry.route(key).serve.version == candidate for key in keys]
+
+        assert 0.2 < sum(routed) / len(keys) < 0.3
+        assert routed == [registry.route(key).serve.version == candidate for key in keys]
+        assert all(registry.route(key).shadow is None for key in keys)
+
+    def test_shadow_mode_compares_without_serving(self, registry_directory):
+        """Test that shadow traffic is answered by the active version and compared in the background."""
+        registry = make_registry(registry_directory)
+
+        async def score(text, source):
+            return predict_with_model([text], source)[0]
+
+        async def run():
+            await registry.deploy(active="v1", candidate="v2", mode="shadow", percent=100)
+            route = registry.route("sad hopeless crying")
+            served = await score("sad hopeless crying", route.serve)
+            registry.compare_in_background(score, "sad hopeless crying", served, route.shadow)
+            while registry.stats()["shadow"]["in_flight"]:
+                await asyncio.sleep(0.01)
+            await registry.close()
+            return route
+
+        route = asyncio.run(run())
+
+        assert route.serve.version == registry.active.version
+        assert route.shadow.version == registry.candidate.version
+        shadow = registry.stats()["shadow"]
+        assert shadow["compared"] == 1
+        assert shadow["agreement"] == 0.0
+
+    def test_reconcile_applies_deployment_file(self, registry_directory):
+        """Test that the watcher picks up deployment.json changes."""
+        registry = make_registry(registry_directory)
+        with open(os.path.join(registry_directory, DEPLOYMENT_FILE), "w") as f:
+            json.dump({"active": "v2", "candidate": "v1", "mode": "canary", "percent": 10}, f)
+
+        async def run():
+            registry.start()
+            for _ in range(100):
+                if registry.candidate is not None:
+                    break
+                await asyncio.sleep(0.01)
+            await registry.close()
+
+        asyncio.run(run())
+
+        stats = registry.stats()
+        assert stats["mode"] == "canary"
+        assert stats["percent"] == 10
+        assert stats["candidate"] == registry.candidate.version
+        assert stats["last_error"] is None
+
+    def test_failed_deployment_keeps_current_version(self, registry_directory):
+        """Test that a broken deployment is reported and traffic stays where it was."""
+        registry = make_registry(registry_directory)
+        active = registry.active.version
+        with open(os.path.join(registry_directory, DEPLOYMENT_FILE), "w") as f:
+            json.dump({"active": "missing"}, f)
+
+        asyncio.run(registry.reconcile())
+
+        assert registry.active.version == active
+        assert registry.stats()["last_error"] is not None
+
+    def test_invalid_split(self, registry_directory):
+        """Test that unknown modes and out-of-range percentages are rejected."""
+        registry = make_registry(registry_directory)
+        with pytest.raises(ValueError):
+            asyncio.run(registry.deploy(candidate="v1", mode="blue-green"))
+        with pytest.raises(ValueError):
+            asyncio.run(registry.deploy(candidate="v1", percent=150))
+
+
+class TestLoadedModel:
+    """Unit tests for what a loaded version exposes."""
+
+    def test_vocabulary_and_labels_do_not_build_a_scorer(self, registry_directory):
+        """Test that a pickle-only version answers vocabulary and label lookups from its fitted components."""
+        loaded = load_model(os.path.join(registry_directory, "v1"))
+
+        assert loaded.components["linear_scorer"] is None
+        assert "hopeless" in loaded.vocabulary and "unseen" not in loaded.vocabulary
+        assert loaded.labels == ["Depression", "Normal"]
+        assert loaded._linear_scorer is None
+
+        # Once a scorer exists its vocabulary answers the same lookups
+        loaded.linear_scorer
+        assert "hopeless" in loaded.vocabulary and "unseen" not in loaded.vocabulary
@@ -0,0 +1,221 @@
+import asyncio
+import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from server.app.api import sentiment as sentiment_api
+from server.app.services.mood_timeline import (
+    PREDICTIONS_COLLECTION,
+    ROLLUPS_COLLECTION,
+    MoodTimelineStore,
+    period_start,
+    rollup_updates,
+)
+
+MONDAY = datetime.datetime(2024, 6, 3)
+
+
+@pytest.fixture
+def database():
+    """A stand-in database whose collections record the calls made on them."""
+    collections = {PREDICTIONS_COLLECTION: MagicMock(), ROLLUPS_COLLECTION: MagicMock()}
+    database = MagicMock()
+    database.__getitem__.side_effect = collections.__getitem__
+    return database
+
+
+def prediction(user, sentiment, confidence, created_at, confidence_scores=None):
+    return {
+        "user": user, "sentiment": sentiment, "confidence": confidence, "created_at": created_at,
+        "confidence_scores": confidence_scores or {},
+    }
+
+
+class TestRollups:
+    """Unit tests for the daily and weekly rollup increments."""
+
+    def test_period_start(self):
+        """Test day and Monday-based week buckets, with aware times converted to UTC."""
+        wednesday = datetime.datetime(2024, 6, 5, 23, 30)
+        aware = datetime.datetime(2024, 6, 6, 1, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=2)))
+
+        assert period_start(wednesday, "day") == datetime.datetime(2024, 6, 5)
+        assert period_start(wednesday, "week") == MONDAY
+        assert period_start(aware, "day") == datetime.datetime(2024, 6, 5)
+        with pytest.raises(ValueError):
+            period_start(wednesday, "month")
+
+    def test_one_upsert_per_user_and_bucket(self):
+        """Test that a batch collapses into one $inc upsert per (user, period, bucket)."""
+        updates = rollup_updates([
+            prediction("a", "Stress", 0.5, MONDAY + datetime.timedelta(hours=9)),
+            prediction("a", "Stress", 0.7, MONDAY + datetime.timedelta(hours=20)),
+            prediction("a", "Normal", 0.9, MONDAY + datetime.timedelta(days=1)),
+            prediction("b", "Normal", 0.6, MONDAY),
+        ])
+
+        assert len(updates) == 5
+        assert (
+            {"user": "a", "period": "week", "start": MONDAY},
+            {"$inc": {
+                "count": 3,
+                "labels.Stress.count": 2, "labels.Stress.confidence_sum": pytest.approx(1.2),
+                "labels.Normal.count": 1, "labels.Normal.confidence_sum": 0.9,
+            }},
+        ) in updates
+        assert (
+            {"user": "a", "period": "day", "start": MONDAY},
+            {"$inc": {"count": 2, "labels.Stress.count": 2, "labels.Stress.confidence_sum": pytest.approx(1.2)}},
+        ) in updates
+
+
+    def test_every_class_confidence_is_summed(self):
+        """Test that each class's probability is summed, not only the predicted label's."""
+        updates = rollup_updates([
+            prediction("a", "Stress", 0.6, MONDAY, {"Stress": 0.6, "Normal": 0.3, "Anxiety.Panic": 0.1}),
+            prediction("a", "Normal", 0.8, MONDAY, {"Stress": 0.1, "Normal": 0.8, "Anxiety.Panic": 0.1}),
+        ])
+
+        day = next(update["$inc"] for filter, update in updates if filter["period"] == "day")
+        assert day["confidence_sum.Stress"] == pytest.approx(0.7)
+        assert day["confidence_sum.Normal"] == pytest.approx(1.1)
+        assert day["confidence_sum.Anxiety_Panic"] == pytest.approx(0.2)
+
+
+class TestMoodTimelineStore:
+    """Unit tests for batched prediction writes and timeline reads."""
+
+    def test_batch_size_triggers_one_write(self, database):
+        """Test that a full batch is written with one insert_many and one bulk_write."""
+        async def run():
+            store = MoodTimelineStore(lambda: database, batch_size=3, flush_seconds=60)
+            for confidence in (0.5, 0.6, 0.7):
+                store.record(
+                    "a@example.com", "Anxiety", {"Anxiety": confidence, "Normal": 1 - confidence}, "v1", MONDAY
+                )
+            await asyncio.sleep(0.05)
+            stats = store.stats()
+            await store.close()
+            return stats
+
+        stats = asyncio.run(run())
+
+        predictions = database[PREDICTIONS_COLLECTION]
+        rollups = database[ROLLUPS_COLLECTION]
+        assert predictions.insert_many.call_count == 1
+        assert len(predictions.insert_many.call_args.args[0]) == 3
+        assert rollups.bulk_write.call_count == 1
+        assert len(rollups.bulk_write.call_args.args[0]) == 2
+        assert rollups.bulk_write.call_args.kwargs == {"ordered": False}
+        assert stats["written"] == 3 and stats["flushes"] == 1
+
+    def test_close_flushes_partial_batch(self, database):
+        """Test that buffered predictions are written on shutdown."""
+        async def run():
+            store = MoodTimelineStore(lambda: database, batch_size=100, flush_seconds=60)
+            store.record("a@example.com", "Normal", {"Normal": 0.9}, "v1")
+            await store.close()
+            return store.stats()
+
+        stats = asyncio.run(run())
+
+        assert stats["written"] == 1
+        assert database[PREDICTIONS_COLLECTION].insert_many.call_count == 1
+
+    def test_full_buffer_drops_and_failures_are_counted(self, database):
+        """Test that the buffer is bounded and failed writes are counted, not raised."""
+        database[PREDICTIONS_COLLECTION].insert_many.side_effect = RuntimeError("down")
+
+        async def run():
+            store = MoodTimelineStore(lambda: database, batch_size=100, flush_seconds=60, max_buffer=2)
+            for _ in range(3):
+                store.record("a@example.com", "Normal", {"Normal": 0.9}, "v1")
+            await store.close()
+            return store.stats()
+
+        stats = asyncio.run(run())
+
+        assert stats["dropped"] == 1
+        assert stats["failed"] == 2
+        assert stats["written"] == 0
+
+    def test_timeline_reads_rollups(self, database):
+        """Test that the timeline queries one bucket per period and derives mean confidence."""
+        cursor = database[ROLLUPS_COLLECTION].find.return_value
+        cursor.sort.return_value = [
+            {
+                "start": MONDAY, "count": 3, "labels": {"Stress": {"count": 2, "confidence_sum": 1.2}},
+                "confidence_sum": {"Stress": 1.5, "Normal": 1.5},
+            },
+        ]
+        store = MoodTimelineStore(lambda: database)
+
+        buckets = store.timeline("a@example.com", "week", since=MONDAY + datetime.timedelta(days=2))
+
+        query = database[ROLLUPS_COLLECTION].find.call_args.args[0]
+        assert query == {"user": "a@example.com", "period": "week", "start": {"$gte": MONDAY}}
+        assert buckets == [{
+            "start": MONDAY,
+            "count": 3,
+            "labels": {"Stress": {"count": 2, "mean_confidence": pytest.approx(0.6)}},
+            "mean_confidence": {"Stress": pytest.approx(0.5), "Normal": pytest.approx(0.5)},
+        }]
+
+    def test_predict_records_authenticated_results_only(self, monkeypatch):
+        """Test that /predict/ stores results for signed-in users and not for anonymous ones."""
+        store = MagicMock()
+        monkeypatch.setattr(sentiment_api, "mood_timeline", store)
+        request = sentiment_api.StatementRequest(statement="I feel anxious about tomorrow")
+
+        anonymous = asyncio.run(sentiment_api.predict_sentiment_endpoint(request, None))
+        signed_in = asyncio.run(sentiment_api.predict_sentiment_endpoint(request, "a@example.com"))
+
+        assert anonymous["sentiment"] == signed_in["sentiment"]
+        store.record.assert_called_once()
+        user, sentiment, confidence_scores, model_version = store.record.call_args.args
+        assert (user, sentiment, model_version) == ("a@example.com", signed_in["sentiment"], signed_in["model_version"])
+        assert list(confidence_scores.values()) == signed_in["confidence"]
+        assert max(confidence_scores, key=confidence_scores.get) == signed_in["sentiment"]
+
+    def test_failed_rollup_is_recomputed_from_predictions(self):
+        """Test that buckets whose $inc failed are rebuilt from the stored predictions, not double counted."""
+        from server.app.utils.memory_database import MemoryDatabase
+
+        db = MemoryDatabase("test")
+        rollups = db[ROLLUPS_COLLECTION]
+        upsert_many = rollups.upsert_many
+        calls = []
+
+        def flaky_upsert_many(updates):
+            calls.append(len(updates))
+            if len(calls) == 1:
+                raise RuntimeError("rollups unavailable")
+            return upsert_many(updates)
+
+        rollups.upsert_many = flaky_upsert_many
+
+        async def run():
+            store = MoodTimelineStore(lambda: db, batch_size=2, flush_seconds=60)
+            for hours, sentiment in ((1, "Stress"), (2, "Normal"), (3, "Stress"), (30, "Normal")):
+                created_at = MONDAY + datetime.timedelta(hours=hours)
+                store.record("a@example.com", sentiment, {sentiment: 0.8}, "v1", created_at)
+                await store.flush()
+            stats = store.stats()
+            await store.close()
+            return store, stats
+
+        store, stats = asyncio.run(run())
+
+        assert stats["rollup_failures"] == 1
+        assert stats["stale_rollups"] == 0
+        # The failed batch touched Monday and its week; both were recomputed
+        assert stats["rollups_recomputed"] == 2
+        days = store.timeline("a@example.com", "day")
+        assert [(bucket["start"], bucket["count"]) for bucket in days] == [
+            (MONDAY, 3), (MONDAY + datetime.timedelta(days=1), 1),
+        ]
+        assert days[0]["labels"]["Stress"] == {"count": 2, "mean_confidence": pytest.approx(0.8)}
+        (week,) = store.timeline("a@example.com", "week")
+        assert week["count"] == 4
+        assert week["mean_confidence"] == {"Stress": pytest.approx(0.4), "Normal": pytest.approx(0.4)}
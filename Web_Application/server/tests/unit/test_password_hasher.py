@@ -0,0 +1,87 @@
+import asyncio
+import threading
+
+import pytest
+
+from server.app.services import password_hasher as password_hasher_module
+from server.app.services.password_hasher import PasswordHasher, PasswordHashingBusy, password_context
+
+
+class TestPasswordHasher:
+    """Unit tests for the bounded bcrypt executor."""
+
+    def test_hash_and_verify(self):
+        """Test that hashes use the configured cost and verify against the right password only."""
+        hasher = PasswordHasher(rounds=4, workers=2)
+
+        async def run():
+            hashed = await hasher.hash("correct horse")
+            return hashed, await hasher.verify_and_update("correct horse", hashed), \
+                await hasher.verify_and_update("wrong", hashed)
+
+        hashed, valid, invalid = asyncio.run(run())
+        hasher.shutdown()
+
+        assert hashed.startswith("$2b$04$")
+        assert valid == (True, None)
+        assert invalid == (False, None)
+        stats = hasher.stats()
+        assert stats["operations"]["hash"]["completed"] == 1
+        assert stats["operations"]["verify"]["completed"] == 2
+        assert stats["operations"]["verify"]["run_time_ms"]["mean"] > 0
+
+    def test_outdated_cost_is_rehashed_on_verify(self):
+        """Test that a hash with another cost factor comes back with a replacement."""
+        old_hash = password_context(4).hash("correct horse")
+        hasher = PasswordHasher(rounds=5, workers=1)
+
+        valid, new_hash = asyncio.run(hasher.verify_and_update("correct horse", old_hash))
+        hasher.shutdown()
+
+        assert valid
+        assert new_hash.startswith("$2b$05$")
+        assert password_context(5).verify("correct horse", new_hash)
+        assert hasher.stats()["rehashed"] == 1
+
+    def test_full_queue_fails_fast(self, monkeypatch):
+        """Test that calls beyond max_queue are rejected at once instead of waiting."""
+        release = threading.Event()
+
+        def slow_hash(rounds, password):
+            release.wait(5)
+            return 0.0, 0.0, "hashed"
+
+        monkeypatch.setattr(password_hasher_module, "_hash", slow_hash)
+        hasher = PasswordHasher(rounds=4, workers=1, max_queue=2)
+
+        async def run():
+            pending = [asyncio.ensure_future(hasher.hash("pw")) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            with pytest.raises(PasswordHashingBusy):
+                await hasher.hash("pw")
+            depth = hasher.stats()["queue_depth"]
+            release.set()
+            return depth, await asyncio.gather(*pending)
+
+        depth, results = asyncio.run(run())
+        hasher.shutdown()
+
+        assert depth == 2
+        assert results == ["hashed", "hashed"]
+        assert hasher.stats()["rejected"] == 1
+        assert hasher.stats()["queue_depth"] == 0
+
+    def test_process_backend(self):
+        """Test that the process pool hashes with the same context settings."""
+        hasher = PasswordHasher(rounds=4, backend="process", workers=1)
+        hasher.warm_up()
+
+        hashed = asyncio.run(hasher.hash("pw"))
+        hasher.shutdown()
+
+        assert password_context(4).verify("pw", hashed)
+
+    def test_unknown_backend(self):
+        """Test that an unsupported backend is rejected up front."""
+        with pytest.raises(ValueError):
+            PasswordHasher(backend="gpu")
@@ -0,0 +1,109 @@
+import asyncio
+import pytest
+
+from server.app.services.prediction_cache import PredictionCache
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPredictionCache:
+    """Unit tests for the LRU + TTL prediction cache."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    def test_hit_and_miss_counters(self, clock):
+        """Test that lookups are counted as hits or misses."""
+        cache = PredictionCache(max_entries=10, ttl_seconds=60, clock=clock)
+
+        assert cache.get("feel sad", "v1") is None
+        cache.set("feel sad", "v1", ("Depression", [0.9, 0.1]))
+        assert cache.get("feel sad", "v1") == ("Depression", [0.9, 0.1])
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_eviction(self, clock):
+        """Test that the least recently used entry is evicted first."""
+        cache = PredictionCache(max_entries=2, ttl_seconds=60, clock=clock)
+        cache.set("a", "v1", 1)
+        cache.set("b", "v1", 2)
+        cache.get("a", "v1")
+        cache.set("c", "v1", 3)
+
+        assert cache.get("b", "v1") is None
+        assert cache.get("a", "v1") == 1
+        assert cache.get("c", "v1") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self, clock):
+        """Test that entries expire after the TTL."""
+        cache = PredictionCache(max_entries=10, ttl_seconds=5, clock=clock)
+        cache.set("a", "v1", 1)
+
+        clock.now = 4.9
+        assert cache.get("a", "v1") == 1
+        clock.now = 5.0
+        assert cache.get("a", "v1") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_model_version_change_invalidates(self, clock):
+        """Test that a new model version drops predictions from the old one."""
+        cache = PredictionCache(max_entries=10, ttl_seconds=60, clock=clock)
+        cache.set("a", "v1", 1)
+
+        assert cache.get("a", "v2") is None
+        assert cache.stats()["size"] == 0
+        assert cache.stats()["invalidations"] == 1
+
+    def test_in_flight_requests_are_coalesced(self, clock):
+        """Test that concurrent misses on the same key compute only once."""
+        cache = PredictionCache(max_entries=10, ttl_seconds=60, clock=clock)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return ("Normal", [1.0])
+
+        async def run():
+            return await asyncio.gather(*(cache.get_or_compute("a", "v1", compute) for _ in range(5)))
+
+        results = asyncio.run(run())
+
+        assert results == [("Normal", [1.0])] * 5
+        assert len(calls) == 1
+        assert cache.stats()["coalesced"] == 4
+        assert cache.get("a", "v1") == ("Normal", [1.0])
+
+    def test_failed_computation_is_not_cached(self, clock):
+        """Test that errors reach every waiter and leave nothing cached."""
+        cache = PredictionCache(max_entries=10, ttl_seconds=60, clock=clock)
+
+        async def compute():
+            await asyncio.sleep(0)
+            raise RuntimeError("Model error")
+
+        async def run():
+            return await asyncio.gather(
+                cache.get_or_compute("a", "v1", compute),
+                cache.get_or_compute("a", "v1", compute),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert cache.stats()["size"] == 0
+        assert cache.stats()["in_flight"] == 0
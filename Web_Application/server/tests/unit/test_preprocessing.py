@@ -0,0 +1,82 @@
+import gzip
+import json
+import re
+import pytest
+
+import server.app.models.preprocessing as preprocessing_module
+from server.app.models.preprocessing import TextPreprocessor, PREPROCESSING_TABLES_VERSION
+
+STOP_WORDS = ["i", "am", "the", "a", "and", "my", "is"]
+LEMMAS = {"feelings": "feeling", "days": "day", "worries": "worry"}
+
+
+def reference_preprocess(text, lemmatize):
+    """The notebook's original preprocess_text, with an injectable lemmatizer."""
+    stop_words = set(STOP_WORDS)
+    text = re.sub(r'[^a-zA-Z]', ' ', text).lower()
+    words = [lemmatize(word) for word in text.split() if word not in stop_words]
+    return ' '.join(words)
+
+
+class TestTextPreprocessor:
+    """Unit tests for TextPreprocessor using injected stopwords and lemmas."""
+
+    @pytest.fixture
+    def fake_lemmatize(self):
+        return lambda word: LEMMAS.get(word, word)
+
+    @pytest.mark.parametrize("text", [
+        "I am having the worst days, and my feelings are a mess!!",
+        "Worries... 123 worries & DAYS",
+        "",
+        "I feel 😢 today! #depression @therapy",
+    ])
+    def test_matches_reference_preprocessing(self, fake_lemmatize, text):
+        """Test that output is identical to the training-time function."""
+        preprocessor = TextPreprocessor(STOP_WORDS, lemmatize=fake_lemmatize)
+        assert preprocessor(text) == reference_preprocess(text, fake_lemmatize)
+
+    def test_lemma_memo_is_bounded(self, fake_lemmatize):
+        """Test that repeated tokens hit the memo and its size is capped."""
+        preprocessor = TextPreprocessor(STOP_WORDS, lemmatize=fake_lemmatize, memo_size=2)
+        preprocessor("days days days feelings worries")
+
+        info = preprocessor._lemmatize.cache_info()
+        assert info.hits == 2
+        assert info.currsize == 2
+
+    def test_tables_artifact_round_trip(self, tmp_path, fake_lemmatize):
+        """Test that a tables artifact reproduces the NLTK-backed output."""
+        path = tmp_path / "tables.json.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump({"version": PREPROCESSING_TABLES_VERSION, "stopwords": STOP_WORDS, "lemmas": LEMMAS}, f)
+
+        preprocessor = TextPreprocessor.from_tables(str(path))
+        text = "My feelings and worries fill the days"
+
+        assert preprocessor(text) == reference_preprocess(text, fake_lemmatize)
+        assert isinstance(preprocessor.stop_words, frozenset)
+
+    def test_tables_version_mismatch(self, tmp_path):
+        """Test that an artifact from an unknown format version is rejected."""
+        path = tmp_path / "tables.json.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump({"version": -1, "stopwords": [], "lemmas": {}}, f)
+
+        with pytest.raises(ValueError):
+            TextPreprocessor.from_tables(str(path))
+
+    def test_preprocess_text_reuses_instance(self, monkeypatch, fake_lemmatize):
+        """Test that preprocess_text builds the preprocessor only once."""
+        loads = []
+
+        def fake_load():
+            loads.append(1)
+            return TextPreprocessor(STOP_WORDS, lemmatize=fake_lemmatize)
+
+        monkeypatch.setattr(preprocessing_module, "_text_preprocessor", None)
+        monkeypatch.setattr(TextPreprocessor, "load", staticmethod(fake_load))
+
+        assert preprocessing_module.preprocess_text("my days") == "day"
+        assert preprocessing_module.preprocess_text("the feelings") == "feeling"
+        assert len(loads) == 1
@@ -0,0 +1,150 @@
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from server.app.api import dependencies
+from server.app.api.professionals import PROJECTIONS, router
+from server.app.utils import database
+
+
+def make_professional(index: int) -> dict:
+    return {
+        "name": f"Dr. {'Silva' if index % 2 else 'Perera'} {index}",
+        "email": f"doctor{index}@example.com",
+        "specialty": "Psychiatrist" if index % 3 == 0 else "Psychologist",
+        "languages": ["English", "Sinhala"] if index % 2 else ["Tamil"],
+        "active": index % 4 != 0,
+        "verified": True,
+        "availabilityStatus": "Available",
+        "currentAssignments": [{"user": "u1"}],
+        "licenseCertificatePath": f"uploads/license_certificates/{index}.pdf",
+        "createdAt": datetime(2025, 1, 1),
+    }
+
+
+@pytest.fixture
+def client():
+    """A client for the professionals API, backed by the in-memory database with 25 professionals."""
+    asyncio.run(database.start_database("memory"))
+    database.get_database()["professionals"].insert_many([make_professional(i) for i in range(25)])
+    app = FastAPI()
+    app.include_router(router, prefix="/api/professionals")
+    yield TestClient(app)
+    asyncio.run(database.close_database())
+
+
+def sign_in(client, monkeypatch, email="admin@example.com", admins=("admin@example.com",)):
+    monkeypatch.setattr(dependencies, "ADMIN_EMAILS", set(admins))
+    client.app.dependency_overrides[dependencies.get_current_user_email] = lambda: email
+
+
+class TestProfessionalsListing:
+    """Tests for the paginated, projected and streamed professionals listing."""
+
+    def test_keyset_pages_cover_everything_once(self, client):
+        """Test that following X-Next-Cursor visits every professional exactly once, in order."""
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {"limit": 10, **({"after": cursor} if cursor else {})}
+            response = client.get("/api/professionals/", params=params)
+            assert response.status_code == 200
+            seen.extend(p["_id"] for p in response.json())
+            pages += 1
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+        assert pages == 3
+        assert len(seen) == len(set(seen)) == 25
+        assert seen == sorted(seen)
+
+    def test_card_projection_is_the_default(self, client):
+        """Test that cards leave out license paths, assignments and audit fields, and full keeps them."""
+        card = client.get("/api/professionals/", params={"limit": 1}).json()[0]
+        full = client.get("/api/professionals/", params={"limit": 1, "fields": "full"}).json()[0]
+
+        assert set(card) <= set(PROJECTIONS["card"]) | {"_id"}
+        assert "licenseCertificatePath" in full and "currentAssignments" in full and "createdAt" in full
+
+    def test_filters(self, client):
+        """Test that filters are applied in the query, alone and combined."""
+        def names(**params):
+            return [p["name"] for p in client.get("/api/professionals/", params={"limit": 200, **params}).json()]
+
+        assert len(names(specialty="Psychiatrist")) == 9
+        assert len(names(active="false")) == 7
+        assert all("Silva" in name for name in names(language="Sinhala"))
+        assert names(q="perera 1") == ["Dr. Perera 10", "Dr. Perera 12", "Dr. Perera 14", "Dr. Perera 16",
+                                       "Dr. Perera 18"]
+        assert names(q=".*") == []
+        assert len(names(specialty="Psychiatrist", active="true")) == 6
+
+    def test_invalid_parameters(self, client):
+        """Test that bad cursors, profiles and page sizes are rejected."""
+        assert client.get("/api/professionals/", params={"after": "not-an-id"}).status_code == 400
+        assert client.get("/api/professionals/", params={"fields": "secret"}).status_code == 422
+        assert client.get("/api/professionals/", params={"limit": 10_000}).status_code == 422
+
+    def test_export_streams_a_json_array(self, client, monkeypatch):
+        """Test that the export is one valid JSON array of cards unless the full profile is asked for."""
+        sign_in(client, monkeypatch)
+        response = client.get("/api/professionals/export", params={"specialty": "Psychiatrist"})
+
+        assert response.status_code == 200
+        assert "attachment" in response.headers["content-disposition"]
+        exported = json.loads(response.text)
+        assert len(exported) == 9
+        assert set(exported[0]) <= set(PROJECTIONS["card"]) | {"_id"}
+        full = json.loads(client.get("/api/professionals/export", params={"fields": "full"}).text)
+        assert full[0]["createdAt"] == "2025-01-01T00:00:00"
+        assert json.loads(client.get("/api/professionals/export", params={"q": "nobody"}).text) == []
+
+    def test_export_requires_an_admin(self, client, monkeypatch):
+        """Test that anonymous callers get a 401 and signed-in non-admins a 403."""
+        monkeypatch.setattr(dependencies, "ADMIN_EMAILS", {"admin@example.com"})
+        assert client.get("/api/professionals/export").status_code == 401
+
+        sign_in(client, monkeypatch, email="user@example.com")
+        assert client.get("/api/professionals/export").status_code == 403
+
+
+class TestProfessionalsOnMotor:
+    """The professionals routes await a Motor collection instead of blocking on pymongo."""
+
+    def test_create_and_list_await_the_collection(self, monkeypatch, tmp_path):
+        """Test that creating awaits insert_one and listing awaits the cursor's to_list."""
+        from unittest.mock import AsyncMock, MagicMock
+        from bson import ObjectId
+        from server.app.api import professionals
+
+        collection = MagicMock()
+        collection.insert_one = AsyncMock(return_value=MagicMock(inserted_id=ObjectId()))
+        cursor = collection.find.return_value.sort.return_value.limit.return_value
+        cursor.to_list = AsyncMock(return_value=[{"_id": ObjectId(), "name": "Dr. Silva"}])
+        monkeypatch.setattr(professionals, "get_async_database", lambda: {"professionals": collection})
+        monkeypatch.chdir(tmp_path)
+        app = FastAPI()
+        app.include_router(router, prefix="/api/professionals")
+        client = TestClient(app)
+
+        form = {
+            "name": "Dr. Silva", "email": "silva@example.com", "phone": "0700000000", "hospital": "General",
+            "specialty": "Psychiatrist", "specializations": '["Anxiety"]', "languages": '["English"]',
+            "education": "MBBS", "licenseNumber": "L-1", "availableHours": "9 AM - 5 PM",
+        }
+        files = {
+            "profileImage": ("me.png", b"png", "image/png"),
+            "licenseCertificate": ("license.pdf", b"pdf", "application/pdf"),
+        }
+        created = client.post("/api/professionals/", data=form, files=files)
+        listed = client.get("/api/professionals/", params={"limit": 5})
+
+        assert created.status_code == 200
+        collection.insert_one.assert_awaited_once()
+        assert collection.insert_one.await_args.args[0]["specializations"] == ["Anxiety"]
+        assert listed.json()[0]["name"] == "Dr. Silva"
+        cursor.to_list.assert_awaited_once_with(length=6)
@@ -3,7 +3,7 @@ import numpy as np
 from unittest.mock import patch, MagicMock
 
 # Import the function to test
-from server.app.models.sentiment_model import predict_sentiment
+from server.app.models.sentiment_model import predict_sentiment, predict_sentiment_batch
 
 # Get the correct module path for patching
 import server.app.models.sentiment_model as sentiment_module
@@ -19,7 +19,9 @@ class TestSentimentModel:
         mocks = {
             'model': MagicMock(),
             'vectorizer': MagicMock(),
-            'label_encoder': MagicMock()
+            'label_encoder': MagicMock(),
+            # Exercise the sklearn path even when a model artifact is installed
+            'linear_scorer': None
         }
         
         # Configure basic mock behavior
@@ -126,4 +128,47 @@ class TestSentimentModel:
             # Verify results
             assert sentiment == 'anxiety'
             assert confidence == [0.1, 0.2, 0.1, 0.6]
-            assert sum(confidence) == pytest.approx(1.0)
\ No newline at end of file
+            assert sum(confidence) == pytest.approx(1.0)
+
+
+class TestSentimentModelBatch:
+    """Unit tests for predict_sentiment_batch using mocks."""
+
+    @pytest.fixture
+    def mock_components(self):
+        """Set up mocks for a three-class model."""
+        mocks = {
+            'model': MagicMock(),
+            'vectorizer': MagicMock(),
+            'label_encoder': MagicMock(),
+            'linear_scorer': None
+        }
+        mocks['vectorizer'].transform.return_value = np.array([[0.1, 0.2], [0.3, 0.4]])
+        mocks['model'].classes_ = np.array([0, 1, 2])
+        mocks['model'].predict_proba.return_value = np.array([[0.7, 0.2, 0.1], [0.1, 0.3, 0.6]])
+        mocks['label_encoder'].inverse_transform.return_value = np.array(['negative', 'neutral'])
+        return mocks
+
+    def test_batch_uses_single_pipeline_pass(self, mock_components):
+        """Test that the whole batch is vectorized, scored and decoded once."""
+        texts = ["I feel sad today", "Today is Monday"]
+
+        with patch.multiple(sentiment_module, **mock_components):
+            results = predict_sentiment_batch(texts)
+
+            assert results == [
+                ('negative', [0.7, 0.2, 0.1]),
+                ('neutral', [0.1, 0.3, 0.6])
+            ]
+
+            mock_components['vectorizer'].transform.assert_called_once_with(texts)
+            mock_components['model'].predict_proba.assert_called_once()
+            mock_components['model'].predict.assert_not_called()
+            decoded = mock_components['label_encoder'].inverse_transform.call_args[0][0]
+            assert decoded.tolist() == [0, 2]
+
+    def test_empty_batch(self, mock_components):
+        """Test that an empty batch short-circuits without touching the model."""
+        with patch.multiple(sentiment_module, **mock_components):
+            assert predict_sentiment_batch([]) == []
+            mock_components['vectorizer'].transform.assert_not_called()
@@ -0,0 +1,116 @@
+import asyncio
+import numpy as np
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from server.app.api import sentiment as sentiment_api
+from server.app.models.model_loader import score_batch, score_windows
+from server.app.services.statement_limits import cap_statement, prepare_statement, split_windows
+
+
+def lowercase(text):
+    return " ".join(text.lower().split())
+
+
+class TestPrepareStatement:
+    """Unit tests for bounding the work done for long statements."""
+
+    def test_short_statement_is_untouched(self):
+        """Test that statements under the cap become one text in either mode."""
+        for mode in ("truncate", "window"):
+            prepared = prepare_statement("I Feel Fine. Thanks.", mode, lowercase, max_chars=100)
+            assert prepared.windows == ("i feel fine. thanks.",)
+            assert not prepared.truncated and not prepared.windowed
+
+    def test_truncate_cuts_at_a_word_boundary(self):
+        """Test that truncation keeps whole words only and is reported."""
+        prepared = prepare_statement("alpha beta gamma delta", "truncate", lowercase, max_chars=13)
+
+        assert prepared.windows == ("alpha beta",)
+        assert prepared.truncated
+
+    def test_cap_statement(self):
+        """Test character capping with and without a word boundary before the cap."""
+        assert cap_statement("short", 10) == ("short", False)
+        assert cap_statement("one two three", 7) == ("one two", True)
+        assert cap_statement("unbroken", 4) == ("unbr", True)
+
+    def test_window_mode_packs_sentences(self):
+        """Test that whole sentences are packed into windows of bounded size."""
+        text = "a b c. d e. f g h i j k!\nl"
+
+        windows, dropped = split_windows(text, lowercase, window_tokens=4, max_windows=10)
+
+        assert windows == ("a b c.", "d e.", "f g h i", "j k! l")
+        assert not dropped
+        assert all(len(window.split()) <= 4 for window in windows)
+
+    def test_window_count_is_bounded(self):
+        """Test that text past the last allowed window is dropped and reported."""
+        text = ". ".join(["word"] * 100)
+
+        prepared = prepare_statement(text, "window", lowercase, max_chars=10, window_tokens=5, max_windows=3)
+
+        assert prepared.windowed
+        assert len(prepared.windows) == 3
+        assert prepared.truncated
+
+    def test_exactly_full_windows_are_not_truncated(self):
+        """Test that filling the last window exactly is not reported as dropping text."""
+        windows, dropped = split_windows("a b. c d.", lowercase, window_tokens=2, max_windows=2)
+
+        assert windows == ("a b.", "c d.")
+        assert not dropped
+
+
+class TestScoreWindows:
+    """Unit tests for aggregating window probabilities into one prediction."""
+
+    @pytest.fixture
+    def components(self, fit_pipeline):
+        statuses = ["Depression", "Depression", "Normal", "Normal", "Anxiety", "Anxiety"]
+        texts = ["sad hopeless", "empty crying", "nice weather", "weekend lunch", "panic worry", "nervous fear"]
+        label_encoder = LabelEncoder().fit(statuses)
+        vectorizer, model = fit_pipeline(texts, label_encoder.transform(statuses), ngram_range=(1, 1))
+        return {"model": model, "vectorizer": vectorizer, "linear_scorer": None, "label_encoder": label_encoder}
+
+    @pytest.mark.parametrize("aggregate", ["mean", "max"])
+    def test_aggregates_per_class(self, components, aggregate):
+        """Test that window probabilities are combined per class and still sum to one."""
+        windows = ["sad hopeless", "sad empty", "nice weather"]
+        probabilities = np.array([confidence for _, confidence in score_batch(windows, **components)])
+
+        sentiment, confidence = score_windows(windows, aggregate, **components)
+
+        expected = probabilities.mean(axis=0) if aggregate == "mean" else probabilities.max(axis=0)
+        expected = expected / expected.sum()
+        assert confidence == pytest.approx(expected.tolist())
+        assert sentiment == "Depression"
+
+    def test_rejects_unknown_aggregate(self, components):
+        """Test that only mean and max are accepted."""
+        with pytest.raises(ValueError):
+            score_windows(["sad"], "median", **components)
+
+
+class TestPredictEndpointLimits:
+    """Unit tests for the truncation and window flags on /predict/."""
+
+    def test_response_reports_windowing(self, monkeypatch):
+        """Test that a long statement in window mode is scored as several windows."""
+        monkeypatch.setattr(
+            sentiment_api, "prepare_statement",
+            lambda statement, mode: prepare_statement(statement, mode, max_chars=50, window_tokens=8),
+        )
+        statement = "I feel hopeless and sad today. " * 10
+
+        response = asyncio.run(sentiment_api.predict_sentiment_endpoint(
+            sentiment_api.StatementRequest(statement=statement, long_text="window", aggregate="max")
+        ))
+        truncated = asyncio.run(sentiment_api.predict_sentiment_endpoint(
+            sentiment_api.StatementRequest(statement=statement, long_text="truncate")
+        ))
+
+        assert response["windows"] > 1 and not response["truncated"]
+        assert sum(response["confidence"]) == pytest.approx(1.0)
+        assert truncated["windows"] == 1 and truncated["truncated"]
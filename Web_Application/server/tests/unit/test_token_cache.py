@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from jose import JWTError, jwt
+
+from server.app.api.dependencies import get_current_user_email, require_current_user_email
+from server.app.services.token_cache import TokenRevoked, VerifiedTokenCache, token_digest
+
+SECRET = "test-secret"
+NOW = 1_700_000_000
+
+
+class FakeClock:
+    def __init__(self, now=NOW):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class CountingDecoder:
+    """jwt.decode with a call counter and a fixed notion of now."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, token):
+        self.calls += 1
+        return jwt.decode(token, SECRET, algorithms=["HS256"], options={"verify_exp": False})
+
+
+def make_token(sub="a@example.com", exp=NOW + 60, **claims):
+    return jwt.encode({"sub": sub, "exp": exp, **claims}, SECRET, algorithm="HS256")
+
+
+class TestVerifiedTokenCache:
+    """Unit tests for the verified-JWT cache."""
+
+    def test_hits_skip_decoding(self):
+        """Test that a repeated token is decoded once and the hit rate reflects it."""
+        cache = VerifiedTokenCache(clock=FakeClock())
+        decode = CountingDecoder()
+        token = make_token()
+
+        claims = [cache.verify(token, decode) for _ in range(4)]
+
+        assert decode.calls == 1
+        assert claims[0]["sub"] == claims[3]["sub"] == "a@example.com"
+        assert cache.stats()["hit_rate"] == pytest.approx(0.75)
+        assert token not in str(cache._entries) and token_digest(token) in cache._entries
+
+    def test_entries_expire_with_the_token(self):
+        """Test that an entry is dropped at exp and tokens without exp are never cached."""
+        clock = FakeClock()
+        cache = VerifiedTokenCache(clock=clock)
+        decode = CountingDecoder()
+        token = make_token(exp=NOW + 60)
+
+        cache.verify(token, decode)
+        clock.now = NOW + 60
+        cache.verify(token, decode)
+        cache.verify(make_token(exp=None), decode)
+
+        assert decode.calls == 3
+        assert cache.stats()["expired"] == 1
+        assert cache.stats()["size"] == 0
+
+    def test_invalid_tokens_are_not_cached(self):
+        """Test that a bad signature raises every time."""
+        cache = VerifiedTokenCache(clock=FakeClock())
+        forged = jwt.encode({"sub": "a@example.com", "exp": NOW + 60}, "other-secret", algorithm="HS256")
+
+        for _ in range(2):
+            with pytest.raises(JWTError):
+                cache.verify(forged, CountingDecoder())
+        assert cache.stats()["size"] == 0
+
+    def test_revocation_hook_applies_to_cached_tokens(self):
+        """Test that revoking a token takes effect even after it was cached."""
+        denylist = set()
+        cache = VerifiedTokenCache(clock=FakeClock(), is_revoked=lambda digest, claims: claims.get("jti") in denylist)
+        token = make_token(jti="session-1")
+
+        cache.verify(token, CountingDecoder())
+        denylist.add("session-1")
+
+        with pytest.raises(TokenRevoked):
+            cache.verify(token, CountingDecoder())
+        assert cache.stats()["revoked"] == 1
+
+    def test_size_is_bounded(self):
+        """Test that the least recently used tokens are evicted beyond max_entries."""
+        cache = VerifiedTokenCache(max_entries=2, clock=FakeClock())
+        decode = CountingDecoder()
+        first, second, third = (make_token(sub=f"{i}@example.com") for i in range(3))
+
+        for token in (first, second, first, third):
+            cache.verify(token, decode)
+
+        assert cache.stats()["evicted"] == 1
+        assert token_digest(first) in cache._entries and token_digest(second) not in cache._entries
+
+
+class TestAuthDependencies:
+    """Unit tests for the shared authentication dependencies."""
+
+    def test_anonymous_callers(self):
+        """Test that a missing token is anonymous for optional routes and a 401 for required ones."""
+        assert asyncio.run(get_current_user_email(None)) is None
+        assert asyncio.run(require_current_user_email("a@example.com")) == "a@example.com"
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(require_current_user_email(None))
+        assert error.value.status_code == 401
+
+    def test_invalid_token_is_anonymous_on_optional_routes(self, monkeypatch):
+        """Test that a stale token does not fail optional routes, while configuration errors still do."""
+        monkeypatch.setenv("JWT_SECRET", SECRET)
+        from server.app.services import auth_service
+
+        def reject(token):
+            raise HTTPException(status_code=401, detail="Invalid token")
+
+        monkeypatch.setattr(auth_service, "get_email_from_token", reject)
+        assert asyncio.run(get_current_user_email("stale-token")) is None
+
+        def misconfigured(token):
+            raise HTTPException(status_code=500, detail="Server configuration error")
+
+        monkeypatch.setattr(auth_service, "get_email_from_token", misconfigured)
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(get_current_user_email("any-token"))
+        assert error.value.status_code == 500
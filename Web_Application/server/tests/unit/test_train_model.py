@@ -0,0 +1,127 @@
+import os
+import json
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from server.app.models.model_artifact import read_manifest
+from server.app.models.model_loader import load_model_components, score_batch
+from server.app.models.preprocessing import preprocess_text
+from server.app.models.train_model import (
+    TRAINING_REPORT_FILE,
+    corpus_cache_key,
+    load_or_preprocess,
+    oversample_indices,
+    oversampled_splits,
+    train,
+)
+
+WORDS = {
+    "Depression": ["sad", "hopeless", "crying", "empty", "worthless"],
+    "Anxiety": ["worried", "panic", "nervous", "restless", "fear"],
+    "Normal": ["weather", "lunch", "weekend", "movie", "shopping"],
+}
+
+
+@pytest.fixture
+def training_csv(tmp_path):
+    """An imbalanced Statement/Status CSV with a missing statement and a missing status."""
+    rng = np.random.default_rng(0)
+    rows = []
+    for status, count in (("Depression", 30), ("Anxiety", 12), ("Normal", 40)):
+        for _ in range(count):
+            rows.append((" ".join(rng.choice(WORDS[status], size=4)), status))
+    rows += [(None, "Normal"), ("no label here", None)]
+    path = tmp_path / "train.csv"
+    pd.DataFrame(rows, columns=["Statement", "Status"]).to_csv(path, index=False)
+    return str(path)
+
+
+class TestTrainModel:
+    """Unit tests for the scripted training pipeline."""
+
+    def test_writes_servable_model_and_report(self, tmp_path, training_csv):
+        """Test that the output loads like the served model and the report has every stage."""
+        output = str(tmp_path / "model")
+
+        report = train(
+            training_csv, output, cv=2, workers=0, cache_directory=str(tmp_path / "cache"), c_values=[1.0],
+        )
+
+        components = load_model_components(output, os.path.join(output, "model_artifact"), "auto")
+        assert components["model_version"] == report["model_version"]
+        assert components["linear_scorer"] is not None
+        assert read_manifest(os.path.join(output, "model_artifact"))["model_version"] == report["model_version"]
+        components.pop("model_version")
+        [(sentiment, _)] = score_batch([preprocess_text("panic nervous fear")], **components)
+        assert sentiment == "Anxiety"
+
+        with open(os.path.join(output, TRAINING_REPORT_FILE)) as f:
+            saved = json.load(f)
+        assert saved["rows"] == 83
+        assert set(saved["class_counts"]) == {"Depression", "Anxiety", "Normal"}
+        assert list(saved["stage_seconds"]) == ["load", "preprocess", "vectorize", "grid_search", "evaluate", "write"]
+        assert saved["test"]["accuracy"] > 0.8
+
+    def test_second_run_uses_corpus_cache(self, tmp_path, training_csv):
+        """Test that preprocessing is skipped when the statements have not changed."""
+        cache = str(tmp_path / "cache")
+        statements = ["I feel sad", "Nice weather"]
+
+        first, first_hit = load_or_preprocess(statements, cache, workers=0)
+        second, second_hit = load_or_preprocess(statements, cache, workers=0)
+
+        assert (first_hit, second_hit) == (False, True)
+        assert first == second == [preprocess_text(s) for s in statements]
+        assert corpus_cache_key(statements, "a") != corpus_cache_key(statements, "b")
+        assert corpus_cache_key(["ab", "c"], "a") != corpus_cache_key(["a", "bc"], "a")
+
+    def test_oversample_balances_classes(self):
+        """Test that oversampling keeps every row and tops minority classes up to the majority."""
+        labels = np.array([0] * 6 + [1] * 2 + [2] * 3)
+
+        indices = oversample_indices(labels)
+
+        assert set(range(len(labels))) <= set(indices)
+        assert np.bincount(labels[indices]).tolist() == [6, 6, 6]
+
+    def test_oversampling_stays_inside_each_fold(self):
+        """Test that validation rows are never copied into their fold's fit rows, and fit rows are balanced."""
+        from sklearn.model_selection import StratifiedKFold
+
+        labels = np.array([0] * 12 + [1] * 4 + [2] * 6)
+
+        splits = oversampled_splits(StratifiedKFold(n_splits=2, shuffle=True, random_state=0), labels)
+
+        assert len(splits) == 2
+        for fit_rows, validation_rows in splits:
+            assert not set(fit_rows) & set(validation_rows)
+            assert len(set(np.bincount(labels[fit_rows]))) == 1
+            assert len(set(validation_rows)) == len(validation_rows)
+
+    def test_without_artifact_removes_stale_one(self, tmp_path, training_csv):
+        """Test that skipping the artifact does not leave an old one to be served."""
+        output = str(tmp_path / "model")
+        kwargs = dict(cv=2, workers=0, cache_directory=None, c_values=[1.0], imbalance="oversample")
+        train(training_csv, output, **kwargs)
+
+        train(training_csv, output, artifact=False, **kwargs)
+
+        assert not os.path.exists(os.path.join(output, "model_artifact"))
+
+    def test_stale_artifact_is_not_served(self, tmp_path, training_csv):
+        """Test that an artifact built for other pickles is ignored in favour of the pickles."""
+        output = str(tmp_path / "model")
+        train(training_csv, output, cv=2, workers=0, cache_directory=None, c_values=[1.0])
+        # Swap in different pickles, as a copy from another training run would
+        model_path = os.path.join(output, "mental_health_model.pkl")
+        model = joblib.load(model_path)
+        model.intercept_ = model.intercept_ + 1.0
+        joblib.dump(model, model_path)
+
+        components = load_model_components(output, os.path.join(output, "model_artifact"), "auto")
+
+        assert components["linear_scorer"] is None
+        assert components["model"] is not None
+        assert components["model_version"] != read_manifest(os.path.join(output, "model_artifact"))["model_version"]
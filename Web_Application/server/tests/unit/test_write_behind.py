@@ -0,0 +1,160 @@
+import asyncio
+from unittest.mock import MagicMock
+
+from pymongo.errors import AutoReconnect, BulkWriteError, OperationFailure
+
+from server.app.utils.write_behind import WriteBehindBuffer, is_transient
+
+
+def make_buffer(collection, **options):
+    options.setdefault("batch_size", 100)
+    options.setdefault("flush_seconds", 60)
+    options.setdefault("retry_backoff_ms", 1)
+    return WriteBehindBuffer(lambda: collection, "events", **options)
+
+
+class TestWriteBehindBuffer:
+    """Unit tests for batched, retried event writes."""
+
+    def test_full_batch_is_written_with_one_unordered_insert(self):
+        """Test that reaching the batch size triggers a single insert_many(ordered=False)."""
+        collection = MagicMock()
+
+        async def run():
+            buffer = make_buffer(collection, batch_size=3)
+            for i in range(3):
+                assert buffer.add({"n": i})
+            await asyncio.sleep(0.05)
+            stats = buffer.stats()
+            await buffer.close()
+            return stats
+
+        stats = asyncio.run(run())
+
+        collection.insert_many.assert_called_once_with([{"n": 0}, {"n": 1}, {"n": 2}], ordered=False)
+        assert stats["written"] == 3 and stats["depth"] == 0 and stats["flushes"] == 1
+        assert stats["flush_p50_ms"] is not None
+
+    def test_timer_flushes_partial_batch_in_batch_size_chunks(self):
+        """Test that the timer flushes what is buffered, batch_size documents per insert."""
+        collection = MagicMock()
+
+        async def run():
+            buffer = make_buffer(collection, batch_size=4, flush_seconds=0.02, max_buffer=100)
+            buffer._ensure_worker()
+            # Buffered without waking the worker, as if added just before the timer fired
+            buffer._buffer.extend({"n": i} for i in range(6))
+            await asyncio.sleep(0.1)
+            await buffer.close()
+
+        asyncio.run(run())
+
+        assert [len(call.args[0]) for call in collection.insert_many.call_args_list] == [4, 2]
+
+    def test_transient_failures_are_retried(self):
+        """Test that a connection error is retried and then succeeds."""
+        collection = MagicMock()
+        collection.insert_many.side_effect = [AutoReconnect("primary stepped down"), None]
+
+        async def run():
+            buffer = make_buffer(collection)
+            buffer.add({"n": 1})
+            await buffer.close()
+            return buffer.stats()
+
+        stats = asyncio.run(run())
+
+        assert collection.insert_many.call_count == 2
+        assert stats["retries"] == 1 and stats["written"] == 1 and stats["failed"] == 0
+
+    def test_duplicate_keys_on_retry_count_as_written(self):
+        """Test that documents a lost-acknowledgement attempt already inserted are not reported as failed."""
+        collection = MagicMock()
+        collection.insert_many.side_effect = [
+            AutoReconnect("connection reset"),
+            BulkWriteError({"writeErrors": [
+                {"index": 0, "code": 11000, "errmsg": "duplicate key"},
+                {"index": 2, "code": 121, "errmsg": "Document failed validation"},
+            ]}),
+        ]
+        written = []
+
+        async def run():
+            buffer = make_buffer(collection, on_written=written.extend)
+            for i in range(3):
+                buffer.add({"n": i})
+            await buffer.close()
+            return buffer.stats()
+
+        stats = asyncio.run(run())
+
+        assert stats["written"] == 2 and stats["failed"] == 1
+        assert written == [{"n": 0}, {"n": 1}]
+
+    def test_unavailable_database_requeues_then_drops_on_shutdown(self):
+        """Test that exhausted retries keep documents buffered, and shutdown drops what is left."""
+        collection = MagicMock()
+        collection.insert_many.side_effect = AutoReconnect("no primary")
+
+        async def run():
+            buffer = make_buffer(collection, max_retries=1)
+            buffer.add({"n": 1})
+            buffer.add({"n": 2})
+            assert not await buffer.flush()
+            requeued = buffer.stats()
+            await buffer.close()
+            return requeued, buffer.stats()
+
+        requeued, closed = asyncio.run(run())
+
+        assert requeued["depth"] == 2 and requeued["requeued"] == 2 and requeued["dropped"] == 0
+        assert closed["depth"] == 0 and closed["dropped"] == 2 and closed["written"] == 0
+
+    def test_bounded_buffer_and_permanent_errors(self):
+        """Test that adds beyond capacity are dropped and non-transient errors are not retried."""
+        collection = MagicMock()
+        collection.insert_many.side_effect = OperationFailure("not authorized")
+
+        async def run():
+            buffer = make_buffer(collection, max_buffer=2)
+            results = [buffer.add({"n": i}) for i in range(3)]
+            await buffer.close()
+            return results, buffer.stats()
+
+        results, stats = asyncio.run(run())
+
+        assert results == [True, True, False]
+        assert collection.insert_many.call_count == 1
+        assert stats["dropped"] == 1 and stats["failed"] == 2 and stats["retries"] == 0
+        assert not is_transient(OperationFailure("not authorized"))
+
+
+class TestWriteBehindRegistry:
+    """Unit tests for the shared per-collection buffers in the database module."""
+
+    def test_buffers_are_shared_and_reported(self, monkeypatch):
+        """Test that one buffer exists per collection and every registered buffer is in the stats."""
+        from server.app.utils import database
+
+        monkeypatch.setattr(database, "write_behind_buffers", {})
+        audit = database.get_write_behind_buffer("audit_log", batch_size=10)
+        timeline = database.register_write_behind_buffer(make_buffer(MagicMock()))
+
+        assert database.get_write_behind_buffer("audit_log") is audit
+        assert database.register_write_behind_buffer(timeline) is timeline
+        assert [stats["collection"] for stats in database.write_behind_stats()] == ["audit_log", "events"]
+        try:
+            database.register_write_behind_buffer(make_buffer(MagicMock()))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("A second buffer for the same collection was registered")
+
+    def test_app_event_writers_use_the_registry(self):
+        """Test that predictions and chat sentiment tags go through registered buffers."""
+        from server.app.api import chat_socket
+        from server.app.api import sentiment as sentiment_api
+        from server.app.utils import database
+
+        assert database.write_behind_buffers["predictions"] is sentiment_api.mood_timeline.buffer
+        assert chat_socket.chat_sentiment_tagger.record == database.write_behind_buffers["chat_sentiment"].add